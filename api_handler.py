@@ -1,15 +1,26 @@
-import os
 import time
 import json
 import socket
+import asyncio
 import getpass
+import httpx
 import requests
-from groq import Groq, RateLimitError, APIError, AuthenticationError, APITimeoutError
+from groq import (AsyncGroq, RateLimitError, APIError, AuthenticationError, APITimeoutError,
+                  APIConnectionError, InternalServerError)
+from audio_codec import UploadCodecSelector
+from streaming_upload import StreamingUpload
+from request_engine import RequestEngine, RequestCancelled
+from request_hedging import RequestHedger
+from warmup import WarmupManager
+from retry_policy import (RetryPolicy, CircuitBreaker, Deadline, RetryableError, DeadlineExceeded,
+                          CircuitOpenError, retry_after_seconds, DEFAULT_DEADLINE_SECONDS)
 
 
 # Proxy-Server für Usage-Tracking (optional)
 PROXY_BASE_URL = "https://actscriber-proxy.vercel.app"
 USE_PROXY = True  # Auf False setzen für direkten Groq-Zugriff
+LLM_MODEL = "moonshotai/kimi-k2-instruct-0905"
+PING_TIMEOUT_SECONDS = 10.0  # Warmup-Ping (Serverless-Kaltstart eingeschlossen)
 
 
 def get_user_id():
@@ -26,6 +37,38 @@ def get_user_id():
         return "unknown@unknown"
 
 
+def _as_bytes(data):
+    """Upload-Daten als bytes (httpx nimmt kein bytearray/memoryview) - bytes ohne Kopie"""
+    return data if isinstance(data, bytes) else bytes(data)
+
+
+def _proxy_error(response, prefix):
+    """Fehler-Antwort des Proxys -> RetryableError (429, 408, 5xx) oder Exception (übrige 4xx)"""
+    try:
+        error_msg = response.json().get("error", response.text)
+    except Exception:
+        error_msg = response.text
+    status = response.status_code
+    if status == 429:
+        return RetryableError(f"Rate limit ({error_msg})", retry_after_seconds(response.headers, rate_limited=True),
+                              counts_as_failure=False)
+    if status == 408 or status >= 500:
+        return RetryableError(f"HTTP {status} ({error_msg})", retry_after_seconds(response.headers))
+    return Exception(f"{prefix}: {error_msg}")
+
+
+def _retryable_groq_error(e):
+    """Groq-SDK-Fehler -> RetryableError (Rate Limit, Timeout, Verbindung, 5xx), sonst None"""
+    if isinstance(e, RateLimitError):
+        return RetryableError(f"Groq rate limit ({e.message})", retry_after_seconds(e.response.headers, rate_limited=True),
+                              counts_as_failure=False)
+    if isinstance(e, APIConnectionError):  # inkl. APITimeoutError
+        return RetryableError(f"Groq {type(e).__name__}")
+    if isinstance(e, InternalServerError):
+        return RetryableError(f"Groq HTTP {e.status_code} ({e.message})", retry_after_seconds(e.response.headers))
+    return None
+
+
 # JSON Schemas für Structured Outputs (Kimi K2 best-effort mode)
 DYNAMIC_SCHEMA = {
     "name": "formatted_dictation",
@@ -220,146 +263,309 @@ class APIHandler:
         self.logger = data_handler
         self._client = None
         self._client_api_key = None
-        # HTTP Session for connection pooling (reuses TCP connections)
+        # Alle Requests laufen als Coroutinen auf einem Loop mit gemeinsamem Verbindungspool
+        self.engine = RequestEngine()
+        self.engine.start()  # Jetzt statt beim ersten Request - der Warmup kommt aus dem Hotkey-Hook
+        # HTTP Session nur noch für den Streaming-Upload (eigener Thread, Body entsteht während der Aufnahme)
         self._session = requests.Session()
         self._user_id = get_user_id()  # Cache user ID (never changes)
+        # Upload-Codec (WAV/FLAC) abhängig von Aufnahmelänge und gemessenem Durchsatz
+        self._codec = UploadCodecSelector(data_handler)
+        # Gemeinsame Retry-Politik; je Weg ein Circuit Breaker (offener Proxy -> Groq direkt)
+        self.retry_policy = RetryPolicy()
+        self.breakers = {"proxy": CircuitBreaker("Proxy"), "direct": CircuitBreaker("Groq direkt")}
+        # Optional: langsamer Proxy-Request bekommt einen zweiten Versuch über Groq direkt
+        self.hedger = RequestHedger()
+        # Warmup beim Hotkey-Druck + Keep-Alive bei reger Nutzung
+        self.warmup = WarmupManager(self, enabled=bool(config.get("connection_warmup")))
 
     def _get_client(self):
+        """AsyncGroq auf dem Pool der Engine (nur im Loop aufrufen)"""
         api_key = self.config.get("api_key")
         if not api_key:
             raise ValueError("Kein API Key konfiguriert.")
         # Client wiederverwenden, solange der Key gleich bleibt
         if self._client is None or self._client_api_key != api_key:
-            self._client = Groq(api_key=api_key)
+            # Keine SDK-Retries - Wiederholungen steuert die RetryPolicy
+            self._client = AsyncGroq(api_key=api_key, http_client=self.engine.client, max_retries=0)
             self._client_api_key = api_key
         return self._client
 
-    def _transcribe_via_proxy(self, audio_filepath, lang_code, style_prompt):
-        """Transkribiert via Proxy-Server für Usage-Tracking"""
-        for attempt in range(3):
+    def close(self):
+        """Engine-Loop und Verbindungen schließen (App-Ende)"""
+        self.warmup.close()
+        self.engine.close()
+
+    async def ping_async(self):
+        """Billiger Request zum Aufwärmen (WarmupManager).
+
+        Via Proxy: /api/health über den Pool der Engine (Batch-Upload, Chat) und über
+        self._session (Streaming-Upload) - weckt zugleich die Serverless-Funktion.
+        Groq direkt (ohne Proxy, mit Hedging oder bei offenem Proxy-Breaker): Modell-Liste.
+        """
+        pings = []
+        if USE_PROXY and not self.breakers["proxy"].is_open:
+            url = f"{PROXY_BASE_URL}/api/health"
+            headers = {"X-User-ID": self._user_id}
+            pings.append(self.engine.client.get(url, headers=headers, timeout=PING_TIMEOUT_SECONDS))
+            pings.append(asyncio.to_thread(self._session.get, url, headers=headers, timeout=PING_TIMEOUT_SECONDS))
+        direct_in_use = not USE_PROXY or self.config.get("request_hedging") or self.breakers["proxy"].is_open
+        if direct_in_use and self.config.get("api_key"):
+            pings.append(self._get_client().models.list(timeout=PING_TIMEOUT_SECONDS))
+        if not pings:
+            return
+        results = await asyncio.gather(*pings, return_exceptions=True)
+        errors = [r for r in results if isinstance(r, Exception)]
+        if len(errors) == len(results):
+            raise errors[0]
+
+    def new_deadline(self):
+        """Zeitbudget für ein Diktat - Transkription und LLM teilen sich dieselbe Deadline"""
+        return Deadline(self.config.get("request_deadline_seconds") or DEFAULT_DEADLINE_SECONDS)
+
+    def _route(self):
+        """Weg für den nächsten Versuch: "proxy" oder "direct".
+
+        Ist der Proxy-Breaker offen, geht es mit eigenem API Key direkt zu Groq,
+        sonst schneller Fehler statt weiterer Timeouts.
+        """
+        if USE_PROXY and self.breakers["proxy"].allow():
+            return "proxy"
+        if (not USE_PROXY or self.config.get("api_key")) and self.breakers["direct"].allow():
+            if USE_PROXY:
+                self.logger.log("[API] Proxy circuit open - using Groq directly", "warning")
+            return "direct"
+        raise CircuitOpenError("Proxy unreachable" if USE_PROXY else "Groq unreachable")
+
+    def _hedge_route(self, route):
+        """Weg für einen zweiten Versuch (Hedge) oder None"""
+        if route != "proxy" or not self.config.get("request_hedging") or not self.config.get("api_key"):
+            return None
+        return None if self.breakers["direct"].is_open else "direct"
+
+    async def _send(self, kind, route, send, timeout):
+        """Ein Versuch über route - Ausgang geht in Circuit Breaker und Latenzstatistik"""
+        breaker = self.breakers[route]
+        start = time.perf_counter()
+        try:
+            result = await send(route, timeout)
+        except RetryableError as e:
+            if e.counts_as_failure:
+                breaker.record_failure()
+            else:
+                breaker.record_success()  # Rate Limit: erreichbar, nur zu viele Requests
+            raise
+        breaker.record_success()
+        self.hedger.record(kind, route, time.perf_counter() - start)
+        self.warmup.note_traffic()
+        return result
+
+    async def _request(self, kind, deadline, send):
+        """Ein logischer Request: send(route, timeout) mit Retries, Deadline und Circuit Breaker.
+
+        Wartezeiten kommen aus der RetryPolicy (Retry-After/Rate-Limit-Header oder Backoff
+        mit Jitter). Reicht die Restzeit der Deadline nicht für Wartezeit plus Versuch,
+        endet der Request sofort mit DeadlineExceeded. Mit request_hedging startet ein
+        langsamer Proxy-Versuch zusätzlich einen über Groq direkt (RequestHedger).
+        """
+        attempts = {}
+        while True:
+            route = self._route()
+            timeout = deadline.timeout()
             try:
-                with open(audio_filepath, "rb") as file:
-                    files = {"file": (os.path.basename(audio_filepath), file, "audio/wav")}
-                    data = {"prompt": style_prompt}
-                    if lang_code is not None:
-                        data["language"] = lang_code
-
-                    response = self._session.post(
-                        f"{PROXY_BASE_URL}/api/transcribe",
-                        files=files,
-                        data=data,
-                        headers={"X-User-ID": self._user_id},
-                        timeout=60.0
-                    )
-
-                    if response.status_code == 200:
-                        result = response.json()
-                        return result.get("text")
-                    elif response.status_code == 429:
-                        # Rate limit
-                        if attempt < 2:
-                            time.sleep((attempt + 1) * 2)
-                            self.logger.log("[API] Rate Limit Proxy - Retry...", "warning")
-                            continue
-                        else:
-                            raise Exception("Rate limit exceeded")
-                    else:
-                        try:
-                            error_msg = response.json().get("error", response.text)
-                        except Exception:
-                            error_msg = response.text
-                        raise Exception(f"Proxy error: {error_msg}")
-            except requests.exceptions.Timeout:
-                if attempt < 2:
-                    time.sleep((attempt + 1) * 2)
-                    self.logger.log("[API] Timeout Proxy - Retry...", "warning")
-                else:
+                return await self.hedger.run(
+                    kind, route, self._hedge_route(route),
+                    lambda attempt_route: self._send(kind, attempt_route, send, timeout)
+                )
+            except RetryableError as e:
+                attempts[route] = attempts.get(route, 0) + 1
+                delay = self.retry_policy.delay(attempts[route], e.retry_after)
+                if not deadline.allows(delay):
+                    raise DeadlineExceeded(f"{kind}: {e} - no time left for a retry in {delay:.1f}s") from e
+                # Versuche pro Weg; nach dem Öffnen des Breakers bekommt Groq direkt eigene Versuche
+                if attempts[route] >= self.retry_policy.attempts and not self.breakers[route].is_open:
                     raise
-        return None
+                self.logger.log(f"[API] {kind} via {route}: {e} - retry in {delay:.1f}s", "warning")
+                await self.engine.sleep(delay)
+
+    async def _transcribe_via_proxy(self, audio, lang_code, style_prompt, timeout):
+        """Transkribiert via Proxy-Server für Usage-Tracking (ein Versuch)"""
+        # Upload direkt aus dem Speicher (kein Temp-File)
+        files = {"file": (audio.filename, _as_bytes(audio.data), audio.mime_type)}
+        data = {"prompt": style_prompt}
+        if lang_code is not None:
+            data["language"] = lang_code
+
+        request_start = time.perf_counter()
+        try:
+            response = await self.engine.client.post(
+                f"{PROXY_BASE_URL}/api/transcribe",
+                files=files,
+                data=data,
+                headers={"X-User-ID": self._user_id},
+                timeout=timeout
+            )
+        except httpx.TimeoutException as e:
+            raise RetryableError(f"Timeout after {timeout:.0f}s") from e
+        except httpx.TransportError as e:
+            raise RetryableError(f"Connection error ({type(e).__name__})") from e
+
+        if response.status_code == 200:
+            self._codec.record_upload(audio.size, time.perf_counter() - request_start)
+            result = response.json()
+            return result.get("text")
+        raise _proxy_error(response, "Proxy error")
+
+    async def _transcribe_direct(self, audio, lang_code, style_prompt, timeout):
+        """Transkribiert direkt bei Groq (ein Versuch)"""
+        client = self._get_client()
+        # Request-Parameter aufbauen (gemäß Groq API Docs)
+        request_params = {
+            "file": (audio.filename, _as_bytes(audio.data)),
+            "model": "whisper-large-v3",
+            "prompt": style_prompt,
+            "response_format": "json",
+            "temperature": 0.0,
+        }
+
+        # Sprache NUR hinzufügen wenn NICHT "Automatisch" (None)
+        if lang_code is not None:
+            request_params["language"] = lang_code
 
-    def transcribe(self, audio_filepath):
-        """Transkribiert eine Audiodatei mit Whisper API"""
+        # Timeout wird separat übergeben (nicht Teil der API-Parameter)
+        request_start = time.perf_counter()
         try:
-            lang_code = self.config.get_language_code()  # None für "Automatisch"
-            lang_name = self.config.get("language")
+            transcription = await client.audio.transcriptions.create(**request_params, timeout=timeout)
+        except APIError as e:
+            retryable = _retryable_groq_error(e)
+            if retryable is None:
+                raise
+            raise retryable from e
+        self._codec.record_upload(audio.size, time.perf_counter() - request_start)
+        # Note: Whisper API doesn't support 'user' parameter directly
+        return transcription.text if transcription else None
+
+    def _style_prompt(self, lang_code, context=None):
+        """Whisper-Prompt für die Sprache, optional mit vorherigem Text als Kontext"""
+        # Prompt in der Sprache der Audiodatei (laut Doku empfohlen)
+        # Bei "Automatisch" verwenden wir einen englischen Fallback
+        style_prompts = {
+            "de": "Juristisches Diktat. Korrekte Rechtschreibung, Groß- und Kleinschreibung, Interpunktion.",
+            "en": "Legal dictation. Correct spelling, capitalization, and punctuation.",
+            "fr": "Dictée juridique. Orthographe, majuscules et ponctuation correctes.",
+            "es": "Dictado legal. Ortografía, mayúsculas y puntuación correctas.",
+            "it": "Dettatura legale. Ortografia, maiuscole e punteggiatura corrette.",
+            "pl": "Dyktowanie prawnicze. Poprawna pisownia, wielkie litery i interpunkcja.",
+            "ru": "Юридическая диктовка. Правильная орфография, заглавные буквы и пунктуация.",
+            "tr": "Hukuki dikte. Doğru yazım, büyük harf ve noktalama.",
+            "nl": "Juridisch dictaat. Correcte spelling, hoofdletters en interpunctie.",
+            "uk": "Юридична диктовка. Правильний правопис, великі літери та пунктуація.",
+        }
+        style_prompt = style_prompts.get(lang_code, "Legal dictation. Correct spelling and punctuation.")
+        if context:
+            # Whisper setzt den Prompt als vorangegangenen Text fort (Kontinuität über Segmentgrenzen)
+            style_prompt = f"{style_prompt} {context}"
+        return style_prompt
 
-            # Prompt in der Sprache der Audiodatei (laut Doku empfohlen)
-            # Bei "Automatisch" verwenden wir einen englischen Fallback
-            style_prompts = {
-                "de": "Juristisches Diktat. Korrekte Rechtschreibung, Groß- und Kleinschreibung, Interpunktion.",
-                "en": "Legal dictation. Correct spelling, capitalization, and punctuation.",
-                "fr": "Dictée juridique. Orthographe, majuscules et ponctuation correctes.",
-                "es": "Dictado legal. Ortografía, mayúsculas y puntuación correctas.",
-                "it": "Dettatura legale. Ortografia, maiuscole e punteggiatura corrette.",
-                "pl": "Dyktowanie prawnicze. Poprawna pisownia, wielkie litery i interpunkcja.",
-                "ru": "Юридическая диктовка. Правильная орфография, заглавные буквы и пунктуация.",
-                "tr": "Hukuki dikte. Doğru yazım, büyük harf ve noktalama.",
-                "nl": "Juridisch dictaat. Correcte spelling, hoofdletters en interpunctie.",
-                "uk": "Юридична диктовка. Правильний правопис, великі літери та пунктуація.",
-            }
-            style_prompt = style_prompts.get(lang_code, "Legal dictation. Correct spelling and punctuation.")
+    def open_stream_upload(self, sample_rate):
+        """Startet den Upload für eine beginnende Aufnahme (nur via Proxy, sonst None).
+
+        Der Recorder füttert ihn über upload_sink; transcribe_async() nimmt die Antwort aus
+        AudioClip.stream_upload und lädt nur bei einem Fehler die Aufnahme erneut hoch.
+        """
+        if not USE_PROXY or self.breakers["proxy"].is_open:
+            return None
+        lang_code = self.config.get_language_code()
+        fields = {"prompt": self._style_prompt(lang_code)}
+        if lang_code is not None:
+            fields["language"] = lang_code
+        upload = StreamingUpload(
+            self._session,
+            f"{PROXY_BASE_URL}/api/transcribe",
+            fields,
+            {"X-User-ID": self._user_id},
+            sample_rate
+        )
+        return upload.open()
+
+    async def transcribe_async(self, audio, context=None, deadline=None):
+        """Transkribiert eine Aufnahme (AudioClip aus audio_handler) mit Whisper API
 
-            self.logger.log(f"[API] Whisper Request - Language: {lang_name} ({lang_code or 'auto'}), File: {audio_filepath}")
+        Args:
+            context: Vorheriger Text (z.B. Ende des letzten Segments), wird an den Prompt angehängt
+            deadline: Zeitbudget des Diktats (retry_policy.Deadline), sonst ein neues
 
-            # Check file size before sending
-            file_size = os.path.getsize(audio_filepath)
-            if file_size < 1000: # Less than 1KB
-                 self.logger.log(f"[API] Audio file too small ({file_size} bytes). Potential recording issue.", "warning")
+        Mit audio.stream_upload ist der Body schon gesendet (roh, WAV, ohne Codec-Auswahl) -
+        es wird nur noch auf die Antwort gewartet; schlägt der Stream fehl, folgt der normale
+        Upload mit Codec-Auswahl.
 
-            # Via Proxy für Usage-Tracking
-            if USE_PROXY:
-                self.logger.log("[API] Using Proxy for transcription")
-                result = self._transcribe_via_proxy(audio_filepath, lang_code, style_prompt)
-                if result:
-                    self.logger.log(f"[API] Whisper Response - Text length: {len(result)} chars")
-                    return result
-                else:
-                    self.logger.log("[API] Whisper returned empty text", "warning")
-                    return None
-
-            # Fallback: Direkter Groq-Zugriff
-            client = self._get_client()
-            for attempt in range(3):
-                try:
-                    with open(audio_filepath, "rb") as file:
-                        # Request-Parameter aufbauen (gemäß Groq API Docs)
-                        request_params = {
-                            "file": (audio_filepath, file.read()),
-                            "model": "whisper-large-v3",
-                            "prompt": style_prompt,
-                            "response_format": "json",
-                            "temperature": 0.0,
-                        }
-
-                        # Sprache NUR hinzufügen wenn NICHT "Automatisch" (None)
-                        if lang_code is not None:
-                            request_params["language"] = lang_code
-
-                        # Timeout wird separat übergeben (nicht Teil der API-Parameter)
-                        transcription = client.audio.transcriptions.create(
-                            **request_params,
-                            timeout=30.0
-                        )
-                        # Note: Whisper API doesn't support 'user' parameter directly
-
-                        if not transcription or not transcription.text:
-                            self.logger.log("[API] Whisper returned empty text", "warning")
-                            return None
-
-                        self.logger.log(f"[API] Whisper Response - Text length: {len(transcription.text)} chars")
-                        return transcription.text
-                except RateLimitError:
-                    if attempt < 2:
-                        time.sleep((attempt + 1) * 2)
-                        self.logger.log("[API] Rate Limit Whisper - Retry...", "warning")
-                    else:
-                        raise
+        Returns "" bei leerem Text (Stille), None bei sonstigen Fehlern; Übertragungsfehler
+        (RetryableError), DeadlineExceeded, CircuitOpenError und RequestCancelled gehen an den Aufrufer.
+        """
+        deadline = deadline or self.new_deadline()
+        try:
+            lang_code = self.config.get_language_code()  # None für "Automatisch"
+            lang_name = self.config.get("language")
+
+            style_prompt = self._style_prompt(lang_code, context)
+
+            self.logger.log(f"[API] Whisper Request - Language: {lang_name} ({lang_code or 'auto'}), Audio: {audio.filename} ({audio.duration:.1f}s)")
+
+            # Check audio size before sending
+            if audio.size < 1000: # Less than 1KB
+                 self.logger.log(f"[API] Audio too small ({audio.size} bytes). Potential recording issue.", "warning")
+
+            # Streaming-Upload: Body ist schon beim Loslassen gesendet - nur noch auf die Antwort warten
+            upload, audio.stream_upload = audio.stream_upload, None  # Wiederholen lädt normal hoch
+            if upload is not None:
+                # Wartet höchstens bis zur Deadline - kein Hilfsthread blockiert danach weiter
+                result = await asyncio.to_thread(upload.result, deadline.remaining())
+                if not upload.finished and deadline.remaining() <= 0:
+                    raise DeadlineExceeded("Streaming upload: no response within the deadline")
+                if upload.error is None:
+                    self.warmup.note_traffic()
+                    self.logger.log(f"[API] Streaming upload: {upload.bytes_sent / 1e6:.2f}MB, "
+                                    f"response {upload.response_ms or 0:.0f}ms after release")
+                    if not result:
+                        self.logger.log("[API] Whisper returned empty text", "warning")
+                    return result or ""
+                self.logger.log(f"[API] Streaming upload failed ({upload.error}) - uploading recording", "warning")
+
+            # Für den Upload kodieren (WAV oder FLAC, automatische Auswahl) - FLAC-Kodierung nicht im Loop
+            codec = self._codec.choose(audio, self.config.get("upload_codec"))
+            if codec == "wav":
+                audio = self._codec.encode(audio, codec)
+            else:
+                audio = await asyncio.to_thread(self._codec.encode, audio, codec)
+
+            async def send(route, timeout):
+                # Via Proxy für Usage-Tracking, Fallback: Direkter Groq-Zugriff
+                if route == "proxy":
+                    return await self._transcribe_via_proxy(audio, lang_code, style_prompt, timeout)
+                return await self._transcribe_direct(audio, lang_code, style_prompt, timeout)
+
+            result = await self._request("Whisper", deadline, send)
+            if not result:
+                self.logger.log("[API] Whisper returned empty text", "warning")
+                return ""
+            self.logger.log(f"[API] Whisper Response - Text length: {len(result)} chars")
+            return result
+        except RequestCancelled:
+            raise
+        except (RetryableError, DeadlineExceeded, CircuitOpenError) as e:
+            # Aufrufer entscheiden: Segment wiederholen, Fehler melden oder Rohtext-Pfad verlassen
+            self.logger.log(f"[API] Transcribe Error: {e}", "error")
+            raise
         except Exception as e:
             self.logger.log(f"[API] Transcribe Error: {e}", "error")
             return None
 
-    def _chat_via_proxy(self, messages, model, temperature, response_format=None):
-        """Chat-Completion via Proxy-Server für Usage-Tracking"""
+    def transcribe(self, audio, context=None, token=None):
+        """Blockierende Variante von transcribe_async (für Aufrufer außerhalb des Loops)"""
+        return self.engine.run(self.transcribe_async(audio, context), token)
+
+    async def _chat_via_proxy(self, messages, model, temperature, response_format, timeout):
+        """Chat-Completion via Proxy-Server für Usage-Tracking (ein Versuch)"""
         payload = {
             "messages": messages,
             "model": model,
@@ -368,38 +574,53 @@ class APIHandler:
         if response_format:
             payload["response_format"] = response_format
 
-        # Retry logic for rate limits and timeouts
-        for attempt in range(3):
-            try:
-                response = self._session.post(
-                    f"{PROXY_BASE_URL}/api/chat",
-                    json=payload,
-                    headers={
-                        "X-User-ID": self._user_id,
-                        "Content-Type": "application/json"
-                    },
-                    timeout=60.0
-                )
+        try:
+            response = await self.engine.client.post(
+                f"{PROXY_BASE_URL}/api/chat",
+                json=payload,
+                headers={
+                    "X-User-ID": self._user_id,
+                    "Content-Type": "application/json"
+                },
+                timeout=timeout
+            )
+        except httpx.TimeoutException as e:
+            raise RetryableError(f"Timeout after {timeout:.0f}s") from e
+        except httpx.TransportError as e:
+            raise RetryableError(f"Connection error ({type(e).__name__})") from e
+
+        if response.status_code == 200:
+            result = response.json()
+            return result["choices"][0]["message"]["content"]
+        raise _proxy_error(response, "Proxy chat error")
+
+    async def _chat_direct(self, messages, model, temperature, response_format, timeout):
+        """Chat-Completion direkt bei Groq (ein Versuch)"""
+        client = self._get_client()
+        try:
+            chat = await client.chat.completions.create(
+                messages=messages,
+                model=model,
+                temperature=temperature,
+                timeout=timeout,
+                response_format=response_format,
+                user=self._user_id  # Usage-Tracking pro User
+            )
+        except APIError as e:
+            retryable = _retryable_groq_error(e)
+            if retryable is None:
+                raise
+            raise retryable from e
+        return chat.choices[0].message.content
 
-                if response.status_code == 200:
-                    result = response.json()
-                    return result["choices"][0]["message"]["content"]
-                elif response.status_code == 429 and attempt < 2:
-                    time.sleep((attempt + 1) * 2)
-                    self.logger.log("[API] Rate Limit Chat - Retry...", "warning")
-                    continue
-                else:
-                    try:
-                        error_msg = response.json().get("error", response.text)
-                    except Exception:
-                        error_msg = response.text
-                    raise Exception(f"Proxy chat error: {error_msg}")
-            except requests.exceptions.Timeout:
-                if attempt < 2:
-                    time.sleep((attempt + 1) * 2)
-                    self.logger.log("[API] Timeout Chat - Retry...", "warning")
-                else:
-                    raise
+    async def chat_async(self, messages, response_format, model=LLM_MODEL, temperature=0.3, deadline=None):
+        """Chat-Completion (Proxy oder direkt) - liefert den Inhalt der Antwort"""
+        async def send(route, timeout):
+            if route == "proxy":
+                return await self._chat_via_proxy(messages, model, temperature, response_format, timeout)
+            return await self._chat_direct(messages, model, temperature, response_format, timeout)
+
+        return await self._request("Chat", deadline or self.new_deadline(), send)
 
     def _clean_output(self, text):
         """Entfernt unerwünschte Präfixe und Marker aus dem LLM-Output"""
@@ -433,7 +654,7 @@ class APIHandler:
         
         return result
 
-    def process_llm(self, text, mode):
+    async def process_llm_async(self, text, mode, deadline=None):
         # "Diktat" = Rohtext ohne LLM-Verarbeitung
         if mode == "Diktat":
             return text
@@ -460,7 +681,7 @@ class APIHandler:
         user_content = text
 
         try:
-            self.logger.log(f"[API] LLM Request - Mode: {mode}, Model: moonshotai/kimi-k2-instruct-0905")
+            self.logger.log(f"[API] LLM Request - Mode: {mode}, Model: {LLM_MODEL}")
             self.logger.log(f"[API] LLM Input (first 300 chars): {user_content[:300]}...")
 
             messages = [
@@ -471,28 +692,7 @@ class APIHandler:
                 "type": "json_schema",
                 "json_schema": json_schema
             }
-
-            # Via Proxy für Usage-Tracking
-            if USE_PROXY:
-                self.logger.log("[API] Using Proxy for chat")
-                resp = self._chat_via_proxy(
-                    messages=messages,
-                    model="moonshotai/kimi-k2-instruct-0905",
-                    temperature=0.3,
-                    response_format=response_format
-                )
-            else:
-                # Fallback: Direkter Groq-Zugriff
-                client = self._get_client()
-                chat = client.chat.completions.create(
-                    messages=messages,
-                    model="moonshotai/kimi-k2-instruct-0905",
-                    temperature=0.3,
-                    timeout=60.0,
-                    response_format=response_format,
-                    user=get_user_id()  # Usage-Tracking pro User
-                )
-                resp = chat.choices[0].message.content
+            resp = await self.chat_async(messages, response_format, deadline=deadline)
 
             self.logger.log(f"[API] LLM Raw Response: {resp[:500]}...")
 
@@ -510,9 +710,12 @@ class APIHandler:
             self.logger.log(f"[API] LLM Parsed Output (first 300 chars): {result[:300]}...")
 
             return result
-        except APITimeoutError:
+        except (APITimeoutError, DeadlineExceeded):
             self.logger.log("[API] Timeout - Server antwortet nicht", "error")
             return text
+        except CircuitOpenError:
+            self.logger.log("[API] Server nicht erreichbar - Rohtext wird verwendet", "error")
+            return text
         except AuthenticationError:
             self.logger.log("[API] Authentifizierung fehlgeschlagen - API Key prüfen!", "error")
             return text
@@ -524,7 +727,11 @@ class APIHandler:
             # Bei Fehler: Rohtext zurückgeben
             return text
 
-    def refine_text(self, text, style, custom_instruction=None):
+    def process_llm(self, text, mode, token=None):
+        """Blockierende Variante von process_llm_async"""
+        return self.engine.run(self.process_llm_async(text, mode), token)
+
+    async def refine_text_async(self, text, style, custom_instruction=None):
         """
         Überarbeitet einen Text nach verschiedenen Stilen.
 
@@ -563,28 +770,7 @@ class APIHandler:
                 "type": "json_schema",
                 "json_schema": REFINEMENT_SCHEMA
             }
-
-            # Via Proxy für Usage-Tracking
-            if USE_PROXY:
-                self.logger.log("[API] Using Proxy for refine")
-                resp = self._chat_via_proxy(
-                    messages=messages,
-                    model="moonshotai/kimi-k2-instruct-0905",
-                    temperature=0.3,
-                    response_format=response_format
-                )
-            else:
-                # Fallback: Direkter Groq-Zugriff
-                client = self._get_client()
-                chat = client.chat.completions.create(
-                    messages=messages,
-                    model="moonshotai/kimi-k2-instruct-0905",
-                    temperature=0.3,
-                    timeout=60.0,
-                    response_format=response_format,
-                    user=get_user_id()  # Usage-Tracking pro User
-                )
-                resp = chat.choices[0].message.content
+            resp = await self.chat_async(messages, response_format)
 
             self.logger.log(f"[API] Refine Raw Response: {resp[:500]}...")
 
@@ -599,9 +785,12 @@ class APIHandler:
             self.logger.log(f"[API] Refine Output (first 300 chars): {result[:300]}...")
 
             return result
-        except APITimeoutError:
+        except (APITimeoutError, DeadlineExceeded):
             self.logger.log("[API] Timeout - Server antwortet nicht", "error")
             return text
+        except CircuitOpenError:
+            self.logger.log("[API] Server nicht erreichbar - Rohtext wird verwendet", "error")
+            return text
         except AuthenticationError:
             self.logger.log("[API] Authentifizierung fehlgeschlagen - API Key prüfen!", "error")
             return text
@@ -611,3 +800,7 @@ class APIHandler:
         except Exception as e:
             self.logger.log(f"[API] Refine Error: {e}", "error")
             return text
+
+    def refine_text(self, text, style, custom_instruction=None, token=None):
+        """Blockierende Variante von refine_text_async"""
+        return self.engine.run(self.refine_text_async(text, style, custom_instruction), token)
@@ -0,0 +1,295 @@
+"""Upload-Codecs für Transkriptions-Requests (WAV oder verlustfreies FLAC) mit automatischer Auswahl"""
+import struct
+import time
+import threading
+from audio_handler import AudioClip, _get_numpy
+
+FLAC_BLOCK_SIZE = 4096
+FLAC_MAX_FIXED_ORDER = 4
+FLAC_MAX_RICE_PARAM = 14  # 15 = Escape-Code, wird nicht verwendet
+FLAC_CRC_BATCH = 256  # Frames pro vektorisiertem CRC-Durchlauf
+
+# Automatische Auswahl
+CODEC_MIN_SECONDS = 5.0  # Kurze Aufnahmen: Upload ist ohnehin klein, WAV direkt senden
+DEFAULT_UPLOAD_BYTES_PER_SECOND = 1_000_000  # Annahme bis zur ersten Messung (~8 Mbit/s)
+DEFAULT_FLAC_RATIO = 0.55  # Erwartete FLAC-Größe relativ zu WAV (Sprache, 16 kHz)
+DEFAULT_FLAC_ENCODE_FACTOR = 0.01  # Sekunden Encode-Zeit pro Sekunde Audio (wird gemessen)
+THROUGHPUT_SMOOTHING = 0.3  # EWMA-Gewicht neuer Messungen
+
+# FLAC Frame-Header Codes für gängige Sample-Raten (sonst aus STREAMINFO)
+_FLAC_SAMPLE_RATE_CODES = {
+    8000: 0b0100, 16000: 0b0101, 22050: 0b0110, 24000: 0b0111,
+    32000: 0b1000, 44100: 0b1001, 48000: 0b1010, 96000: 0b1011,
+}
+
+
+def _crc8_table():
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        table.append(crc)
+    return table
+
+
+def _crc16_table():
+    table = []
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x8005) & 0xFFFF if crc & 0x8000 else (crc << 1) & 0xFFFF
+        table.append(crc)
+    return table
+
+
+_CRC8_TABLE = _crc8_table()
+_CRC16_TABLE = _crc16_table()
+
+
+def _crc8(data):
+    crc = 0
+    for byte in data:
+        crc = _CRC8_TABLE[crc ^ byte]
+    return crc
+
+
+def _utf8_frame_number(n):
+    """FLAC kodiert die Frame-Nummer im (erweiterten) UTF-8 Format"""
+    if n < 0x80:
+        return bytes([n])
+    extra = 1
+    while n >= 1 << (5 * extra + 6):
+        extra += 1
+    first = (0xFF00 >> (extra + 1)) & 0xFF | (n >> (6 * extra))
+    tail = [0x80 | ((n >> (6 * i)) & 0x3F) for i in reversed(range(extra))]
+    return bytes([first] + tail)
+
+
+class WavEncoder:
+    """Kein Re-Encoding: der WAV-Puffer aus dem Recorder geht unverändert raus"""
+    name = "wav"
+
+    def encode(self, clip):
+        return clip
+
+
+class FlacEncoder:
+    """Verlustfreier FLAC-Encoder in reinem numpy (Fixed-Predictor + Rice-Coding, Mono 16-bit).
+
+    Prädiktor-Ordnung und Rice-Parameter werden für alle Frames gleichzeitig über eine
+    (Frames x Blockgröße) Matrix bestimmt; CRC-16 wird spaltenweise über Frame-Batches berechnet.
+    """
+    name = "flac"
+
+    def __init__(self, block_size=FLAC_BLOCK_SIZE):
+        self.block_size = block_size
+        self._crc16_np = None
+
+    def encode(self, clip):
+        np = _get_numpy()
+        samples = np.frombuffer(clip.pcm, dtype=np.int16)
+        frames = self._encode_frames(samples.astype(np.int32), clip.sample_rate)
+        header = self._stream_header(clip.sample_rate, len(samples))
+        data = header + b"".join(frames)
+        filename = clip.filename.rsplit(".", 1)[0] + ".flac"
+        return AudioClip(data, clip.sample_rate, clip.num_frames, filename=filename, mime_type="audio/flac")
+
+    def _stream_header(self, sample_rate, total_samples):
+        block = min(self.block_size, max(16, total_samples))
+        streaminfo = struct.pack(">HH", block, block)
+        streaminfo += b"\x00" * 6  # min/max frame size unbekannt
+        # 20 bit Sample-Rate, 3 bit Kanäle-1, 5 bit Bits/Sample-1, 36 bit Samples gesamt
+        packed = (sample_rate << 44) | (0 << 41) | (15 << 36) | total_samples
+        streaminfo += packed.to_bytes(8, "big")
+        streaminfo += b"\x00" * 16  # MD5 nicht berechnet (erlaubt)
+        block_header = bytes([0x80]) + len(streaminfo).to_bytes(3, "big")  # last-block Flag + STREAMINFO
+        return b"fLaC" + block_header + streaminfo
+
+    def _encode_frames(self, samples, sample_rate):
+        bs = self.block_size
+        n_full = len(samples) // bs
+        frames = []
+
+        if n_full:
+            matrix = samples[:n_full * bs].reshape(n_full, bs)
+            orders, params = self._analyze(matrix)
+            for i in range(n_full):
+                frames.append(self._encode_frame(i, matrix[i], int(orders[i]), int(params[i]), sample_rate))
+
+        rest = samples[n_full * bs:]
+        if len(rest):
+            orders, params = self._analyze(rest.reshape(1, -1))
+            frames.append(self._encode_frame(n_full, rest, int(orders[0]), int(params[0]), sample_rate))
+
+        return self._append_crc16(frames)
+
+    def _analyze(self, matrix):
+        """Wählt pro Frame die beste Fixed-Prädiktor-Ordnung und den Rice-Parameter (vektorisiert)"""
+        np = _get_numpy()
+        n_frames, length = matrix.shape
+        max_order = min(FLAC_MAX_FIXED_ORDER, length - 1)
+
+        best_bits = np.full(n_frames, np.iinfo(np.int64).max, dtype=np.int64)
+        best_order = np.zeros(n_frames, dtype=np.int64)
+        best_param = np.zeros(n_frames, dtype=np.int64)
+        residual = matrix
+        for order in range(max_order + 1):
+            if order:
+                residual = np.diff(residual, axis=1)
+            u = ((residual << 1) ^ (residual >> 31)).astype(np.int64)  # Zigzag: signed -> unsigned
+            n_res = u.shape[1]
+            # Startwert für k aus dem Mittelwert schätzen, dann nur die Nachbarn prüfen
+            mean = u.sum(axis=1) / n_res
+            k_est = np.floor(np.log2(np.maximum(mean, 1.0))).astype(np.int64)
+            for delta in (-1, 0, 1):
+                k = np.clip(k_est + delta, 0, FLAC_MAX_RICE_PARAM)
+                bits = (u >> k[:, None]).sum(axis=1) + n_res * (k + 1) + order * 16
+                better = bits < best_bits
+                best_bits = np.where(better, bits, best_bits)
+                best_order = np.where(better, order, best_order)
+                best_param = np.where(better, k, best_param)
+        return best_order, best_param
+
+    def _encode_frame(self, index, block, order, rice_param, sample_rate):
+        np = _get_numpy()
+        length = len(block)
+
+        # Frame-Header (byte-aligned, mit CRC-8)
+        if length == self.block_size == 4096:
+            size_code, size_extra = 0b1100, b""
+        else:
+            size_code, size_extra = 0b0111, struct.pack(">H", length - 1)
+        rate_code = _FLAC_SAMPLE_RATE_CODES.get(sample_rate, 0)
+        header = bytes([0xFF, 0xF8, (size_code << 4) | rate_code, 0b0000_1000])
+        header += _utf8_frame_number(index) + size_extra
+        header += bytes([_crc8(header)])
+
+        if (block == block[0]).all():
+            # Konstanter Subframe (z.B. digitale Stille)
+            subframe = bytes([0b0000_0000]) + struct.pack(">h", int(block[0]))
+            return header + subframe
+
+        residual = np.diff(block, n=order) if order else block
+        u = ((residual << 1) ^ (residual >> 31)).astype(np.int64)
+        q = u >> rice_param
+        rice_bits = int(q.sum()) + len(u) * (rice_param + 1)
+
+        if rice_bits + order * 16 >= length * 16:
+            # Verbatim-Subframe, wenn Prädiktion nichts bringt
+            return header + bytes([0b0000_0010]) + block.astype(">i2").tobytes()
+
+        # Subframe-Header: Fixed-Prädiktor, Warm-up Samples, Rice-Partition (Ordnung 0)
+        prefix_value = (0b001000 | order) << 1
+        prefix_bits = 8
+        for sample in block[:order]:
+            prefix_value = (prefix_value << 16) | (int(sample) & 0xFFFF)
+            prefix_bits += 16
+        prefix_value = (prefix_value << 10) | rice_param  # 2 bit Methode 00, 4 bit Partition-Ordnung 0, 4 bit Parameter
+        prefix_bits += 10
+
+        head = np.unpackbits(np.frombuffer(prefix_value.to_bytes((prefix_bits + 7) // 8, "big"), dtype=np.uint8))
+        head = head[len(head) - prefix_bits:]
+
+        # Rice-Codewörter: q Nullen, eine 1, dann k niedrige Bits
+        lengths = q + 1 + rice_param
+        starts = np.cumsum(lengths) - lengths
+        bits = np.zeros(int(lengths.sum()), dtype=np.uint8)
+        bits[starts + q] = 1
+        if rice_param:
+            shifts = np.arange(rice_param - 1, -1, -1)
+            low = (u[:, None] >> shifts) & 1
+            bits[(starts + q + 1)[:, None] + np.arange(rice_param)] = low
+
+        # packbits füllt das letzte Byte mit Nullen auf = FLAC Byte-Alignment
+        return header + np.packbits(np.concatenate((head, bits))).tobytes()
+
+    def _append_crc16(self, frames):
+        """Hängt an jeden Frame die CRC-16 an - spaltenweise über Batches von Frames vektorisiert.
+
+        Führende Null-Bytes ändern eine CRC mit Startwert 0 nicht, daher werden die Frames
+        rechtsbündig in eine Matrix gelegt und alle CRCs Byte-Spalte für Byte-Spalte parallel gerechnet.
+        """
+        np = _get_numpy()
+        if self._crc16_np is None:
+            self._crc16_np = np.array(_CRC16_TABLE, dtype=np.uint16)
+        table = self._crc16_np
+
+        result = []
+        for batch_start in range(0, len(frames), FLAC_CRC_BATCH):
+            batch = frames[batch_start:batch_start + FLAC_CRC_BATCH]
+            width = max(len(f) for f in batch)
+            matrix = np.zeros((len(batch), width), dtype=np.uint8)
+            for row, frame in enumerate(batch):
+                matrix[row, width - len(frame):] = np.frombuffer(frame, dtype=np.uint8)
+            crc = np.zeros(len(batch), dtype=np.uint16)
+            for column in matrix.T:
+                crc = (crc << 8) ^ table[(crc >> 8) ^ column]
+            result.extend(frame + struct.pack(">H", int(c)) for frame, c in zip(batch, crc))
+        return result
+
+
+class UploadCodecSelector:
+    """Wählt den Upload-Codec anhand Aufnahmelänge und zuletzt gemessenem Upload-Durchsatz.
+
+    FLAC lohnt sich, wenn die eingesparte Upload-Zeit größer ist als die Encode-Zeit.
+    """
+
+    def __init__(self, logger):
+        self.logger = logger
+        self.encoders = {"wav": WavEncoder(), "flac": FlacEncoder()}
+        self._lock = threading.Lock()
+        self.upload_bytes_per_second = None  # EWMA, None = noch keine Messung
+        self.flac_ratio = DEFAULT_FLAC_RATIO
+        self.flac_encode_factor = DEFAULT_FLAC_ENCODE_FACTOR
+
+    def choose(self, clip, preference="auto"):
+        """Gibt den Namen des zu verwendenden Encoders zurück"""
+        if preference in self.encoders:
+            return preference
+        if clip.duration < CODEC_MIN_SECONDS:
+            return "wav"
+
+        with self._lock:
+            throughput = self.upload_bytes_per_second or DEFAULT_UPLOAD_BYTES_PER_SECOND
+            saved_seconds = clip.size * (1 - self.flac_ratio) / throughput
+            encode_seconds = clip.duration * self.flac_encode_factor
+        return "flac" if saved_seconds > encode_seconds else "wav"
+
+    def encode(self, clip, preference="auto"):
+        """Kodiert den Clip für den Upload und loggt Codec-Wahl und Kompressionsrate"""
+        name = self.choose(clip, preference)
+        if name == "wav":
+            self.logger.log(f"[Codec] wav ({clip.size} bytes, {clip.duration:.1f}s)")
+            return clip
+
+        try:
+            start = time.perf_counter()
+            encoded = self.encoders[name].encode(clip)
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            self.logger.log(f"[Codec] {name} encode failed, sending wav: {e}", "warning")
+            return clip
+
+        ratio = encoded.size / clip.size if clip.size else 1.0
+        with self._lock:
+            self.flac_ratio += (ratio - self.flac_ratio) * THROUGHPUT_SMOOTHING
+            if clip.duration:
+                factor = elapsed / clip.duration
+                self.flac_encode_factor += (factor - self.flac_encode_factor) * THROUGHPUT_SMOOTHING
+        self.logger.log(
+            f"[Codec] {name}: {clip.size} -> {encoded.size} bytes "
+            f"(ratio {ratio:.2f}, {clip.size / max(encoded.size, 1):.1f}x, encode {elapsed * 1000:.0f}ms)"
+        )
+        return encoded
+
+    def record_upload(self, num_bytes, seconds):
+        """Aktualisiert den gemessenen Upload-Durchsatz (Bytes / Request-Dauer)"""
+        if seconds <= 0 or num_bytes <= 0:
+            return
+        measured = num_bytes / seconds
+        with self._lock:
+            if self.upload_bytes_per_second is None:
+                self.upload_bytes_per_second = measured
+            else:
+                self.upload_bytes_per_second += (measured - self.upload_bytes_per_second) * THROUGHPUT_SMOOTHING
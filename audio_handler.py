@@ -3,14 +3,34 @@ import os
 import time
 import wave
 import struct
-import shutil
+import queue
 import threading
-from collections import deque
 from config import APP_DATA_DIR
+from audio_telemetry import StreamTelemetry
 
 MAX_DURATION_SECONDS = 600
+RING_HEADROOM_SECONDS = 10  # Reserve im Ringpuffer, damit Slices nach dem Stop nicht sofort überschrieben werden
+CONSUMER_POLL_SECONDS = 0.02  # Consumer-Thread prüft alle 20ms auf neue Frames
+CONSUMER_IDLE_SECONDS = 1.0  # Ohne Stream (Ruhemodus) nicht mit 50 Hz aufwachen
+CONSUMER_CHUNK_FRAMES = 512  # Blockgröße für Statistik/Segmentierung (32ms bei 16 kHz)
 MIN_DURATION_SECONDS = 2.0
 MIN_AUDIO_RMS = 0.005  # Mindest-Audiopegel (RMS) - unter diesem Wert gilt als "kein Audio"
+CLIP_LEVEL = 0.99  # Samples ab diesem Betrag gelten als übersteuert
+# Aufnahme direkt im Upload-Format (16-bit PCM): Pegel/Schwellen bleiben auf der float-Skala (-1..1)
+SAMPLE_DTYPE = 'int16'
+INT16_SCALE = 1.0 / 32768
+LOW_LATENCY_BLOCK_MS = 10  # Niedrige-Latenz-Modus: feste Blockgröße statt Treiber-Standard
+
+# Segmentierte Transkription: lange Diktate werden schon während der Aufnahme an Sprechpausen geschnitten
+SEGMENT_MIN_SECONDS = 20.0  # Segment frühestens nach dieser Länge schneiden
+SEGMENT_PAUSE_SECONDS = 0.6  # Mindestlänge einer Pause für einen Schnitt
+SEGMENT_MAX_SECONDS = 60.0  # Ohne Pause wird spätestens hier hart geschnitten
+SEGMENT_OVERLAP_SECONDS = 1.5  # Harte Schnitte überlappen, damit kein Wort verloren geht
+
+# Freihand-Modus: jede Äußerung wird am Ende des Sprecherwechsels geschnitten
+TURN_PAUSE_SECONDS = 0.8  # Pause nach Sprache = Ende der Äußerung
+TURN_MIN_SPEECH_SECONDS = 0.3  # Kürzere Geräusche (Husten, Klicken) sind keine Äußerung
+TURN_PREROLL_SECONDS = 0.3  # Vor dem Sprechbeginn behalten (leise Anlaute)
 
 # Spezielle Rückgabewerte
 NO_AUDIO_DETECTED = "__NO_AUDIO_DETECTED__"
@@ -38,36 +58,161 @@ def _get_numpy():
     return _np
 
 
+WAV_HEADER_SIZE = 44
+
+
+def build_wav_header(num_frames, sample_rate, channels=1, sample_width=2):
+    """Erzeugt einen 44-Byte RIFF/WAV Header für PCM-Daten"""
+    data_size = num_frames * channels * sample_width
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate,
+        sample_rate * channels * sample_width, channels * sample_width, sample_width * 8,
+        b'data', data_size
+    )
+
+
+class AudioClip:
+    """Aufnahme im Speicher: fertige WAV-Bytes plus Metadaten (ersetzt temp_recording.wav)"""
+
+    def __init__(self, data, sample_rate, num_frames, filename="recording.wav", mime_type="audio/wav"):
+        self.data = data  # bytes, bytearray oder memoryview
+        self.sample_rate = sample_rate
+        self.num_frames = num_frames
+        self.filename = filename
+        self.mime_type = mime_type
+        self.removed_seconds = 0.0  # Von der VAD entfernte Stille
+        self.overlap_seconds = 0.0  # Überlappung mit dem vorherigen Segment (harter Schnitt)
+        self.complete = True  # False = Langdiktat, Clip enthält nur das letzte Fenster der Aufnahme
+        self.stats = None  # Aufnahme-Zusammenfassung (rms, peak, clip_ratio, speech_ratio)
+        self.stream_upload = None  # streaming_upload.StreamingUpload - Body beim Loslassen schon gesendet
+        self.released_at = None  # perf_counter beim Loslassen des Hotkeys (Latenzmessung)
+
+    @property
+    def size(self):
+        return len(self.data)
+
+    @property
+    def duration(self):
+        return self.num_frames / self.sample_rate if self.sample_rate else 0.0
+
+    @property
+    def pcm(self):
+        """16-bit PCM Nutzdaten ohne Header (nur für WAV-Clips)"""
+        return memoryview(self.data)[WAV_HEADER_SIZE:]
+
+    def __repr__(self):
+        return f"<AudioClip {self.filename} {self.duration:.1f}s {self.size} bytes>"
+
+    @classmethod
+    def from_wav_file(cls, path):
+        """Lädt eine WAV-Datei von der Platte (z.B. last_recording.wav nach Neustart)"""
+        with wave.open(path, 'rb') as wf:
+            sample_rate = wf.getframerate()
+            num_frames = wf.getnframes()
+            frames = wf.readframes(num_frames)
+        # Header normalisieren, damit pcm immer bei WAV_HEADER_SIZE beginnt
+        data = build_wav_header(num_frames, sample_rate) + frames
+        return cls(data, sample_rate, num_frames, filename=os.path.basename(path))
+
+
 class AudioRecorder:
-    def __init__(self, device_index=None, audio_sensitivity=None):
-        self.recording = []
+    def __init__(self, device_index=None, audio_sensitivity=None, vad_trim=True, vad_max_pause_seconds=1.0, spool=False,
+                 low_latency=False):
         self.stream = None
         self.sample_rate = 16000
         self.is_recording = False
         self.start_time = 0
-        self.filename = os.path.join(APP_DATA_DIR, "temp_recording.wav")
         self.last_recording_file = os.path.join(APP_DATA_DIR, "last_recording.wav")
+        self._last_recording = None  # AudioClip der letzten Aufnahme (für Wiederholen)
         self._devices_cache = None
+        self._probe_cache = None  # device_probe.DeviceProbeCache (lazy)
         self.device_index = device_index
         self.audio_sensitivity = audio_sensitivity if audio_sensitivity else MIN_AUDIO_RMS
         self.current_rms = 0
+        # VAD: Stille am Rand entfernen und lange Pausen kürzen (vor dem Encoding)
+        self.vad_trim = vad_trim
+        self.vad_max_pause_seconds = vad_max_pause_seconds
         # Thread-safety lock for recording state
         self._recording_lock = threading.Lock()
         self.monitor_stream = None
         # Unified stream for zero-latency recording
         self._unified_stream = None
+        self._stream_lock = threading.RLock()  # Öffnen/Schließen aus Hook, Ruhemodus-Thread und UI
+        self._stream_open = threading.Event()  # Weckt den Consumer nach dem Ruhemodus
+        self.stream_idle = False  # Stream absichtlich geschlossen (audio_idle) - kein Gerätefehler
         self._current_device_index = None
         # Für automatische Geräte-Wiederherstellung
         self._last_device_name = None
         # Pre-recording buffer (500ms before button press)
         self._pre_buffer_ms = 500
         self._pre_buffer_samples = int(self.sample_rate * self._pre_buffer_ms / 1000)
-        # Use deque with maxlen for O(1) append/pop instead of O(n) list.pop(0)
-        self._pre_buffer_max_chunks = max(1, self._pre_buffer_samples // 1024 + 2)
-        self._pre_buffer = deque(maxlen=self._pre_buffer_max_chunks)
-        # Cached numpy functions for callback performance
+        # Preallocated ring buffer: Pre-Buffer und Aufnahme sind Slices davon (keine Allokation im Callback)
+        self._max_record_frames = int(MAX_DURATION_SECONDS * self.sample_rate)
+        self._ring_capacity = self._max_record_frames + self._pre_buffer_samples + int(RING_HEADROOM_SECONDS * self.sample_rate)
+        self._ring = None  # Wird beim Stream-Start alloziert (numpy lazy)
+        self._write_pos = 0  # Gesamtzahl geschriebener Frames (monoton steigend)
+        self._stream_start_pos = 0  # _write_pos beim Öffnen des Streams - älteres Audio ist kein Pre-Buffer
+        self._record_start_pos = 0
+        # Consumer-Thread: liest hinter der Schreibposition her (Single-Producer/Single-Consumer)
+        self._consumer_thread = None
+        self._consumer_stop = threading.Event()
+        self._meter_pos = 0  # Bis hier wurde der Live-Pegel berechnet
+        self._stats_pos = 0  # Bis hier wurde die Aufnahme ausgewertet
+        # Laufende Statistik der Aufnahme (vom Consumer akkumuliert, O(1) beim Stop)
+        self._stat_sum_sq = 0.0
+        self._stat_peak = 0.0
+        self._stat_clipped = 0
+        self._stat_blocks = 0
+        self._stat_voiced_blocks = 0
+        # Callback-Laufzeit (Worst Case als Metrik)
+        self._perf_counter = time.perf_counter
+        self._callback_count = 0
+        self._callback_total_seconds = 0.0
+        self._callback_max_seconds = 0.0
+        # Watchdog: Zeitstempel des letzten Callbacks und Blockgröße
+        self._stream_started_at = 0.0
+        self._last_callback_at = 0.0
+        self._callback_frames = 0
+        # Telemetrie pro Stream (Intervalle, Overflows, Latenz, Hotkey bis erster Block)
+        self.telemetry = StreamTelemetry()
+        self.low_latency = low_latency  # Explizite Blockgröße + latency='low' (wirkt beim nächsten Stream-Start)
+        # Native Geräterate: Stream läuft z.B. mit 48 kHz, der Callback resampelt auf sample_rate
+        self._capture_rate = self.sample_rate
+        self._resampler = None  # audio_resample.PolyphaseResampler oder None (Gerät liefert 16 kHz)
+        self._resample_count = 0
+        self._resample_total_seconds = 0.0
+        self._resample_max_seconds = 0.0
+        # Cached numpy functions for consumer performance
         self._np_sqrt = None
-        self._np_mean = None
+        self._np_dot = None
+        self._np_count_nonzero = None
+        self._np_float32 = None
+        # Segmentierung: Objekt mit submit(audio), submit_missing(reason) und close(), z.B. SegmentPipeline
+        self.segment_sink = None
+        # Langdiktat: kein Stopp nach MAX_DURATION_SECONDS, Audio fließt nur über die Segmente ab
+        self.long_dictation = False
+        # Freihand-Modus: Segmente an jedem Äußerungsende statt nach SEGMENT_MIN_SECONDS (mit segment_sink)
+        self.turn_detection = False
+        self._turn_mode = False
+        self._turn_voiced_frames = 0
+        self._unlimited = False
+        self._segment_overlap_frames = 0
+        # Spool: Aufnahme parallel in eine gemappte WAV-Datei (Absturz-Sicherheit, O(1) Stop)
+        self.spool_enabled = spool
+        self._spool = None
+        self._next_spool = None  # Vorbereitet im Hintergrund - Dateianlage nicht im Hotkey-Pfad
+        self._spool_pos = 0
+        # Streaming-Upload: Objekt mit append(samples), finish() und abort(), z.B. StreamingUpload
+        self.upload_sink = None
+        self._upload = None
+        self._upload_pos = 0
+        self._segment_queue = None
+        self._segment_thread = None
+        self._segment_start_pos = 0
+        self._segment_silent_frames = 0
+        self._segment_count = 0
 
     def get_input_devices(self, test_functionality=True):
         """Gibt eine gefilterte Liste relevanter Eingabegeräte zurück: [{'id': 1, 'name': 'Mic X'}]
@@ -94,19 +239,14 @@ class AudioRecorder:
             "()",  # Leere Klammern wie "Mikrofonarray 1 ()"
         ]
         
-        input_devices = []
-        seen_names = set()  # Für Duplikat-Erkennung
+        # Kandidaten pro Namen gruppieren (erste 25 Zeichen - Namen werden manchmal abgeschnitten)
+        candidates = {}  # name_key -> [device ids] in Enumerationsreihenfolge
         
         for i, dev in enumerate(devices):
             if dev["max_input_channels"] > 0:
                 name = dev["name"]
                 name_lower = name.lower()
                 
-                # Duplikate überspringen (erste 25 Zeichen vergleichen - Namen werden manchmal abgeschnitten)
-                name_key = name[:25]
-                if name_key in seen_names:
-                    continue
-                
                 # Ausschluss-Keywords prüfen
                 if any(kw in name_lower for kw in exclude_keywords):
                     continue
@@ -119,17 +259,77 @@ class AudioRecorder:
                 if len(name.strip()) < 3:
                     continue
                 
-                # Funktionalitätstest: Gerät muss sich öffnen lassen
-                if test_functionality:
-                    if not self._test_device(i):
-                        print(f"[Audio] Device {i} '{name}' nicht verfügbar - übersprungen")
-                        continue
-                
-                seen_names.add(name_key)
-                input_devices.append({"id": i, "name": name})
+                candidates.setdefault(name[:25], []).append(i)
+        
+        if test_functionality:
+            # Funktionalitätstest: pro Name das erste Gerät, das sich öffnen lässt (parallel, gecacht)
+            chosen = []
+            pending = {key: list(ids) for key, ids in candidates.items()}
+            while pending:
+                batch = {key: ids.pop(0) for key, ids in pending.items()}
+                results = self._probe_devices(list(batch.values()), devices)
+                for key, device_id in batch.items():
+                    if results.get(device_id):
+                        chosen.append(device_id)
+                        del pending[key]
+                    else:
+                        print(f"[Audio] Device {device_id} '{devices[device_id]['name']}' nicht verfügbar - übersprungen")
+                        if not pending[key]:
+                            del pending[key]
+        else:
+            chosen = [ids[0] for ids in candidates.values()]
         
+        input_devices = [{"id": i, "name": devices[i]["name"]} for i in sorted(chosen)]
         self._devices_cache = input_devices
         return input_devices
+
+    def _get_probe_cache(self):
+        """Persistenter Cache der Geräte-Tests (lazy, liest eine kleine JSON-Datei)"""
+        if self._probe_cache is None:
+            from device_probe import DeviceProbeCache
+            self._probe_cache = DeviceProbeCache()
+        return self._probe_cache
+
+    def _probe_devices(self, device_ids, devices):
+        """Testet Geräte parallel mit Timeout pro Gerät - unveränderte Geräte kommen aus dem Cache
+
+        Returns:
+            dict {device_id: bool}
+        """
+        from device_probe import device_fingerprint, run_parallel
+        sd = _get_sounddevice()
+        cache = self._get_probe_cache()
+        try:
+            hostapis = sd.query_hostapis()
+        except Exception:
+            hostapis = ()
+
+        results = {}
+        to_probe = []
+        fingerprints = {}
+        for device_id in device_ids:
+            fingerprints[device_id] = device_fingerprint(devices[device_id], hostapis)
+            cached = cache.get(fingerprints[device_id])
+            if cached is None:
+                to_probe.append(device_id)
+            else:
+                results[device_id] = cached
+
+        if to_probe:
+            started = time.perf_counter()
+            probed = run_parallel(to_probe, self._test_device)
+            for device_id in to_probe:
+                if device_id in probed:
+                    cache.put(fingerprints[device_id], probed[device_id])
+                    results[device_id] = probed[device_id]
+                else:
+                    # Timeout: nicht cachen, beim nächsten Mal erneut prüfen
+                    print(f"[Audio] Device {device_id} probe timed out")
+                    results[device_id] = False
+            cache.save()
+            print(f"[Audio] Probed {len(to_probe)} devices in {(time.perf_counter() - started) * 1000:.0f}ms "
+                  f"({len(device_ids) - len(to_probe)} cached)")
+        return results
     
     def _test_device(self, device_index):
         """Testet ob ein Gerät tatsächlich geöffnet werden kann"""
@@ -221,21 +421,385 @@ class AudioRecorder:
         return None, True
 
     def _unified_callback(self, indata, frames, time_info, status):
-        """Ein Callback für sowohl Monitoring als auch Recording"""
-        if indata.size > 0:
-            # Use cached numpy functions for performance
-            self.current_rms = self._np_sqrt(self._np_mean(indata * indata))
-
-            # Always keep pre-buffer filled - deque auto-removes oldest (O(1))
-            self._pre_buffer.append(indata.copy())
-
-            # Nur bei aktiver Aufnahme Daten speichern
-            with self._recording_lock:
-                if self.is_recording:
-                    if len(self.recording) * frames / self.sample_rate < MAX_DURATION_SECONDS:
-                        self.recording.append(indata.copy())
-                    else:
-                        self.is_recording = False
+        """PortAudio-Callback: kopiert nur in den Ringpuffer und veröffentlicht die Schreibposition.
+
+        Läuft das Gerät nicht mit sample_rate, wird der Block vorher resampelt (kleine
+        Allokation pro Block). Kein Lock - Metering, Statistik und Segmentierung macht der Consumer-Thread.
+        """
+        started = self._perf_counter()
+        self._last_callback_at = started
+        self._callback_frames = frames
+        self.telemetry.on_callback(started, frames, time_info, status)
+        resampler = self._resampler
+        if resampler is not None and frames > 0:
+            samples = resampler.process(indata[:, 0])
+            frames = len(samples)
+            resampled = self._perf_counter() - started
+            self._resample_count += 1
+            self._resample_total_seconds += resampled
+            if resampled > self._resample_max_seconds:
+                self._resample_max_seconds = resampled
+        else:
+            samples = indata[:, 0]
+        if frames > 0:
+            ring = self._ring
+            pos = self._write_pos % self._ring_capacity
+            first = min(frames, self._ring_capacity - pos)
+            ring[pos:pos + first] = samples[:first]
+            if first < frames:
+                ring[:frames - first] = samples[first:]
+            # Single-Producer: Position erst NACH dem Kopieren veröffentlichen
+            self._write_pos += frames
+
+        elapsed = self._perf_counter() - started
+        self._callback_count += 1
+        self._callback_total_seconds += elapsed
+        if elapsed > self._callback_max_seconds:
+            self._callback_max_seconds = elapsed
+
+    def _consumer_loop(self):
+        """Consumer-Thread: verarbeitet neue Frames aus dem Ringpuffer (Metering, Statistik, Segmente)"""
+        while not self._consumer_stop.wait(CONSUMER_POLL_SECONDS):
+            if not self._stream_open.is_set() and not self.is_recording:
+                self._stream_open.wait(CONSUMER_IDLE_SECONDS)
+                continue
+            try:
+                with self._recording_lock:
+                    self._process_captured()
+            except Exception as e:
+                print(f"[Audio] Consumer error: {e}")
+
+    def _process_captured(self, end=None, final=False):
+        """Verarbeitet alle seit dem letzten Aufruf geschriebenen Frames (unter _recording_lock)"""
+        if self._ring is None:
+            return
+        if end is None:
+            end = self._write_pos
+
+        # Live-Pegel aus dem jüngsten Block
+        if end != self._meter_pos:
+            n = min(CONSUMER_CHUNK_FRAMES, end)
+            recent = self._read_ring(end - n, end)
+            recent = recent.astype(self._np_float32)  # 2 KB - float-Dot ist schneller als int-Akkumulation
+            self.current_rms = self._np_sqrt(float(self._np_dot(recent, recent)) / n) * INT16_SCALE
+            self._meter_pos = end
+
+        if not self.is_recording:
+            return
+
+        # Aufnahme in festen Blöcken auswerten (unabhängig von der Blockgröße des Treibers)
+        limit = end if self._unlimited else min(end, self._record_start_pos + self._max_record_frames)
+        while self._stats_pos < limit:
+            chunk_end = min(self._stats_pos + CONSUMER_CHUNK_FRAMES, limit)
+            if chunk_end - self._stats_pos < CONSUMER_CHUNK_FRAMES and not final:
+                break  # Unvollständiger Block - beim nächsten Durchlauf
+            self._process_chunk(self._stats_pos, chunk_end)
+            self._stats_pos = chunk_end
+
+        if self._spool is not None and self._spool_pos < self._stats_pos:
+            try:
+                self._spool.append(self._read_ring(self._spool_pos, self._stats_pos))
+                self._spool_pos = self._stats_pos
+            except Exception as e:
+                # Z.B. Platte voll - Aufnahme läuft ohne Spool weiter (Ringpuffer)
+                print(f"[Audio] Spool write failed, continuing in memory: {e}")
+                self._spool.discard()
+                self._spool = None
+
+        if self._upload is not None and self._upload_pos < self._stats_pos:
+            self._upload.append(self._read_ring(self._upload_pos, self._stats_pos))
+            self._upload_pos = self._stats_pos
+
+        if not final and not self._unlimited and end >= self._record_start_pos + self._max_record_frames:
+            self.is_recording = False
+
+    def _process_chunk(self, start, end):
+        """Statistik und Segment-Erkennung für einen Block der laufenden Aufnahme"""
+        chunk = self._read_ring(start, end)
+        frames = end - start
+        scaled = chunk.astype(self._np_float32)
+        sum_sq = float(self._np_dot(scaled, scaled)) * (INT16_SCALE * INT16_SCALE)
+        rms = (sum_sq / frames) ** 0.5
+        peak = max(int(chunk.max()), -int(chunk.min())) * INT16_SCALE
+
+        self._stat_sum_sq += sum_sq
+        if peak > self._stat_peak:
+            self._stat_peak = peak
+        if peak >= CLIP_LEVEL:
+            # Selten - nur dann lohnt sich die Zählung
+            clip_level = int(CLIP_LEVEL * 32768)
+            self._stat_clipped += int(self._np_count_nonzero(chunk >= clip_level))
+            self._stat_clipped += int(self._np_count_nonzero(chunk <= -clip_level))
+        self._stat_blocks += 1
+        if rms >= self.audio_sensitivity:
+            self._stat_voiced_blocks += 1
+
+        if self._segment_queue is not None:
+            if self._turn_mode:
+                self._track_turn_boundary(frames, rms, end)
+            else:
+                self._track_segment_boundary(frames, rms, end)
+
+    def _reset_stats(self):
+        """Setzt die Statistik beim Aufnahmestart zurück (der Pre-Buffer wird vom Consumer mitgezählt)"""
+        self._stat_sum_sq = 0.0
+        self._stat_peak = 0.0
+        self._stat_clipped = 0
+        self._stat_blocks = 0
+        self._stat_voiced_blocks = 0
+        self._stats_pos = self._record_start_pos
+
+    def get_recording_summary(self, num_frames):
+        """Zusammenfassung der laufenden/letzten Aufnahme aus den Akkumulatoren (O(1))"""
+        if num_frames <= 0:
+            return {'rms': 0.0, 'peak': 0.0, 'clip_ratio': 0.0, 'speech_ratio': 0.0, 'duration': 0.0}
+        return {
+            'rms': (self._stat_sum_sq / num_frames) ** 0.5,
+            'peak': self._stat_peak,
+            'clip_ratio': self._stat_clipped / num_frames,
+            'speech_ratio': self._stat_voiced_blocks / self._stat_blocks if self._stat_blocks else 0.0,
+            'duration': num_frames / self.sample_rate,
+        }
+
+    def get_capture_metrics(self):
+        """Callback-Laufzeit (Worst Case / Durchschnitt), Resampling-Kosten und Rückstand des Consumer-Threads"""
+        count = self._callback_count
+        resample_count = self._resample_count
+        return {
+            'callback_count': count,
+            'callback_avg_ms': self._callback_total_seconds / count * 1000 if count else 0.0,
+            'callback_max_ms': self._callback_max_seconds * 1000,
+            'consumer_lag_ms': (self._write_pos - self._meter_pos) / self.sample_rate * 1000,
+            'capture_rate': self._capture_rate,
+            'resample_avg_ms': self._resample_total_seconds / resample_count * 1000 if resample_count else 0.0,
+            'resample_max_ms': self._resample_max_seconds * 1000,
+            'status_flags': self.telemetry.status_flags,
+            'last_status': str(self.telemetry.last_status) if self.telemetry.last_status else None,
+        }
+
+    def get_diagnostics(self):
+        """Telemetrie des laufenden Streams plus Callback-/Resampling-Metriken (Diagnose-Ansicht, Export)"""
+        diagnostics = self.telemetry.summary()
+        diagnostics.update(self.get_capture_metrics())
+        return diagnostics
+
+    def _read_ring(self, start_pos, end_pos):
+        """Liest [start_pos, end_pos) aus dem Ringpuffer - View wenn zusammenhängend, sonst eine Kopie"""
+        np = _get_numpy()
+        start = start_pos % self._ring_capacity
+        length = end_pos - start_pos
+        if start + length <= self._ring_capacity:
+            return self._ring[start:start + length]
+        return np.concatenate((self._ring[start:], self._ring[:start + length - self._ring_capacity]))
+
+    def _track_segment_boundary(self, frames, rms, end):
+        """Erkennt Sprechpausen und übergibt fertige Segmente an den Segment-Thread (unter _recording_lock)"""
+        if rms < self.audio_sensitivity:
+            self._segment_silent_frames += frames
+        else:
+            self._segment_silent_frames = 0
+
+        length = end - self._segment_start_pos
+        if length >= SEGMENT_MAX_SECONDS * self.sample_rate:
+            self._cut_hard(end)
+            return
+
+        if self._segment_silent_frames < SEGMENT_PAUSE_SECONDS * self.sample_rate:
+            return
+
+        if length < SEGMENT_MIN_SECONDS * self.sample_rate:
+            return
+
+        # Nur Positionen weitergeben - Kopieren + WAV schreiben passiert im Segment-Thread
+        self._segment_queue.put((self._segment_start_pos, end, self._segment_overlap_frames))
+        self._segment_start_pos = end
+        self._segment_overlap_frames = 0
+        self._segment_silent_frames = 0
+
+    def _cut_hard(self, end):
+        """Keine Pause gefunden: hart schneiden, das nächste Segment beginnt etwas früher (Überlappung)"""
+        overlap = int(SEGMENT_OVERLAP_SECONDS * self.sample_rate)
+        self._segment_queue.put((self._segment_start_pos, end, self._segment_overlap_frames))
+        self._segment_start_pos = end - overlap
+        self._segment_overlap_frames = overlap
+        self._segment_silent_frames = 0
+
+    def _track_turn_boundary(self, frames, rms, end):
+        """Freihand-Modus: schneidet jede Äußerung an der Pause danach (unter _recording_lock)
+
+        Stille vor dem Sprechbeginn wird nicht gesammelt (nur TURN_PREROLL_SECONDS Vorlauf),
+        ohne Pause greift wie sonst der harte Schnitt nach SEGMENT_MAX_SECONDS.
+        """
+        rate = self.sample_rate
+        if rms >= self.audio_sensitivity:
+            self._turn_voiced_frames += frames
+            self._segment_silent_frames = 0
+        else:
+            self._segment_silent_frames += frames
+            if not self._turn_voiced_frames:
+                # Noch keine Sprache: Segmentanfang mitziehen
+                self._segment_start_pos = max(self._segment_start_pos, end - int(TURN_PREROLL_SECONDS * rate))
+                self._segment_overlap_frames = 0
+                return
+
+        if end - self._segment_start_pos >= SEGMENT_MAX_SECONDS * rate:
+            self._cut_hard(end)
+            self._turn_voiced_frames = 0
+            return
+
+        if self._segment_silent_frames < TURN_PAUSE_SECONDS * rate:
+            return
+
+        if self._turn_voiced_frames >= TURN_MIN_SPEECH_SECONDS * rate:
+            self._segment_queue.put((self._segment_start_pos, end, self._segment_overlap_frames))
+        self._segment_start_pos = end
+        self._segment_overlap_frames = 0
+        self._turn_voiced_frames = 0
+
+    def _segment_worker(self, segment_queue, sink):
+        """Kodiert geschnittene Segmente als WAV im Speicher und reicht sie an den Sink weiter
+
+        Hängt der Thread hinterher (Sink blockiert bei MAX_PENDING), kann der Ring den Anfang
+        eines Segments schon überschrieben haben - dann geht submit_missing() statt falschem
+        Audio an den Sink. Geprüft wird auch nach dem Kopieren (_read_ring liefert eine Sicht).
+        """
+        while True:
+            segment = segment_queue.get()
+            if segment is None:
+                break
+            try:
+                start_pos, end_pos, overlap_frames = segment
+                self._segment_count += 1
+                if not self._ring_holds(start_pos):
+                    self._segment_lost(sink, start_pos, end_pos)
+                    continue
+                segment_array = self._read_ring(start_pos, end_pos)
+                clip = self._encode_clip(
+                    segment_array, f"segment_{self._segment_count}.wav", self._keep_frames(segment_array)
+                )
+                if not self._ring_holds(start_pos):
+                    self._segment_lost(sink, start_pos, end_pos)
+                    continue
+                clip.overlap_seconds = overlap_frames / self.sample_rate
+                print(f"[Audio] Segment {self._segment_count}: {clip.duration:.1f}s")
+                sink.submit(clip)
+            except Exception as e:
+                print(f"[Audio] Segment error: {e}")
+        sink.close()
+
+    def _ring_holds(self, start_pos):
+        """Liegen die Samples ab start_pos noch im Ring (nicht vom Consumer überschrieben)?"""
+        return self._write_pos - start_pos <= self._ring_capacity
+
+    def _segment_lost(self, sink, start_pos, end_pos):
+        seconds = (end_pos - start_pos) / self.sample_rate
+        print(f"[Audio] Segment {self._segment_count} ({seconds:.1f}s) overwritten in the ring before encoding - dropped")
+        sink.submit_missing(f"{seconds:.1f}s overwritten before encoding")
+
+    def _keep_frames(self, recording_array):
+        """Vektorisierte VAD: Frames ohne Rand-Stille und mit gekürzten Pausen (None = alles behalten)"""
+        if not self.vad_trim:
+            return None
+        try:
+            from audio_vad import keep_frames  # Lazy import (audio_vad nutzt audio_handler)
+            return keep_frames(
+                recording_array, self.sample_rate,
+                max_pause_seconds=self.vad_max_pause_seconds,
+                max_threshold=self.audio_sensitivity
+            )
+        except Exception as e:
+            print(f"[Audio] VAD error, sending untrimmed audio: {e}")
+            return None
+
+    def _encode_clip(self, recording_array, filename="recording.wav", keep=None):
+        """Schreibt int16-Samples in einen WAV-Puffer im Speicher - die einzige Kopie der Aufnahme.
+
+        Mit VAD-Frames (keep) werden nur die behaltenen Frames direkt in den Puffer kopiert.
+        """
+        np = _get_numpy()
+        if keep is None:
+            num_frames = len(recording_array)
+        else:
+            from audio_vad import VAD_FRAME_MS, apply_keep, kept_length
+            frame_len = int(self.sample_rate * VAD_FRAME_MS / 1000)
+            num_frames = kept_length(len(recording_array), keep, frame_len)
+        buffer = bytearray(WAV_HEADER_SIZE + num_frames * 2)
+        buffer[:WAV_HEADER_SIZE] = build_wav_header(num_frames, self.sample_rate)
+        pcm = np.frombuffer(buffer, dtype=np.int16, offset=WAV_HEADER_SIZE)
+        if keep is None:
+            np.copyto(pcm, recording_array)
+        else:
+            apply_keep(recording_array, keep, frame_len, out=pcm)
+        clip = AudioClip(memoryview(buffer), self.sample_rate, num_frames, filename=filename)
+        clip.removed_seconds = (len(recording_array) - num_frames) / self.sample_rate
+        return clip
+
+    def _prepare_spool(self):
+        """Legt den Spool für die nächste Aufnahme an (Hintergrund-Thread)"""
+        try:
+            from audio_spool import RecordingSpool
+            spool = RecordingSpool.create(self.sample_rate, self._max_record_frames + self._pre_buffer_samples)
+        except Exception as e:
+            print(f"[Audio] Could not prepare spool: {e}")
+            return
+        with self._recording_lock:
+            if self._next_spool is None:
+                self._next_spool = spool
+                return
+        spool.discard()
+
+    def _finalize_spool(self, spool, summary):
+        """Schließt den Spool ab: Header patchen, Datei kürzen - kein Encoding (O(1))"""
+        from audio_spool import cleanup_finished
+        clip = spool.finalize()
+        clip.stats = summary
+        print(f"[Audio] Spool finalized: {clip}")
+        # Ältere fertige Spools aufräumen (noch gemappte bleiben bis zum nächsten Start liegen)
+        threading.Thread(target=cleanup_finished, args=(clip.path,), daemon=True).start()
+        return clip
+
+    def find_orphaned_recordings(self):
+        """Beim Start: nicht abgeschlossene Spools (Absturz/Standby während der Aufnahme)
+
+        Returns:
+            list of dict {'path', 'duration', 'modified'}
+        """
+        from audio_spool import find_orphans, orphan_info, promote_latest
+        promote_latest(self.last_recording_file)
+        own = {spool.path for spool in (self._spool, self._next_spool) if spool is not None}
+        orphans = []
+        for path in find_orphans():
+            if path in own:
+                continue
+            try:
+                orphans.append(orphan_info(path))
+            except Exception as e:
+                print(f"[Audio] Unreadable orphan spool {path}: {e}")
+        return orphans
+
+    def recover_recording(self, path):
+        """Repariert einen Waisen-Spool und gibt ihn als AudioClip zurück (auch als letzte Aufnahme)"""
+        from audio_spool import recover_orphan
+        clip = recover_orphan(path)
+        self._last_recording = clip
+        return clip
+
+    def discard_recording(self, path):
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"[Audio] Could not remove orphan spool: {e}")
+
+    def _persist_last_recording(self, clip):
+        """Schreibt die letzte Aufnahme im Hintergrund auf die Platte (nicht im kritischen Pfad)"""
+        temp_path = self.last_recording_file + ".tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(clip.data)
+            os.replace(temp_path, self.last_recording_file)
+            print(f"[Audio] Last recording saved: {self.last_recording_file}")
+        except Exception as e:
+            print(f"[Audio] Could not save last recording: {e}")
 
     def _restart_unified_stream(self):
         """Startet den unified stream (nach Device-Wechsel etc.)"""
@@ -255,7 +819,17 @@ class AudioRecorder:
         # Pre-load numpy BEFORE stream starts to avoid blocking in callback
         np = _get_numpy()
         self._np_sqrt = np.sqrt
-        self._np_mean = np.mean
+        self._np_dot = np.dot
+        self._np_count_nonzero = np.count_nonzero
+        self._np_float32 = np.float32
+        if self._ring is None:
+            self._ring = np.zeros(self._ring_capacity, dtype=SAMPLE_DTYPE)
+        if self._consumer_thread is None or not self._consumer_thread.is_alive():
+            self._consumer_stop.clear()
+            self._consumer_thread = threading.Thread(target=self._consumer_loop, daemon=True)
+            self._consumer_thread.start()
+        if self.spool_enabled and self._next_spool is None:
+            threading.Thread(target=self._prepare_spool, daemon=True).start()
 
         sd = _get_sounddevice()
 
@@ -279,77 +853,188 @@ class AudioRecorder:
         devices_to_try.append(("default", None))
 
         for source, dev_id in devices_to_try:
-            try:
-                self._unified_stream = sd.InputStream(
-                    samplerate=self.sample_rate,
-                    device=dev_id,
-                    channels=1,
-                    callback=self._unified_callback
-                )
-                self._unified_stream.start()
-                self._current_device_index = dev_id
-
-                if source == "preferred":
-                    print(f"[Audio] Unified stream started on preferred device {dev_id}")
-                elif source == "by-name":
-                    print(f"[Audio] Unified stream started on device found by name: {dev_id}")
-                else:
-                    print(f"[Audio] Unified stream started on DEFAULT device (fallback)")
+            # Native Rate zuerst (kein Resampling im Treiber/Windows-Mixer), dann 16 kHz direkt
+            rates = [self._native_rate(sd, dev_id), self.sample_rate]
+            for rate in dict.fromkeys(r for r in rates if r):
+                try:
+                    self._set_capture_rate(rate)
+                    latency_args = {}
+                    if self.low_latency:
+                        latency_args = {'blocksize': int(rate * LOW_LATENCY_BLOCK_MS / 1000), 'latency': 'low'}
+                    self._unified_stream = sd.InputStream(
+                        samplerate=rate,
+                        device=dev_id,
+                        channels=1,
+                        dtype=SAMPLE_DTYPE,
+                        callback=self._unified_callback,
+                        **latency_args
+                    )
+                    self.telemetry.reset_stream(
+                        rate, latency_args.get('blocksize', 0), latency_args.get('latency'), self.low_latency, dev_id
+                    )
+                    try:
+                        self.telemetry.reported_latency_ms = self._unified_stream.latency * 1000
+                    except Exception:
+                        pass
+                    self._stream_started_at = self._perf_counter()
+                    self._stream_start_pos = self._write_pos
+                    self._unified_stream.start()
+                    self._current_device_index = dev_id
+                    self._stream_open.set()
+
+                    if source == "preferred":
+                        print(f"[Audio] Unified stream started on preferred device {dev_id} ({rate} Hz)")
+                    elif source == "by-name":
+                        print(f"[Audio] Unified stream started on device found by name: {dev_id} ({rate} Hz)")
+                    else:
+                        print(f"[Audio] Unified stream started on DEFAULT device (fallback, {rate} Hz)")
 
-                return dev_id  # Gib die tatsächlich verwendete Device-ID zurück
+                    return dev_id  # Gib die tatsächlich verwendete Device-ID zurück
 
-            except Exception as e:
-                print(f"[Audio] Failed to start stream on {source} device {dev_id}: {e}")
-                continue
+                except Exception as e:
+                    print(f"[Audio] Failed to start stream on {source} device {dev_id} at {rate} Hz: {e}")
+                    continue
 
         # Alle Versuche fehlgeschlagen
         print("[Audio] CRITICAL: Could not start audio stream on any device!")
         self._unified_stream = None
+        self._stream_open.clear()
         return None
 
+    def _native_rate(self, sd, dev_id):
+        """Standard-Abtastrate des Geräts (z.B. 44100/48000), None wenn nicht abfragbar"""
+        try:
+            info = sd.query_devices(dev_id) if dev_id is not None else sd.query_devices(kind='input')
+            return int(info['default_samplerate'])
+        except Exception:
+            return None
+
+    def _set_capture_rate(self, rate):
+        """Resampler für die Stream-Rate vorbereiten (vor dem Start - nicht im Callback)"""
+        self._capture_rate = rate
+        if rate == self.sample_rate:
+            self._resampler = None
+        else:
+            from audio_resample import PolyphaseResampler
+            self._resampler = PolyphaseResampler(rate, self.sample_rate)
+        self._resample_count = 0
+        self._resample_total_seconds = 0.0
+        self._resample_max_seconds = 0.0
+
+    def restart_stream(self):
+        """Öffnet einen hängenden Stream neu (Watchdog) - auch während einer Aufnahme, der Ringpuffer bleibt.
+
+        abort() statt stop(): ein hängender Treiber liefert die ausstehenden Puffer nie.
+        Gibt None zurück, wenn der Stream inzwischen geschlossen wurde (Ruhemodus, Mikrofontest).
+        """
+        with self._stream_lock:
+            stream = self._unified_stream
+            if stream is None:
+                return None
+            try:
+                stream.abort()
+                stream.close()
+            except Exception as e:
+                print(f"[Audio] Could not abort stalled stream: {e}")
+            self._unified_stream = None
+            return self._start_unified_stream(self._current_device_index, self._last_device_name)
+
     def start_monitor(self, device_index=None, device_name=None):
         """Startet den unified stream für Monitoring (und bereitet Recording vor)"""
-        if self._unified_stream:
-            return self._current_device_index  # Bereits aktiv
+        with self._stream_lock:
+            if self._unified_stream:
+                return self._current_device_index  # Bereits aktiv
 
-        return self._start_unified_stream(device_index, device_name)
+            return self._start_unified_stream(device_index, device_name)
 
     def stop_monitor(self):
-        """Stoppt den unified stream komplett (nur bei App-Schließung oder Device-Wechsel)"""
-        if self._unified_stream:
-            try:
-                self._unified_stream.stop()
-                self._unified_stream.close()
-            except:
-                pass
-            self._unified_stream = None
+        """Stoppt den unified stream komplett (App-Schließung, Device-Wechsel, Ruhemodus)"""
+        with self._stream_lock:
+            self._stream_open.clear()
+            self._stream_start_pos = self._write_pos  # Ring-Inhalt ist ab jetzt veraltet
+            if self._unified_stream:
+                try:
+                    self._unified_stream.stop()
+                    self._unified_stream.close()
+                except:
+                    pass
+                self._unified_stream = None
         self.current_rms = 0
 
-    def start_recording(self, device_index=None):
-        """Startet Aufnahme - nutzt unified stream fuer sofortigen Start"""
+    def start_recording(self, device_index=None, pressed_at=None):
+        """Startet Aufnahme - nutzt unified stream fuer sofortigen Start
+
+        Args:
+            pressed_at: perf_counter() beim Tastendruck (Telemetrie: Hotkey bis erster Block)
+        """
         with self._recording_lock:
             if self.is_recording:
                 return
 
-            # Prepend pre-buffer (last 500ms before button press)
-            if self._pre_buffer:
-                self.recording = list(self._pre_buffer)
-                pre_samples = sum(len(chunk) for chunk in self.recording)
+            # Prepend pre-buffer (last 500ms before button press) - nur die Startposition zurücksetzen.
+            # Nur Audio des laufenden Streams: nach dem Ruhemodus stammt der Ring-Inhalt von vor dem Schließen
+            pre_samples = min(self._write_pos - self._stream_start_pos, self._pre_buffer_samples)
+            self._record_start_pos = self._write_pos - pre_samples
+            if pre_samples:
                 print(f"[Audio] Pre-buffer: {pre_samples} samples ({pre_samples/self.sample_rate*1000:.0f}ms)")
-            else:
-                self.recording = []
+            self._reset_stats()
 
             self.start_time = time.time() - (self._pre_buffer_ms / 1000)
+
+            # Segment-Thread starten, falls ein Sink gesetzt ist
+            self._segment_start_pos = self._record_start_pos
+            self._segment_silent_frames = 0
+            self._segment_overlap_frames = 0
+            self._segment_count = 0
+            self._turn_mode = bool(self.turn_detection and self.segment_sink is not None)
+            self._turn_voiced_frames = 0
+            # Langdiktat nur mit Segment-Sink: sonst müsste die ganze Aufnahme in den Ringpuffer passen
+            self._unlimited = bool((self.long_dictation or self._turn_mode) and self.segment_sink is not None)
+
+            # Spool übernehmen (im Normalfall schon vorbereitet) und den nächsten anlegen lassen
+            self._spool = None
+            self._spool_pos = self._record_start_pos
+            if self.spool_enabled:
+                self._spool, self._next_spool = self._next_spool, None
+                if self._spool is None:
+                    # Nichts vorbereitet (z.B. Spool gerade erst aktiviert) - einmalig synchron anlegen
+                    try:
+                        from audio_spool import RecordingSpool
+                        self._spool = RecordingSpool.create(self.sample_rate, self._max_record_frames + self._pre_buffer_samples)
+                    except Exception as e:
+                        print(f"[Audio] Could not create spool: {e}")
+                threading.Thread(target=self._prepare_spool, daemon=True).start()
+            # Streaming-Upload übernehmen (gilt nur für diese Aufnahme)
+            self._upload, self.upload_sink = self.upload_sink, None
+            self._upload_pos = self._record_start_pos
+            if self.segment_sink is not None:
+                self._segment_queue = queue.SimpleQueue()
+                self._segment_thread = threading.Thread(
+                    target=self._segment_worker,
+                    args=(self._segment_queue, self.segment_sink),
+                    daemon=True
+                )
+                self._segment_thread.start()
+            else:
+                self._segment_queue = None
+
             self.is_recording = True
+            self.telemetry.mark_recording_start(pressed_at)
 
-        # Wenn unified stream laeuft: SOFORT aufnehmen (zero latency!)
-        if self._unified_stream:
-            print("[Audio] INSTANT recording start (unified stream active)")
-            return
+        # Wenn unified stream laeuft: SOFORT aufnehmen (zero latency!). Nicht auf den Lock warten -
+        # hält ihn gerade Watchdog, Registry oder Ruhemodus, übernimmt das Öffnen im Hintergrund
+        if self._stream_lock.acquire(blocking=False):
+            try:
+                if self._unified_stream:
+                    print("[Audio] INSTANT recording start (unified stream active)")
+                    return
+            finally:
+                self._stream_lock.release()
 
-        # Fallback: Unified stream nicht aktiv, starte ihn mit Recording
-        print(f"[Audio] Starting unified stream for recording on device: {device_index}")
-        self._start_unified_stream(device_index)
+        # Fallback: Unified stream nicht aktiv (z.B. Ruhemodus). Gerätesuche und PortAudio-Start
+        # dauern - nie im Hotkey-Hook; die Aufnahme beginnt mit dem ersten Block des neuen Streams
+        print(f"[Audio] Opening unified stream in background for recording on device: {device_index}")
+        threading.Thread(target=self.start_monitor, args=(device_index,), name="StreamReopen", daemon=True).start()
 
     def stop_recording(self):
         """Stoppt Aufnahme - laesst unified stream weiterlaufen fuer naechste Aufnahme"""
@@ -359,60 +1044,130 @@ class AudioRecorder:
             if not self.is_recording:
                 print("[Audio] Early exit: Not recording")
                 return None
+            start_pos = self._record_start_pos
+            if self._unlimited:
+                end_pos = self._write_pos
+            else:
+                end_pos = min(self._write_pos, start_pos + self._max_record_frames)
+            # Restliche Frames synchron auswerten (nur der Rückstand seit dem letzten Consumer-Durchlauf)
+            self._process_captured(end=end_pos, final=True)
             self.is_recording = False
-            recording_snapshot = list(self.recording)  # Snapshot under lock
-            self.recording = []
+            summary = self.get_recording_summary(end_pos - start_pos)
+            spool = self._spool
+            self._spool = None
+            upload = self._upload
+            self._upload = None
+
+            # Segment-Modus: Rest ab letztem Schnitt als letztes Segment, dann Sink schließen
+            segment_queue = self._segment_queue
+            self._segment_queue = None
+            turn_mode = self._turn_mode
+            if segment_queue is not None:
+                if turn_mode:
+                    # Freihand: angefangene Äußerung nur, wenn darin gesprochen wurde
+                    if self._turn_voiced_frames >= TURN_MIN_SPEECH_SECONDS * self.sample_rate:
+                        segment_queue.put((self._segment_start_pos, end_pos, self._segment_overlap_frames))
+                elif start_pos < self._segment_start_pos and end_pos - self._segment_start_pos > self._segment_overlap_frames:
+                    segment_queue.put((self._segment_start_pos, end_pos, self._segment_overlap_frames))
+                segment_queue.put(None)
+
+        if turn_mode:
+            # Freihand: der Text kommt vollständig aus den Äußerungen - keine Gesamtaufnahme kodieren
+            print(f"[Audio] Hands-free dictation stopped after {summary['duration']:.0f}s")
+            if spool is not None:
+                spool.discard()
+            if upload is not None:
+                upload.abort()
+            return None
 
         duration = time.time() - self.start_time
         print(f"[Audio] Recording duration: {duration:.2f}s (min: {MIN_DURATION_SECONDS}s)")
 
         if duration < MIN_DURATION_SECONDS:
             print(f"[Audio] Recording too short ({duration:.2f}s < {MIN_DURATION_SECONDS}s)")
+            if spool is not None:
+                spool.discard()
+            if upload is not None:
+                upload.abort()
             return None
 
-        if not recording_snapshot:
+        if end_pos <= start_pos or self._ring is None:
             print("[Audio] No recording data captured!")
+            if spool is not None:
+                spool.discard()
+            if upload is not None:
+                upload.abort()
             return None
 
-        np = _get_numpy()
-
-        recording_array = np.concatenate(recording_snapshot, axis=0)
-        total_duration = len(recording_array) / self.sample_rate
-        print(f"[Audio] Total samples: {len(recording_array)}, duration: {total_duration:.2f}s")
+        total_duration = summary['duration']
+        print(f"[Audio] Total samples: {end_pos - start_pos}, duration: {total_duration:.2f}s")
 
-        if total_duration > MAX_DURATION_SECONDS:
-            max_samples = int(MAX_DURATION_SECONDS * self.sample_rate)
-            recording_array = recording_array[:max_samples]
-
-        # Audio-Pegel prüfen (RMS = Root Mean Square)
+        # Audio-Pegel prüfen (RMS = Root Mean Square) - aus den laufenden Akkumulatoren, ohne die Samples anzufassen
         # Bei komplett stiller Aufnahme (falsches Mikrofon, kein Pegel) warnen
-        rms = np.sqrt(np.mean(recording_array ** 2))
-        print(f"[Audio] RMS Level: {rms:.6f}, Threshold: {self.audio_sensitivity}")
-        
+        rms = summary['rms']
+        print(
+            f"[Audio] RMS Level: {rms:.6f}, Threshold: {self.audio_sensitivity}, "
+            f"Peak: {summary['peak']:.3f}, Clip: {summary['clip_ratio']:.2%}, Speech: {summary['speech_ratio']:.0%}"
+        )
+
+        metrics = self.get_capture_metrics()
+        print(f"[Audio] Callback: max {metrics['callback_max_ms']:.3f}ms, avg {metrics['callback_avg_ms']:.3f}ms")
+        if self._resampler is not None:
+            print(f"[Audio] Resampling {metrics['capture_rate']} Hz: max {metrics['resample_max_ms']:.3f}ms, avg {metrics['resample_avg_ms']:.3f}ms per block")
+        if metrics['status_flags']:
+            print(f"[Audio] Stream status flags: {metrics['status_flags']} (last: {metrics['last_status']})")
+        telemetry = self.telemetry.summary()
+        if telemetry['press_to_first_block_last_ms'] is not None:
+            print(f"[Audio] Hotkey to first block: {telemetry['press_to_first_block_last_ms']:.1f}ms, "
+                  f"max callback interval {telemetry['max_interval_ms']:.1f}ms")
+
         if rms < self.audio_sensitivity:
             print(f"[Audio] Kein Audiopegel erkannt (RMS: {rms:.6f} < {self.audio_sensitivity})")
+            if spool is not None:
+                spool.discard()
+            if upload is not None:
+                upload.abort()
             return NO_AUDIO_DETECTED
 
-        # Konvertiere zu 16-bit PCM
-        wav_data = (recording_array * 32767).astype(np.int16)
-        
-        # Speichere mit eingebautem wave Modul (kein scipy nötig!)
-        with wave.open(self.filename, 'wb') as wf:
-            wf.setnchannels(1)  # Mono
-            wf.setsampwidth(2)  # 16-bit = 2 bytes
-            wf.setframerate(self.sample_rate)
-            wf.writeframes(wav_data.tobytes())
-
-        # Save a copy as last_recording for repeat functionality
-        try:
-            shutil.copy2(self.filename, self.last_recording_file)
-            print(f"[Audio] Last recording saved: {self.last_recording_file}")
-        except Exception as e:
-            print(f"[Audio] Could not save last recording: {e}")
+        if upload is not None:
+            # Body sofort abschließen - der Server arbeitet, während hier noch kodiert wird
+            upload.finish()
 
-        file_size = os.path.getsize(self.filename)
-        print(f"[Audio] Saved: {self.filename} ({file_size} bytes)")
-        return self.filename
+        if spool is not None:
+            # Spool-Modus: die Datei ist schon die fertige WAV (ohne VAD-Trim - das wäre wieder O(n))
+            try:
+                clip = self._finalize_spool(spool, summary)
+                clip.stream_upload = upload
+                self._last_recording = clip
+                return clip
+            except Exception as e:
+                print(f"[Audio] Spool finalize failed, encoding from memory: {e}")
+
+        # Slice statt Concatenate (MAX_DURATION_SECONDS ist über end_pos bereits begrenzt)
+        # Langdiktat: nur das letzte Fenster liegt noch im Ringpuffer - der Text kommt aus den Segmenten
+        window_start = max(start_pos, end_pos - self._max_record_frames)
+        if window_start > start_pos:
+            print(f"[Audio] Long dictation: keeping last {(end_pos - window_start) / self.sample_rate:.0f}s of {total_duration:.0f}s")
+        recording_array = self._read_ring(window_start, end_pos)
+
+        # Stille entfernen / Pausen kürzen (weniger Upload, weniger Whisper-Halluzinationen)
+        keep = self._keep_frames(recording_array)
+
+        # Samples liegen schon als int16 vor: eine Kopie direkt in den WAV-Puffer
+        clip = self._encode_clip(recording_array, keep=keep)
+        if clip.removed_seconds:
+            print(f"[Audio] VAD: {clip.removed_seconds:.2f}s removed ({clip.duration:.2f}s remaining)")
+        print(f"[Audio] Memory: ring {self._ring.nbytes / 1e6:.1f}MB, clip {clip.size / 1e6:.1f}MB")
+        clip.complete = window_start == start_pos
+        clip.stats = summary
+        clip.stream_upload = upload
+
+        # Kopie für Wiederholen: im Speicher halten, Platte nur lazy im Hintergrund
+        self._last_recording = clip
+        threading.Thread(target=self._persist_last_recording, args=(clip,), daemon=True).start()
+
+        print(f"[Audio] Encoded in memory: {clip}")
+        return clip
 
     def check_device_health(self):
         """
@@ -435,6 +1190,9 @@ class AudioRecorder:
 
         # Kein Stream aktiv - nichts zu prüfen
         if not self._unified_stream:
+            if self.stream_idle:
+                result['message'] = 'Ruhemodus (Stream geschlossen)'
+                return result
             result['healthy'] = False
             result['message'] = 'Kein Audio-Stream aktiv'
             return result
@@ -455,19 +1213,23 @@ class AudioRecorder:
 
             # Versuche Recovery
             try:
-                # Stream schließen falls noch offen
-                try:
-                    self._unified_stream.stop()
-                    self._unified_stream.close()
-                except:
-                    pass
-                self._unified_stream = None
-
-                # Neuen Stream starten
-                new_device = self._start_unified_stream(
-                    self._current_device_index,
-                    self._last_device_name
-                )
+                with self._stream_lock:
+                    if self._unified_stream is None:
+                        result['message'] = 'Stream inzwischen geschlossen'
+                        return result
+                    # Stream schließen falls noch offen
+                    try:
+                        self._unified_stream.stop()
+                        self._unified_stream.close()
+                    except:
+                        pass
+                    self._unified_stream = None
+
+                    # Neuen Stream starten
+                    new_device = self._start_unified_stream(
+                        self._current_device_index,
+                        self._last_device_name
+                    )
 
                 if new_device is not None:
                     result['recovered'] = True
@@ -494,11 +1256,15 @@ class AudioRecorder:
 
                 # Versuche Recovery auf anderem Device
                 try:
-                    self.stop_monitor()
-                    new_device = self._start_unified_stream(
-                        self._current_device_index,
-                        self._last_device_name
-                    )
+                    with self._stream_lock:
+                        if self._unified_stream is None:
+                            result['message'] = 'Stream inzwischen geschlossen'
+                            return result
+                        self.stop_monitor()
+                        new_device = self._start_unified_stream(
+                            self._current_device_index,
+                            self._last_device_name
+                        )
 
                     if new_device is not None:
                         result['recovered'] = True
@@ -515,15 +1281,30 @@ class AudioRecorder:
 
         return result
 
+    def has_last_recording(self):
+        """True wenn eine letzte Aufnahme (Speicher oder Platte) vorhanden ist"""
+        return self._last_recording is not None or os.path.exists(self.last_recording_file)
+
     def get_last_recording(self):
-        """Returns path to last recording if it exists"""
+        """Returns last recording as AudioClip (from memory, or from disk after restart)"""
+        if self._last_recording is not None:
+            return self._last_recording
         if os.path.exists(self.last_recording_file):
-            return self.last_recording_file
+            try:
+                self._last_recording = AudioClip.from_wav_file(self.last_recording_file)
+                return self._last_recording
+            except Exception as e:
+                print(f"[Audio] Could not load last recording: {e}")
         return None
 
     def close(self):
         """Schließt den Recorder und gibt Ressourcen frei."""
         self.stop_monitor()
+        self._consumer_stop.set()
+        with self._recording_lock:
+            next_spool, self._next_spool = self._next_spool, None
+        if next_spool is not None:
+            next_spool.discard()
         if self.stream:
             try:
                 self.stream.stop()
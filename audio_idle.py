@@ -0,0 +1,151 @@
+"""Ruhemodus für den unified stream: nach Inaktivität schließen, bei Modifier-Taste/Fokus vorab wieder öffnen"""
+import time
+import threading
+
+IDLE_MINUTES_DEFAULT = 15
+REARM_POLL_SECONDS = 0.005  # Nur während des Wiederöffnens: auf den ersten Callback warten
+REARM_TIMEOUT_SECONDS = 3.0
+REARM_KEY_PREFIXES = ("ctrl", "alt", "shift", "cmd")  # Modifier kündigen oft den Hotkey an
+IDLE_CHECK_SECONDS = 60.0  # Im Ruhemodus: von außen geöffneten Stream (Einstellungen, Mikrofontest) bemerken
+
+
+class StreamIdlePolicy:
+    """Schließt den Stream nach `idle_minutes` ohne Diktat und öffnet ihn vorausschauend wieder.
+
+    arm() ist nicht blockierend (wird aus dem pynput-Hook bei jeder Modifier-Taste und beim
+    Fensterfokus aufgerufen); das Öffnen passiert in diesem Thread, damit der Pre-Buffer schon
+    läuft, bevor der eigentliche Hotkey kommt. Gemessen werden die Wiederöffnungszeit (arm bis
+    erster Callback) und die Prozess-CPU mit und ohne Stream (process_time, % eines Kerns).
+    """
+
+    def __init__(self, recorder, config, idle_minutes=IDLE_MINUTES_DEFAULT):
+        self.recorder = recorder
+        self.config = config
+        self.idle_seconds = idle_minutes * 60 if idle_minutes else 0
+        self.idle = False
+        self._last_activity = time.monotonic()
+        self._cpu_mark = (time.monotonic(), time.process_time())
+        self._arm_requested = None  # (reason, perf_counter) - gesetzt aus dem Hook
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.idle_count = 0
+        self.rearm_count = 0
+        self.last_rearm_ms = None
+        self.last_rearm_reason = None
+        self.cpu_stream_on_pct = None
+        self.cpu_stream_off_pct = None
+
+    def start(self):
+        if not self.idle_seconds or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="StreamIdle", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def touch(self):
+        """Aktivität (Aufnahme-Start/-Stopp) - verschiebt den Ruhemodus"""
+        self._last_activity = time.monotonic()
+        if not self.idle:
+            self._cpu_mark = (self._last_activity, time.process_time())
+
+    def arm(self, reason):
+        """Stream vorsorglich wieder öffnen (nicht blockierend, aus dem Hotkey-Hook)"""
+        self._last_activity = time.monotonic()
+        if self.idle and self._arm_requested is None:
+            self._arm_requested = (reason, time.perf_counter())
+            self._wake.set()
+
+    def get_metrics(self):
+        return {
+            'idle_minutes': self.idle_seconds / 60,
+            'idle_active': self.idle,
+            'idle_count': self.idle_count,
+            'idle_rearm_count': self.rearm_count,
+            'idle_rearm_ms': self.last_rearm_ms,
+            'idle_rearm_reason': self.last_rearm_reason,
+            'cpu_stream_on_pct': self.cpu_stream_on_pct,
+            'cpu_stream_off_pct': self.cpu_stream_off_pct,
+        }
+
+    def _loop(self):
+        while not self._stop.is_set():
+            if self.idle:
+                timeout = IDLE_CHECK_SECONDS
+            else:
+                timeout = max(1.0, self._last_activity + self.idle_seconds - time.monotonic())
+            self._wake.wait(timeout)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self._step()
+            except Exception as e:
+                print(f"[Idle] Error: {e}")
+
+    def _step(self):
+        recorder = self.recorder
+        if self.idle:
+            if self._arm_requested is not None:
+                self._rearm()
+            elif recorder._unified_stream is not None:
+                # Von außen wieder geöffnet (Einstellungen, Mikrofontest)
+                self._leave_idle()
+            return
+
+        if recorder.is_recording or recorder._unified_stream is None:
+            return
+        if time.monotonic() - self._last_activity < self.idle_seconds:
+            return
+        self._enter_idle()
+
+    def _cpu_percent(self):
+        wall_start, cpu_start = self._cpu_mark
+        wall = time.monotonic() - wall_start
+        return (time.process_time() - cpu_start) / wall * 100 if wall > 0 else None
+
+    def _enter_idle(self):
+        self.cpu_stream_on_pct = self._cpu_percent()
+        recorder = self.recorder
+        with recorder._stream_lock:
+            if recorder.is_recording:
+                return  # Hotkey kam gerade dazwischen
+            recorder.stream_idle = True
+            recorder.stop_monitor()
+        self.idle = True
+        self.idle_count += 1
+        self._cpu_mark = (time.monotonic(), time.process_time())
+        cpu = f"{self.cpu_stream_on_pct:.2f}%" if self.cpu_stream_on_pct is not None else "-"
+        print(f"[Idle] No dictation for {self.idle_seconds / 60:.0f} min - stream closed (CPU with stream: {cpu})")
+
+    def _leave_idle(self):
+        self.cpu_stream_off_pct = self._cpu_percent()
+        self.idle = False
+        self.recorder.stream_idle = False
+        self.touch()
+
+    def _rearm(self):
+        reason, requested_at = self._arm_requested
+        recorder = self.recorder
+        count = recorder._callback_count
+        self._leave_idle()
+        if recorder._unified_stream is None:
+            recorder.start_monitor(self.config.get("device_index"), self.config.get("device_name"))
+
+        # Wiederöffnungszeit: Anforderung bis zum ersten Block (ab dann füllt sich der Pre-Buffer)
+        deadline = time.perf_counter() + REARM_TIMEOUT_SECONDS
+        while recorder._callback_count == count and time.perf_counter() < deadline:
+            time.sleep(REARM_POLL_SECONDS)
+        self._arm_requested = None
+        if recorder._callback_count == count:
+            print(f"[Idle] Re-arm ({reason}): no audio after {REARM_TIMEOUT_SECONDS:.0f}s")
+            return
+        self.rearm_count += 1
+        self.last_rearm_ms = (time.perf_counter() - requested_at) * 1000
+        self.last_rearm_reason = reason
+        off = f"{self.cpu_stream_off_pct:.2f}%" if self.cpu_stream_off_pct is not None else "-"
+        print(f"[Idle] Re-armed on {reason} in {self.last_rearm_ms:.0f}ms (CPU without stream: {off})")
@@ -0,0 +1,204 @@
+"""Gemeinsamer Pegelmesser: mehrere Eingabegeräte + Haupt-Recorder, dezimierte Snapshots für die UI"""
+import time
+import threading
+from audio_handler import _get_numpy, _get_sounddevice
+
+METER_PUBLISH_SECONDS = 0.05  # Snapshots mit 20 Hz - unabhängig von Geräteanzahl und Blockgröße
+METER_SAMPLE_RATE = 16000
+METER_BLOCKSIZE = 1024
+MAIN_SOURCE = "main"  # Schlüssel für den Live-Pegel des Haupt-Recorders (current_rms)
+
+# Spalten im Pegel-Array
+RMS = 0  # Maximum seit dem letzten Snapshot (dezimiert)
+PEAK = 1  # Maximum seit dem letzten Snapshot
+MAX_RMS = 2  # Maximum seit dem Öffnen (Sortierung im Mikrofontest)
+
+
+class LevelSnapshot:
+    """Unveränderlicher Stand aller Quellen: keys[i] gehört zu levels[i] (RMS, PEAK, MAX_RMS)"""
+
+    def __init__(self, keys, levels):
+        self.keys = keys
+        self.levels = levels
+
+    def rms(self, key):
+        try:
+            return float(self.levels[self.keys.index(key), RMS])
+        except ValueError:
+            return 0.0
+
+
+class LevelMeter:
+    """Pegel-Service für den Mikrofontest und die Pegelanzeige in den Einstellungen.
+
+    Geräte werden im Hintergrund parallel (mit Timeout pro Gerät) geöffnet. Die Callbacks
+    schreiben nur Skalare in ein vorab alloziertes Array (keine numpy-Temporaries pro Block);
+    ein einziger Publisher-Thread kopiert es mit METER_PUBLISH_SECONDS und ruft die
+    Abonnenten auf - nur wenn sich etwas geändert hat.
+    """
+
+    def __init__(self, recorder=None, interval=METER_PUBLISH_SECONDS):
+        self.recorder = recorder  # Optional: current_rms als Quelle MAIN_SOURCE
+        self.interval = interval
+        self._keys = [MAIN_SOURCE] if recorder is not None else []
+        self._levels = None
+        self._streams = []
+        self._devices_lock = threading.Lock()
+        self._generation = 0  # Erhöht bei close_devices - verspätet geöffnete Streams werden verworfen
+        self._subscribers = []
+        self._subscribers_lock = threading.Lock()
+        self._thread = None
+
+    def subscribe(self, callback):
+        """callback(LevelSnapshot) aus dem Publisher-Thread (in Qt per Signal weiterreichen)"""
+        with self._subscribers_lock:
+            self._subscribers.append(callback)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._publish_loop, name="LevelMeter", daemon=True)
+                self._thread.start()
+
+    def unsubscribe(self, callback):
+        with self._subscribers_lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def open_devices(self, device_ids, probe_cache=None, on_failed=None):
+        """Öffnet alle Geräte parallel im Hintergrund (kehrt sofort zurück).
+
+        Args:
+            probe_cache: device_probe.DeviceProbeCache - bekannt defekte Geräte werden nicht geöffnet
+            on_failed: Callback(device_id) für Geräte, die sich nicht öffnen lassen
+        """
+        np = _get_numpy()
+        self.close_devices()
+        with self._devices_lock:
+            base = [MAIN_SOURCE] if self.recorder is not None else []
+            self._keys = base + list(device_ids)
+            self._levels = np.zeros((len(self._keys), 3), dtype=np.float32)
+            generation = self._generation
+            offset = len(base)
+        slots = {device_id: offset + i for i, device_id in enumerate(device_ids)}
+        threading.Thread(
+            target=self._open_all, args=(slots, generation, probe_cache, on_failed), daemon=True
+        ).start()
+
+    def close_devices(self):
+        """Schließt alle Geräte-Streams (der Haupt-Recorder bleibt Quelle)"""
+        with self._devices_lock:
+            self._generation += 1
+            streams, self._streams = self._streams, []
+            self._keys = [MAIN_SOURCE] if self.recorder is not None else []
+            self._levels = None
+        for stream in streams:
+            try:
+                stream.stop()
+                stream.close()
+            except Exception:
+                pass
+
+    def _open_all(self, slots, generation, probe_cache, on_failed):
+        from device_probe import device_fingerprint, run_parallel
+        sd = _get_sounddevice()
+        try:
+            fingerprints = {}
+            if probe_cache is not None:
+                devices = sd.query_devices()
+                hostapis = sd.query_hostapis()
+                fingerprints = {i: device_fingerprint(devices[i], hostapis) for i in slots}
+
+            to_open = []
+            for device_id in slots:
+                if device_id in fingerprints and probe_cache.get(fingerprints[device_id]) is False:
+                    if on_failed:
+                        on_failed(device_id)
+                else:
+                    to_open.append(device_id)
+
+            results = run_parallel(to_open, lambda device_id: self._open_stream(device_id, slots[device_id], generation))
+            for device_id in to_open:
+                ok = results.get(device_id)
+                if ok is not None and device_id in fingerprints:
+                    probe_cache.put(fingerprints[device_id], ok)
+                if not ok and on_failed and generation == self._generation:
+                    on_failed(device_id)
+            if probe_cache is not None:
+                probe_cache.save()
+        except Exception as e:
+            print(f"[Meter] Open error: {e}")
+
+    def _open_stream(self, device_id, slot, generation):
+        """Öffnet ein Gerät (Worker-Thread) - True auch wenn inzwischen geschlossen wurde"""
+        sd = _get_sounddevice()
+        levels = self._levels
+        if levels is None or generation != self._generation:
+            return True
+        try:
+            stream = sd.InputStream(
+                samplerate=METER_SAMPLE_RATE,
+                device=device_id,
+                channels=1,
+                dtype='float32',
+                blocksize=METER_BLOCKSIZE,
+                callback=self._make_callback(levels, slot)
+            )
+            stream.start()
+        except Exception as e:
+            print(f"[Meter] Device {device_id} failed: {e}")
+            return False
+        with self._devices_lock:
+            if generation == self._generation:
+                self._streams.append(stream)
+                print(f"[Meter] Stream started for device {device_id}")
+                return True
+        # Während des Öffnens geschlossen
+        stream.stop()
+        stream.close()
+        return True
+
+    def _make_callback(self, levels, slot):
+        dot = _get_numpy().dot
+
+        def callback(indata, frames, time_info, status):
+            if not frames:
+                return
+            block = indata[:, 0]
+            rms = (float(dot(block, block)) / frames) ** 0.5
+            peak = max(float(block.max()), -float(block.min()))
+            # Maximum halten, bis der Publisher den Wert abholt (Dezimierung ohne Puffer)
+            if rms > levels[slot, RMS]:
+                levels[slot, RMS] = rms
+            if peak > levels[slot, PEAK]:
+                levels[slot, PEAK] = peak
+            if rms > levels[slot, MAX_RMS]:
+                levels[slot, MAX_RMS] = rms
+        return callback
+
+    def _publish_loop(self):
+        np = _get_numpy()
+        previous = None
+        while True:
+            time.sleep(self.interval)
+            with self._subscribers_lock:
+                subscribers = list(self._subscribers)
+                if not subscribers:
+                    self._thread = None
+                    return
+            with self._devices_lock:
+                keys, levels = self._keys, self._levels
+            if levels is None:
+                levels = np.zeros((len(keys), 3), dtype=np.float32)
+                snapshot = levels
+            else:
+                snapshot = levels.copy()
+                levels[:, RMS:PEAK + 1] = 0.0  # Neues Dezimierungsfenster
+            if self.recorder is not None and keys and keys[0] == MAIN_SOURCE:
+                snapshot[0, RMS] = snapshot[0, PEAK] = getattr(self.recorder, 'current_rms', 0.0)
+            if previous is not None and previous.shape == snapshot.shape and np.array_equal(previous, snapshot):
+                continue
+            previous = snapshot
+            result = LevelSnapshot(list(keys), snapshot)
+            for callback in subscribers:
+                try:
+                    callback(result)
+                except Exception as e:
+                    print(f"[Meter] Subscriber error: {e}")
@@ -0,0 +1,103 @@
+"""Polyphasen-Resampler (numpy-vektorisiert, blockweise): native Geräterate -> 16 kHz"""
+import math
+import time
+from audio_handler import _get_numpy
+
+RESAMPLE_TAPS_PER_PHASE = 24  # Filterlänge pro Phase (Eingangs-Samples pro Ausgangs-Sample)
+RESAMPLE_KAISER_BETA = 8.0  # ca. 80 dB Sperrdämpfung
+RESAMPLE_CUTOFF = 0.9  # Grenzfrequenz relativ zur Ziel-Nyquist-Frequenz (Übergangsband)
+
+
+class PolyphaseResampler:
+    """Rationales Resampling um L/M mit einem Polyphasen-FIR (Kaiser-gefenstertes sinc).
+
+    Arbeitet inkrementell: process() bekommt beliebig große Blöcke und hält die letzten
+    Eingangs-Samples und die Ausgangs-Phase zwischen den Aufrufen. Pro Block werden alle
+    Ausgangs-Samples auf einmal berechnet (Gather-Matrix x Phasen-Filter).
+    """
+
+    def __init__(self, rate_in, rate_out, taps_per_phase=RESAMPLE_TAPS_PER_PHASE):
+        np = _get_numpy()
+        g = math.gcd(int(rate_in), int(rate_out))
+        self.up = int(rate_out) // g  # L
+        self.down = int(rate_in) // g  # M
+        self.rate_in = int(rate_in)
+        self.rate_out = int(rate_out)
+        self.taps = taps_per_phase
+
+        # Prototyp-Tiefpass auf der L-fach überabgetasteten Rate
+        n = self.up * taps_per_phase
+        cutoff = RESAMPLE_CUTOFF * 0.5 / max(self.up, self.down)
+        t = np.arange(n) - (n - 1) / 2
+        h = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(n, RESAMPLE_KAISER_BETA)
+        h *= self.up / h.sum()  # DC-Verstärkung L (kompensiert das Null-Einfügen)
+        # Phasen-Matrix: H[p, k] = h[p + k*L] - Zeile p wird mit x[base], x[base-1], ... gefaltet
+        self._phases = h.reshape(taps_per_phase, self.up).T.astype(np.float32)
+
+        self._history = np.zeros(taps_per_phase - 1, dtype=np.float32)
+        self._k = np.arange(taps_per_phase)
+        self._in_count = 0  # Bisher gesehene Eingangs-Samples
+        self._out_count = 0  # Bisher erzeugte Ausgangs-Samples
+
+    def process(self, block):
+        """Resampelt einen Block (int16 oder float) und gibt ein Array im selben dtype zurück"""
+        np = _get_numpy()
+        x = np.concatenate((self._history, block.astype(np.float32)))
+        in_end = self._in_count + len(block)
+
+        # Ausgangs-Samples n, deren Eingangsposition floor(n*M/L) schon vorliegt
+        n_end = (in_end * self.up + self.down - 1) // self.down
+        n = np.arange(self._out_count, n_end, dtype=np.int64)
+        u = n * self.down
+        base = u // self.up - (self._in_count - len(self._history))  # Index in x
+        phase = u % self.up
+
+        frames = x[base[:, None] - self._k]  # (n_out, taps): x[base], x[base-1], ...
+        out = np.einsum('ij,ij->i', frames, self._phases[phase])
+
+        self._history = x[len(x) - len(self._history):]
+        self._in_count = in_end
+        self._out_count = n_end
+
+        if block.dtype.kind == 'i':
+            info = np.iinfo(block.dtype)
+            return np.clip(np.rint(out), info.min, info.max).astype(block.dtype)
+        return out.astype(block.dtype)
+
+    def reset(self):
+        self._history[:] = 0
+        self._in_count = 0
+        self._out_count = 0
+
+
+def benchmark(rates=(44100, 48000), block_ms=10, seconds=10):
+    """Misst die Resampling-Kosten pro Block (python audio_resample.py)"""
+    np = _get_numpy()
+    results = {}
+    for rate in rates:
+        resampler = PolyphaseResampler(rate, 16000)
+        block_len = int(rate * block_ms / 1000)
+        signal = (np.sin(2 * np.pi * 440 * np.arange(rate * seconds) / rate) * 10000).astype(np.int16)
+        timings = []
+        produced = 0
+        for start in range(0, len(signal) - block_len + 1, block_len):
+            t0 = time.perf_counter()
+            produced += len(resampler.process(signal[start:start + block_len]))
+            timings.append(time.perf_counter() - t0)
+        timings = np.array(timings) * 1000
+        results[rate] = {
+            'block_ms': block_ms,
+            'avg_ms': float(timings.mean()),
+            'max_ms': float(timings.max()),
+            'realtime_factor': float(timings.mean() / block_ms),
+            'output_samples': produced,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    for rate, result in benchmark().items():
+        print(
+            f"{rate} Hz -> 16000 Hz: {result['avg_ms']:.3f}ms avg, {result['max_ms']:.3f}ms max "
+            f"pro {result['block_ms']}ms-Block ({result['realtime_factor'] * 100:.2f}% Echtzeit)"
+        )
@@ -0,0 +1,156 @@
+"""Crash-sicherer Aufnahme-Spool: Samples landen während der Aufnahme in einer gemappten WAV-Datei"""
+import os
+import glob
+import mmap
+import time
+import struct
+from config import APP_DATA_DIR
+from audio_handler import AudioClip, WAV_HEADER_SIZE, build_wav_header
+
+SPOOL_DIR = os.path.join(APP_DATA_DIR, "spool")
+SPOOL_ACTIVE_SUFFIX = ".recording"  # Noch offen - nach einem Absturz ein Waisen-Spool
+SPOOL_DONE_SUFFIX = ".wav"
+SPOOL_GROW_SECONDS = 300  # Langdiktat: Datei in 5-Minuten-Schritten vergrößern
+SPOOL_SYNC_SECONDS = 1.0  # Header + Daten so oft auf die Platte bringen
+
+
+class SpoolClip(AudioClip):
+    """AudioClip, dessen WAV-Daten direkt aus der fertigen Spool-Datei gemappt sind (keine Kopie)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        sample_rate = struct.unpack_from("<I", self._mmap, 24)[0]
+        num_frames = (len(self._mmap) - WAV_HEADER_SIZE) // 2
+        super().__init__(memoryview(self._mmap), sample_rate, num_frames, filename=os.path.basename(path))
+
+
+class RecordingSpool:
+    """Vorab allozierte, per mmap beschriebene WAV-Datei für eine Aufnahme.
+
+    Der Consumer-Thread hängt Blöcke an; der Header wird regelmäßig und beim
+    Finalisieren gepatcht. Finalisieren ist O(1): Header, Truncate, Umbenennen.
+    """
+
+    def __init__(self, path, sample_rate, capacity_frames):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.num_frames = 0
+        self._capacity = capacity_frames
+        self._file = open(path, "w+b")
+        self._file.truncate(WAV_HEADER_SIZE + capacity_frames * 2)
+        self._mmap = mmap.mmap(self._file.fileno(), WAV_HEADER_SIZE + capacity_frames * 2)
+        self._mmap[:WAV_HEADER_SIZE] = build_wav_header(0, sample_rate)
+        self._last_sync = time.monotonic()
+
+    @classmethod
+    def create(cls, sample_rate, capacity_frames, directory=SPOOL_DIR):
+        os.makedirs(directory, exist_ok=True)
+        name = time.strftime("rec_%Y%m%d_%H%M%S") + f"_{os.getpid()}_{int(time.time() * 1000) % 1000:03d}"
+        return cls(os.path.join(directory, name + SPOOL_ACTIVE_SUFFIX), sample_rate, capacity_frames)
+
+    def append(self, samples):
+        """Hängt int16-Samples an (Consumer-Thread)"""
+        n = len(samples)
+        if not n:
+            return
+        if self.num_frames + n > self._capacity:
+            self._grow(self.num_frames + n)
+        offset = WAV_HEADER_SIZE + self.num_frames * 2
+        self._mmap[offset:offset + n * 2] = memoryview(samples).cast("B")
+        self.num_frames += n
+        if time.monotonic() - self._last_sync >= SPOOL_SYNC_SECONDS:
+            self.sync()
+
+    def _grow(self, min_frames):
+        grow = int(SPOOL_GROW_SECONDS * self.sample_rate)
+        self._capacity = max(min_frames, self._capacity + grow)
+        self._mmap.resize(WAV_HEADER_SIZE + self._capacity * 2)
+
+    def sync(self):
+        """Header auf den aktuellen Stand patchen und auf die Platte schreiben (Absturz-Sicherheit)"""
+        self._mmap[:WAV_HEADER_SIZE] = build_wav_header(self.num_frames, self.sample_rate)
+        self._mmap.flush()
+        self._last_sync = time.monotonic()
+
+    def finalize(self):
+        """Schließt den Spool ab und gibt die fertige Aufnahme als SpoolClip zurück (O(1))"""
+        self._mmap[:WAV_HEADER_SIZE] = build_wav_header(self.num_frames, self.sample_rate)
+        self._mmap.flush()
+        self._mmap.close()
+        self._file.truncate(WAV_HEADER_SIZE + self.num_frames * 2)
+        self._file.close()
+        done_path = self.path[:-len(SPOOL_ACTIVE_SUFFIX)] + SPOOL_DONE_SUFFIX
+        os.replace(self.path, done_path)
+        self.path = done_path
+        return SpoolClip(done_path)
+
+    def discard(self):
+        """Verwirft den Spool (zu kurze oder stille Aufnahme)"""
+        try:
+            self._mmap.close()
+            self._file.close()
+            os.remove(self.path)
+        except Exception as e:
+            print(f"[Spool] Discard failed: {e}")
+
+
+def find_orphans(directory=SPOOL_DIR):
+    """Spools, die nie finalisiert wurden (Absturz, Energiesparmodus während der Aufnahme)"""
+    return sorted(glob.glob(os.path.join(directory, "*" + SPOOL_ACTIVE_SUFFIX)))
+
+
+def orphan_info(path):
+    """Dauer und Zeitpunkt eines Waisen-Spools (Header-Stand vom letzten Sync)"""
+    with open(path, "rb") as f:
+        header = f.read(WAV_HEADER_SIZE)
+    sample_rate = struct.unpack_from("<I", header, 24)[0] or 16000
+    data_size = struct.unpack_from("<I", header, 40)[0]
+    return {
+        'path': path,
+        'duration': data_size / 2 / sample_rate,
+        'modified': os.path.getmtime(path),
+    }
+
+
+def recover_orphan(path):
+    """Repariert einen Waisen-Spool und gibt ihn als SpoolClip zurück.
+
+    Gilt der Header-Stand vom letzten Sync (max. SPOOL_SYNC_SECONDS fehlen) - dahinter liegen
+    nur vorab allozierte Nullen oder nicht gesicherte Daten.
+    """
+    with open(path, "r+b") as f:
+        header = f.read(WAV_HEADER_SIZE)
+        sample_rate = struct.unpack_from("<I", header, 24)[0] or 16000
+        num_frames = struct.unpack_from("<I", header, 40)[0] // 2
+        file_frames = (os.path.getsize(path) - WAV_HEADER_SIZE) // 2
+        num_frames = min(num_frames, max(file_frames, 0))
+        f.seek(0)
+        f.write(build_wav_header(num_frames, sample_rate))
+        f.truncate(WAV_HEADER_SIZE + num_frames * 2)
+    done_path = path[:-len(SPOOL_ACTIVE_SUFFIX)] + SPOOL_DONE_SUFFIX
+    os.replace(path, done_path)
+    return SpoolClip(done_path)
+
+
+def promote_latest(target_path, directory=SPOOL_DIR):
+    """Beim Start: jüngste fertige Aufnahme wird zur "letzten Aufnahme" (Wiederholen nach Neustart)"""
+    finished = sorted(glob.glob(os.path.join(directory, "*" + SPOOL_DONE_SUFFIX)), key=os.path.getmtime)
+    if finished:
+        try:
+            os.replace(finished[-1], target_path)
+        except OSError as e:
+            print(f"[Spool] Could not promote {finished[-1]}: {e}")
+    cleanup_finished(directory=directory)
+
+
+def cleanup_finished(keep_path=None, directory=SPOOL_DIR):
+    """Löscht fertige Spools außer keep_path (noch gemappte Dateien bleiben bis zum nächsten Mal liegen)"""
+    for path in glob.glob(os.path.join(directory, "*" + SPOOL_DONE_SUFFIX)):
+        if path == keep_path:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            pass
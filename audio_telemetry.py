@@ -0,0 +1,160 @@
+"""Stream-Telemetrie: Callback-Intervalle, Overflows, Eingangslatenz und Hotkey-bis-Audio-Zeit"""
+import time
+from bisect import bisect_left
+from collections import deque
+
+# Obergrenzen der Intervall-Buckets (ms) - der letzte Bucket zählt alles darüber
+INTERVAL_BUCKETS_MS = (2, 5, 10, 15, 20, 30, 50, 100, 250)
+PRESS_HISTORY = 50  # Letzte Tastendrücke für Durchschnitt/Maximum
+
+
+class StreamTelemetry:
+    """Sammelt Kennzahlen pro Stream; on_callback() läuft im PortAudio-Callback.
+
+    Im Callback nur Zähler und ein bisect über ein kleines Tupel - keine Listen oder Arrays.
+    Die Tastendruck-Messungen überleben einen Stream-Neustart (reset_stream).
+    """
+
+    def __init__(self):
+        self._clock = time.perf_counter
+        self._presses = deque(maxlen=PRESS_HISTORY)  # (press_to_start_ms, press_to_first_block_ms)
+        self._pressed_at = None
+        self._started_at = None
+        self._awaiting_block = False
+        self.reset_stream()
+
+    def reset_stream(self, sample_rate=None, blocksize=0, latency=None, low_latency=False, device=None):
+        """Neuer Stream: Zähler zurücksetzen (vor stream.start - nicht im Callback)"""
+        self.sample_rate = sample_rate
+        self.blocksize = blocksize  # 0 = vom Treiber gewählt
+        self.requested_latency = latency
+        self.reported_latency_ms = None  # stream.latency nach dem Öffnen
+        self.low_latency = low_latency
+        self.device = device
+        self.opened_at = time.time()
+        self.callbacks = 0
+        self.interval_histogram = [0] * (len(INTERVAL_BUCKETS_MS) + 1)
+        self.max_interval_ms = 0.0
+        self.min_block_frames = 0
+        self.max_block_frames = 0
+        self.input_overflows = 0
+        self.input_underflows = 0
+        self.last_status = None
+        self.latency_count = 0
+        self.latency_total_ms = 0.0
+        self.latency_max_ms = 0.0
+        self._last_at = None
+
+    def on_callback(self, now, frames, time_info, status):
+        """Aus dem Audio-Callback: now = perf_counter() zu Beginn des Callbacks"""
+        self.callbacks += 1
+        last = self._last_at
+        self._last_at = now
+        if last is not None:
+            interval_ms = (now - last) * 1000
+            self.interval_histogram[bisect_left(INTERVAL_BUCKETS_MS, interval_ms)] += 1
+            if interval_ms > self.max_interval_ms:
+                self.max_interval_ms = interval_ms
+        if frames > self.max_block_frames:
+            self.max_block_frames = frames
+        if frames < self.min_block_frames or not self.min_block_frames:
+            self.min_block_frames = frames
+
+        if status:
+            if status.input_overflow:
+                self.input_overflows += 1
+            if status.input_underflow:
+                self.input_underflows += 1
+            self.last_status = status
+
+        # Eingangslatenz: Zeit zwischen A/D-Wandlung des ersten Samples und Callback (0 = vom Host-API nicht geliefert)
+        adc = time_info.inputBufferAdcTime
+        if adc > 0:
+            latency_ms = (time_info.currentTime - adc) * 1000
+            if latency_ms >= 0:
+                self.latency_count += 1
+                self.latency_total_ms += latency_ms
+                if latency_ms > self.latency_max_ms:
+                    self.latency_max_ms = latency_ms
+
+        if self._awaiting_block:
+            self._awaiting_block = False
+            self._record_press(now)
+
+    def mark_recording_start(self, pressed_at=None):
+        """Aufnahmestart (nach Setzen von is_recording): der nächste Callback ist der erste Block"""
+        self._started_at = self._clock()
+        self._pressed_at = pressed_at if pressed_at is not None else self._started_at
+        self._awaiting_block = True
+
+    def _record_press(self, first_block_at):
+        self._presses.append((
+            (self._started_at - self._pressed_at) * 1000,
+            (first_block_at - self._pressed_at) * 1000,
+        ))
+
+    @property
+    def status_flags(self):
+        return self.input_overflows + self.input_underflows
+
+    def summary(self):
+        """Alle Kennzahlen als dict (für Diagnose-Ansicht und Export)"""
+        presses = list(self._presses)
+        first_block = [p[1] for p in presses]
+        start = [p[0] for p in presses]
+        labels = [f"<={edge}ms" for edge in INTERVAL_BUCKETS_MS] + [f">{INTERVAL_BUCKETS_MS[-1]}ms"]
+        return {
+            'device': self.device,
+            'sample_rate': self.sample_rate,
+            'blocksize': self.blocksize,
+            'low_latency': self.low_latency,
+            'requested_latency': self.requested_latency,
+            'reported_latency_ms': self.reported_latency_ms,
+            'stream_uptime_s': time.time() - self.opened_at,
+            'callbacks': self.callbacks,
+            'block_frames': [self.min_block_frames, self.max_block_frames],
+            'interval_histogram': dict(zip(labels, self.interval_histogram)),
+            'max_interval_ms': self.max_interval_ms,
+            'input_overflows': self.input_overflows,
+            'input_underflows': self.input_underflows,
+            'last_status': str(self.last_status) if self.last_status else None,
+            'input_latency_avg_ms': self.latency_total_ms / self.latency_count if self.latency_count else None,
+            'input_latency_max_ms': self.latency_max_ms if self.latency_count else None,
+            'presses': len(presses),
+            'press_to_start_avg_ms': sum(start) / len(start) if start else None,
+            'press_to_first_block_last_ms': first_block[-1] if first_block else None,
+            'press_to_first_block_avg_ms': sum(first_block) / len(first_block) if first_block else None,
+            'press_to_first_block_max_ms': max(first_block) if first_block else None,
+        }
+
+
+def format_report(summary):
+    """Lesbarer Bericht für die Diagnose-Ansicht"""
+    def ms(value):
+        return f"{value:.1f} ms" if value is not None else "-"
+
+    def pct(value):
+        return f"{value:.2f}%" if value is not None else "-"
+
+    histogram = "  ".join(f"{label}: {count}" for label, count in summary['interval_histogram'].items() if count)
+    lines = [
+        f"Gerät {summary['device']} - {summary['sample_rate']} Hz, Blockgröße {summary['blocksize'] or 'auto'}, "
+        f"Latenz-Modus {'niedrig' if summary['low_latency'] else 'Standard'} (gemeldet {ms(summary['reported_latency_ms'])})",
+        f"Callbacks: {summary['callbacks']} in {summary['stream_uptime_s']:.0f}s, "
+        f"Blöcke {summary['block_frames'][0]}-{summary['block_frames'][1]} Frames, max. Intervall {ms(summary['max_interval_ms'])}",
+        f"Intervalle: {histogram or '-'}",
+        f"Overflows: {summary['input_overflows']}, Underflows: {summary['input_underflows']}"
+        + (f" (zuletzt: {summary['last_status']})" if summary['last_status'] else ""),
+        f"Eingangslatenz: Ø {ms(summary['input_latency_avg_ms'])}, max {ms(summary['input_latency_max_ms'])}",
+        f"Hotkey bis erster Block: zuletzt {ms(summary['press_to_first_block_last_ms'])}, "
+        f"Ø {ms(summary['press_to_first_block_avg_ms'])}, max {ms(summary['press_to_first_block_max_ms'])} "
+        f"({summary['presses']} Aufnahmen; Hook bis Start Ø {ms(summary['press_to_start_avg_ms'])})",
+    ]
+    if 'stall_count' in summary:
+        lines.append(f"Watchdog: {summary['stall_count']} Ausfälle, {summary.get('resume_count', 0)} Standby, "
+                     f"letzte Wiederherstellung {ms(summary.get('last_recovery_ms'))}")
+    if summary.get('idle_minutes'):
+        lines.append(f"Ruhemodus nach {summary['idle_minutes']:.0f} min: {summary['idle_count']}x, "
+                     f"Wiederöffnen {ms(summary['idle_rearm_ms'])} ({summary['idle_rearm_reason'] or '-'}), "
+                     f"CPU mit Stream {pct(summary['cpu_stream_on_pct'])} / ohne {pct(summary['cpu_stream_off_pct'])}")
+    return "\n".join(lines)
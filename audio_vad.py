@@ -0,0 +1,130 @@
+"""Voice-Activity-Detection auf Frame-Ebene (Energie + Zero-Crossing-Rate), vollständig numpy-vektorisiert"""
+from audio_handler import _get_numpy
+
+VAD_FRAME_MS = 30
+VAD_PAD_SECONDS = 0.25  # Sprache wird links/rechts um diese Zeit erweitert (Ein-/Ausschwingen)
+VAD_MAX_PAUSE_SECONDS = 1.0  # Längere Pausen werden auf diese Länge gekürzt
+VAD_NOISE_PERCENTILE = 10  # Rauschboden = dieses Perzentil der Frame-Energien
+VAD_NOISE_FACTOR = 3.0  # Sprache = Energie über Rauschboden * Faktor
+VAD_MIN_ENERGY = 0.0005  # Untergrenze für die Energieschwelle (digitale Stille)
+VAD_FRICATIVE_ZCR = 0.25  # Leise Frames mit hoher Zero-Crossing-Rate (s, f, sch) zählen als Sprache
+VAD_BLOCK_FRAMES = 1000  # Energie/ZCR blockweise (30s) berechnen - Zwischenarrays bleiben klein
+
+
+def frame_activity(samples, sample_rate, max_threshold=None):
+    """Klassifiziert 30ms-Frames als Sprache/Stille.
+
+    Args:
+        samples: 1D int16 (Aufnahme-Format) oder float32 Array
+        max_threshold: Obergrenze der Energieschwelle (z.B. audio_sensitivity, float-Skala)
+
+    Returns:
+        (voiced, frame_len): bool-Array pro Frame und Frame-Länge in Samples
+    """
+    np = _get_numpy()
+    frame_len = int(sample_rate * VAD_FRAME_MS / 1000)
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return np.zeros(0, dtype=bool), frame_len
+
+    frames = samples[:n_frames * frame_len].reshape(n_frames, frame_len)
+    # int16-Aufnahmen blockweise nach float32 wandeln (keine float-Kopie der ganzen Aufnahme)
+    scale = 1.0 / 32768 if samples.dtype.kind == 'i' else 1.0
+    energy = np.empty(n_frames, dtype=np.float64)
+    zcr = np.empty(n_frames, dtype=np.float64)
+    for start in range(0, n_frames, VAD_BLOCK_FRAMES):
+        block = frames[start:start + VAD_BLOCK_FRAMES].astype(np.float32)
+        energy[start:start + len(block)] = np.einsum('ij,ij->i', block, block)
+        zcr[start:start + len(block)] = np.count_nonzero(np.diff(np.signbit(block), axis=1), axis=1)
+    energy = np.sqrt(energy / frame_len) * scale
+    zcr /= frame_len
+
+    threshold = max(float(np.percentile(energy, VAD_NOISE_PERCENTILE)) * VAD_NOISE_FACTOR, VAD_MIN_ENERGY)
+    if max_threshold:
+        threshold = min(threshold, max_threshold)
+
+    voiced = (energy >= threshold) | ((energy >= threshold * 0.5) & (zcr >= VAD_FRICATIVE_ZCR))
+    return voiced, frame_len
+
+
+def compress_silence(samples, sample_rate, max_pause_seconds=VAD_MAX_PAUSE_SECONDS, max_threshold=None):
+    """Schneidet Stille am Anfang/Ende ab und kürzt lange Pausen auf max_pause_seconds.
+
+    Returns:
+        (samples, removed_seconds): Bei nichts zu entfernen wird das Original-Array zurückgegeben.
+    """
+    keep = keep_frames(samples, sample_rate, max_pause_seconds, max_threshold)
+    if keep is None:
+        return samples, 0.0
+    trimmed = apply_keep(samples, keep, int(sample_rate * VAD_FRAME_MS / 1000))
+    return trimmed, (len(samples) - len(trimmed)) / sample_rate
+
+
+def kept_length(num_samples, keep, frame_len):
+    """Anzahl Samples nach apply_keep (Rest-Samples folgen dem letzten Frame)"""
+    remainder = num_samples - len(keep) * frame_len
+    return int(keep.sum()) * frame_len + (remainder if keep[-1] else 0)
+
+
+def apply_keep(samples, keep, frame_len, out=None):
+    """Kopiert die behaltenen Frames nach out (bzw. in ein neues Array).
+
+    Gearbeitet wird auf Frame-Zeilen: eine Sample-Maske würde intern einen int64-Index
+    pro Sample erzeugen (4x die Größe der Aufnahme). mode='clip', weil np.take/np.compress
+    mit mode='raise' out komplett zwischenpuffern.
+    """
+    np = _get_numpy()
+    n = len(keep)
+    body = n * frame_len
+    total = kept_length(len(samples), keep, frame_len)
+    if out is None:
+        out = np.empty(total, dtype=samples.dtype)
+    kept_body = int(keep.sum()) * frame_len
+    np.take(samples[:body].reshape(n, frame_len), np.flatnonzero(keep), axis=0,
+            out=out[:kept_body].reshape(-1, frame_len), mode='clip')
+    if total > kept_body:
+        out[kept_body:total] = samples[body:]
+    return out
+
+
+def keep_frames(samples, sample_rate, max_pause_seconds=VAD_MAX_PAUSE_SECONDS, max_threshold=None):
+    """Wie compress_silence, liefert aber nur die zu behaltenden 30ms-Frames.
+
+    Der Aufrufer kopiert damit direkt in den Zielpuffer (apply_keep mit out=).
+
+    Returns:
+        bool-Array pro Frame oder None, wenn nichts zu entfernen ist
+    """
+    np = _get_numpy()
+    voiced, frame_len = frame_activity(samples, sample_rate, max_threshold)
+    if not voiced.any():
+        return None
+
+    # Sprache um VAD_PAD_SECONDS erweitern (Dilatation per Faltung)
+    pad = max(1, int(VAD_PAD_SECONDS * 1000 / VAD_FRAME_MS))
+    speech = np.convolve(voiced, np.ones(2 * pad + 1, dtype=np.int32), mode='same') > 0
+    if speech.all():
+        return None
+
+    # Position jedes Stille-Frames innerhalb seines Stille-Laufs und Lauflänge (ohne Python-Schleife)
+    n = len(speech)
+    idx = np.arange(n)
+    silent = ~speech
+    run_start_flag = silent & np.concatenate(([True], speech[:-1]))
+    run_id = np.cumsum(run_start_flag) - 1
+    run_starts = idx[run_start_flag]
+    run_ends = idx[silent & np.concatenate((speech[1:], [True]))] + 1
+    pos_in_run = idx - run_starts[np.maximum(run_id, 0)]
+    run_len = (run_ends - run_starts)[np.maximum(run_id, 0)]
+
+    # Führende/abschließende Stille komplett entfernen, innere Pausen auf max_pause kürzen
+    max_pause = int(max_pause_seconds * 1000 / VAD_FRAME_MS)
+    head, tail = max_pause // 2, max_pause - max_pause // 2
+    keep = speech | (pos_in_run < head) | (pos_in_run >= run_len - tail)
+    first, last = np.flatnonzero(speech)[[0, -1]]
+    keep[:first] = False
+    keep[last + 1:] = False
+
+    if keep.all():
+        return None
+    return keep
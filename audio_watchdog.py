@@ -0,0 +1,144 @@
+"""Stream-Watchdog: erkennt einen hängenden Audio-Stream am Ausbleiben der PortAudio-Callbacks"""
+import time
+import threading
+
+WATCHDOG_MIN_TIMEOUT_SECONDS = 0.1  # Untergrenze: Windows-Timer (15,6ms) + Callback-Jitter sonst Fehlalarme
+STREAM_START_GRACE_SECONDS = 1.0  # Erster Callback eines frisch geöffneten Streams darf länger dauern
+RESUME_GAP_SECONDS = 2.0  # Watchdog hat so viel länger geschlafen als geplant -> Standby/Ruhezustand
+RECOVERY_POLL_SECONDS = 0.01  # Nur während einer Wiederherstellung: auf den ersten Callback warten
+RECOVERY_RETRY_SECONDS = 5.0  # Kommt nach dem Neustart nichts, den Stall erneut melden
+IDLE_SECONDS = 1.0  # Kein Stream offen (z.B. Mikrofontest) - nichts zu überwachen
+
+
+class _Stall:
+    """Laufender Ausfall: seit wann, ab welchem Callback-Zähler, ob schon gemeldet"""
+
+    def __init__(self, onset, callback_count, reason, reported_at=None):
+        self.onset = onset
+        self.callback_count = callback_count
+        self.reason = reason
+        self.reported_at = reported_at
+
+
+class StreamWatchdog:
+    """Überwacht den unified stream über den Zeitstempel des letzten Callbacks.
+
+    Der Callback schreibt nur `_last_callback_at` und die Blockgröße (keine Events, keine Locks).
+    Der Watchdog schläft bis zur nächsten Frist (letzter Callback + zwei Blockperioden) und
+    meldet einen Stall über on_stall() - also spätestens eine Blockperiode nach dem
+    ausgebliebenen Callback. Nach Standby (Thread hat deutlich zu lange geschlafen) bekommt
+    der Stream eine Frist ab dem Aufwachen. Die Zeit bis zum ersten Callback danach ist die
+    Wiederherstellungszeit (on_recovered).
+    """
+
+    def __init__(self, recorder, on_stall, on_recovered=None, min_timeout=WATCHDOG_MIN_TIMEOUT_SECONDS):
+        self.recorder = recorder
+        self.on_stall = on_stall  # Callback(reason) aus dem Watchdog-Thread - darf nicht blockieren
+        self.on_recovered = on_recovered  # Callback(recovery_ms, reason)
+        self.min_timeout = min_timeout
+        self.stall_count = 0
+        self.resume_count = 0
+        self.last_recovery_ms = None
+        self.max_recovery_ms = 0.0
+        self._stall = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="StreamWatchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def timeout(self):
+        """Frist ohne Callback: zwei Blockperioden (eine ausgebliebene), mindestens min_timeout"""
+        recorder = self.recorder
+        frames = recorder._callback_frames
+        period = frames / recorder._capture_rate if frames else 0.0
+        return max(self.min_timeout, 2 * period)
+
+    def get_metrics(self):
+        return {
+            'stall_count': self.stall_count,
+            'resume_count': self.resume_count,
+            'last_recovery_ms': self.last_recovery_ms,
+            'max_recovery_ms': self.max_recovery_ms,
+        }
+
+    def _loop(self):
+        clock = time.perf_counter
+        planned = None  # Geplante Aufwachzeit (Standby-Erkennung)
+        while not self._stop.is_set():
+            try:
+                now = clock()
+                if planned is not None and now - planned > RESUME_GAP_SECONDS and self._stall is None:
+                    self.resume_count += 1
+                    print(f"[Watchdog] Resume detected (slept {now - planned:.1f}s too long)")
+                    self._stall = _Stall(now, self.recorder._callback_count, 'resume')
+                wait = self._check(now)
+            except Exception as e:
+                print(f"[Watchdog] Error: {e}")
+                wait = IDLE_SECONDS
+            planned = clock() + wait
+            self._stop.wait(wait)
+
+    def _check(self, now):
+        """Eine Prüfung - gibt die Wartezeit bis zur nächsten zurück"""
+        recorder = self.recorder
+        if self._stall is not None:
+            return self._check_recovery(now)
+        if recorder._unified_stream is None:
+            return IDLE_SECONDS
+
+        started = recorder._stream_started_at
+        last = recorder._last_callback_at
+        if last < started:
+            onset, deadline = started, started + STREAM_START_GRACE_SECONDS
+        else:
+            onset, deadline = last, last + self.timeout()
+        if now < deadline:
+            return min(deadline - now, self.timeout())  # Während der Start-Frist den ersten Callback nicht verschlafen
+
+        self.stall_count += 1
+        reason = 'no-callback' if last < started else 'stall'
+        print(f"[Watchdog] Stream stalled: no callback for {(now - onset) * 1000:.0f}ms ({reason})")
+        self._stall = _Stall(onset, recorder._callback_count, reason, reported_at=now)
+        self.on_stall(reason)
+        return RECOVERY_POLL_SECONDS
+
+    def _check_recovery(self, now):
+        """Während eines Ausfalls: auf den ersten neuen Callback warten, ggf. (erneut) melden"""
+        recorder = self.recorder
+        stall = self._stall
+        if recorder._callback_count != stall.callback_count:
+            recovery_ms = (now - stall.onset) * 1000
+            self._stall = None
+            self.last_recovery_ms = recovery_ms
+            if recovery_ms > self.max_recovery_ms:
+                self.max_recovery_ms = recovery_ms
+            print(f"[Watchdog] Stream delivering again after {recovery_ms:.0f}ms ({stall.reason})")
+            if self.on_recovered:
+                self.on_recovered(recovery_ms, stall.reason)
+            return self.timeout()
+
+        if recorder._unified_stream is None:
+            # Stream geschlossen (Mikrofontest) oder Neustart fehlgeschlagen - das übernimmt die Registry
+            self._stall = None
+            return IDLE_SECONDS
+
+        if stall.reported_at is None:
+            # Nach Standby: eine normale Frist ab dem Aufwachen, bevor neu gestartet wird
+            if now - stall.onset >= self.timeout():
+                self.stall_count += 1
+                print("[Watchdog] Stream did not resume after standby")
+                stall.reported_at = now
+                self.on_stall(stall.reason)
+        elif now - stall.reported_at >= RECOVERY_RETRY_SECONDS:
+            print(f"[Watchdog] Still no callbacks {now - stall.onset:.1f}s after stall - reporting again")
+            stall.reported_at = now
+            self.on_stall(stall.reason)
+        return RECOVERY_POLL_SECONDS
@@ -85,13 +85,28 @@ TARGET_LANGUAGES = [
 ]
 
 DEFAULT_CONFIG = {
-    "hotkey": "ctrl_r",
+    "hotkey": "ctrl_r",  # Auch Akkorde: "ctrl_l+alt_l+d" (letzte Taste löst aus)
+    "mode_hotkeys": {},  # Weitere Hotkeys mit festem Modus, z.B. {"ctrl_l+alt_l+t": "Übersetzer"}
     "device_index": None,
     "device_name": None,  # Robustheit gegen ID-Änderungen (Docking Station)
     "mode": "Dynamisches Diktat",
     "language": "Deutsch",
     "target_language": "Englisch",  # Zielsprache für Übersetzer-Modus
     "audio_sensitivity": 0.005,  # Mindest-Audiopegel (RMS) für Aufnahme
+    "segmented_transcription": True,  # Lange Diktate schon während der Aufnahme transkribieren
+    "long_dictation": True,  # Kein 10-Minuten-Limit (nur mit segmented_transcription)
+    "hands_free_dictation": False,  # Hotkey schaltet Daueraufnahme um, jede Äußerung wird sofort eingefügt
+    "restore_clipboard": False,  # Nach dem Einfügen die vorherige Zwischenablage zurückholen (nur Text)
+    "upload_codec": "auto",  # "auto", "wav" oder "flac" (verlustfrei, ca. halbe Upload-Größe)
+    "request_deadline_seconds": 90,  # Zeitbudget vom Loslassen bis zum Text (Transkription + LLM, inkl. Retries)
+    "request_hedging": False,  # Langsamer Proxy-Request: zweiter Versuch über Groq direkt (nur mit API Key, max. ~10% mehr Requests)
+    "connection_warmup": True,  # Beim Hotkey-Druck Verbindungen + Vercel-Funktion aufwärmen, bei reger Nutzung warm halten
+    "vad_trim": True,  # Stille am Anfang/Ende entfernen und lange Pausen kürzen
+    "vad_max_pause_seconds": 1.0,  # Längere Pausen werden auf diese Länge gekürzt
+    "recording_spool": False,  # Aufnahme während des Diktats auf die Platte spiegeln (Absturz-Sicherheit)
+    "streaming_upload": False,  # Upload schon während der Aufnahme (nur ohne Segmente und mit vad_trim aus, immer WAV)
+    "audio_idle_minutes": 15,  # Stream nach so vielen Minuten ohne Diktat schließen (0 = immer offen)
+    "low_latency_audio": False,  # Feste 10ms-Blöcke + latency='low' (Wirkung in der Audio-Diagnose sichtbar)
     # API Key wird aus .env oder Umgebungsvariable geladen
     "api_key": os.getenv("GROQ_API_KEY", ""),
     "custom_instructions": "",  # Persönliche Präferenzen für alle LLM-Aufrufe
@@ -189,6 +204,10 @@ def format_hotkey_name(hotkey_code):
 
     key = hotkey_code.lower()
 
+    # Akkord: jede Taste einzeln übersetzen
+    if "+" in key.strip("+"):
+        return " + ".join(format_hotkey_name(part) for part in key.split("+") if part)
+
     # Direkte Übersetzung wenn vorhanden
     if key in HOTKEY_NAMES:
         return HOTKEY_NAMES[key]
@@ -1,4 +1,5 @@
 import sqlite3
+import json
 import logging
 from logging.handlers import TimedRotatingFileHandler
 import os
@@ -55,17 +56,22 @@ class DataHandler:
                         formatted_text TEXT
                     )
                 ''')
+                # Migration: Audio-Zusammenfassung (JSON) für ältere Datenbanken nachrüsten
+                columns = [row[1] for row in cursor.execute('PRAGMA table_info(history)')]
+                if 'audio_stats' not in columns:
+                    cursor.execute('ALTER TABLE history ADD COLUMN audio_stats TEXT')
                 self.conn.commit()
         except Exception as e:
             self.log(f"DB Init Error: {e}", "error")
 
-    def save_entry(self, mode, original, formatted):
+    def save_entry(self, mode, original, formatted, audio_stats=None):
         try:
+            stats_json = json.dumps(audio_stats) if audio_stats else None
             with self.db_lock:
                 cursor = self.conn.cursor()
                 cursor.execute(
-                    'INSERT INTO history (mode, original_text, formatted_text) VALUES (?, ?, ?)',
-                    (mode, original, formatted)
+                    'INSERT INTO history (mode, original_text, formatted_text, audio_stats) VALUES (?, ?, ?, ?)',
+                    (mode, original, formatted, stats_json)
                 )
                 self.conn.commit()
         except Exception as e:
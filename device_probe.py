@@ -0,0 +1,112 @@
+"""Parallele Geräte-Prüfung mit persistentem Cache (Fingerprint: Name + Host-API + Kanäle)"""
+import os
+import json
+import math
+import time
+import threading
+from config import APP_DATA_DIR
+
+PROBE_CACHE_FILE = os.path.join(APP_DATA_DIR, "device_probe_cache.json")
+PROBE_TIMEOUT_SECONDS = 2.0  # Pro Gerät - hängende Treiber blockieren nicht die ganze Liste
+PROBE_MAX_WORKERS = 8
+PROBE_FAILURE_TTL_SECONDS = 3600  # Fehlgeschlagene Geräte nach einer Stunde erneut prüfen (z.B. war belegt)
+
+
+def device_fingerprint(dev, hostapis):
+    """Stabiler Schlüssel eines Geräts: Name + Host-API + Kanalzahl (IDs ändern sich beim Docking)"""
+    try:
+        hostapi = hostapis[dev["hostapi"]]["name"]
+    except (KeyError, IndexError, TypeError):
+        hostapi = str(dev.get("hostapi", ""))
+    return f"{dev['name']}|{hostapi}|{dev['max_input_channels']}"
+
+
+def run_parallel(items, fn, timeout=PROBE_TIMEOUT_SECONDS, max_workers=PROBE_MAX_WORKERS):
+    """Führt fn(item) für alle items parallel aus.
+
+    Daemon-Threads statt ThreadPoolExecutor: ein im Treiber hängendes Öffnen darf
+    weder den Aufrufer noch das Beenden der App blockieren.
+
+    Returns:
+        dict {item: Ergebnis} - fehlt bei Exception oder Timeout
+    """
+    results = {}
+    lock = threading.Lock()
+    slots = threading.Semaphore(max_workers)
+
+    def run(item):
+        with slots:
+            try:
+                value = fn(item)
+            except Exception as e:
+                print(f"[Probe] {item}: {e}")
+                return
+        with lock:
+            results[item] = value
+
+    threads = [threading.Thread(target=run, args=(item,), daemon=True) for item in items]
+    for thread in threads:
+        thread.start()
+
+    # Jede Welle von max_workers Geräten bekommt ein Timeout
+    deadline = time.monotonic() + timeout * math.ceil(len(threads) / max_workers) if threads else 0
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+
+    with lock:
+        return dict(results)
+
+
+class DeviceProbeCache:
+    """Ergebnisse von Geräte-Tests, persistiert pro Fingerprint in APP_DATA_DIR"""
+
+    def __init__(self, path=PROBE_CACHE_FILE):
+        self.path = path
+        self._entries = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except Exception as e:
+            print(f"[Probe] Cache load error: {e}")
+            self._entries = {}
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = dict(self._entries)
+            self._dirty = False
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f, indent=2)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"[Probe] Cache save error: {e}")
+
+    def get(self, fingerprint):
+        """True/False aus dem Cache, None = unbekannt oder abgelaufen (neu prüfen)"""
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+        if entry is None:
+            return None
+        if not entry.get("ok") and time.time() - entry.get("checked", 0) > PROBE_FAILURE_TTL_SECONDS:
+            return None
+        return bool(entry.get("ok"))
+
+    def put(self, fingerprint, ok):
+        with self._lock:
+            self._entries[fingerprint] = {"ok": bool(ok), "checked": time.time()}
+            self._dirty = True
+
+    def invalidate(self, fingerprint):
+        with self._lock:
+            if self._entries.pop(fingerprint, None) is not None:
+                self._dirty = True
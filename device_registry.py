@@ -0,0 +1,167 @@
+"""Geräte-Registry: hält Gerät und Stream-Zustand im Hintergrund aktuell (Hotkey-Pfad ohne Geräteabfrage)"""
+import time
+import threading
+from audio_watchdog import StreamWatchdog
+
+REGISTRY_POLL_SECONDS = 60.0  # Nur noch Geräteliste (Docking Station) - hängende Streams meldet der Watchdog sofort
+RECOVERY_BACKOFF_SECONDS = 60.0  # Suche per Name re-initialisiert PortAudio - nicht bei jedem Durchlauf
+
+
+class DeviceRegistry:
+    """Hintergrund-Watcher für das Aufnahmegerät.
+
+    Übernimmt, was bisher bei jedem Tastendruck im pynput-Hook passierte
+    (ensure_device_available, ID-Wiederherstellung per Name, Stream-Neustart) und den
+    10-Sekunden Health-Check. Der Hook liest nur noch `snapshot` - ein dict, das bei
+    jeder Prüfung komplett ersetzt und nie verändert wird (Lesen ohne Lock).
+
+    Hängende Streams (Standby, abgezogenes Gerät) erkennt der StreamWatchdog an den
+    ausbleibenden Callbacks; der Neustart läuft dann sofort in diesem Thread.
+    """
+
+    def __init__(self, recorder, config, on_health=None, interval=REGISTRY_POLL_SECONDS):
+        self.recorder = recorder
+        self.config = config
+        self.on_health = on_health  # Callback(result) aus dem Registry-Thread
+        self.interval = interval
+        self._snapshot = {
+            'device_index': config.get("device_index"),
+            'device_name': config.get("device_name"),
+            'healthy': True,  # Bis zur ersten Prüfung optimistisch (Stream startet verzögert)
+            'message': 'Noch nicht geprüft',
+            'checked_at': 0.0,
+        }
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._next_recovery = 0.0
+        self._stall_reported = False
+        self.watchdog = StreamWatchdog(recorder, on_stall=self._on_stall, on_recovered=self._on_recovered)
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    def start(self):
+        """Startet den Watcher-Thread; die erste Prüfung läuft sofort"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._wake.set()
+        self._thread = threading.Thread(target=self._loop, name="DeviceRegistry", daemon=True)
+        self._thread.start()
+        self.watchdog.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self.watchdog.stop()
+
+    def refresh_now(self):
+        """Fordert eine sofortige Prüfung an (nicht blockierend, z.B. aus dem Hotkey-Hook)"""
+        self._next_recovery = 0.0
+        self._wake.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                if self._stall_reported:
+                    self._stall_reported = False
+                    self._restart_stalled()
+                else:
+                    self.refresh()
+            except Exception as e:
+                print(f"[Registry] Refresh error: {e}")
+
+    def _on_stall(self, reason):
+        """Watchdog-Thread: Neustart anfordern (nicht blockierend)"""
+        self._stall_reported = True
+        self._wake.set()
+
+    def _on_recovered(self, recovery_ms, reason):
+        """Watchdog-Thread: Stream liefert wieder - Wiederherstellungszeit melden"""
+        recorder = self.recorder
+        result = {
+            'healthy': True,
+            'recovered': True,
+            'message': f'Stream nach {recovery_ms:.0f} ms wiederhergestellt',
+            'device_id': recorder._current_device_index,
+        }
+        self._publish(result, self.config.get("device_name"))
+        print(f"[Registry] {result['message']} ({reason}, device {result['device_id']})")
+        if self.on_health:
+            self.on_health(result)
+
+    def _restart_stalled(self):
+        """Öffnet den hängenden Stream neu - auch während einer Aufnahme (der Ringpuffer bleibt erhalten)"""
+        recorder = self.recorder
+        started = time.perf_counter()
+        with recorder._stream_lock:
+            if not recorder._unified_stream:
+                return  # Inzwischen geschlossen (z.B. Mikrofontest, Ruhemodus)
+            new_device = recorder.restart_stream()
+        print(f"[Registry] Stalled stream restarted on device {new_device} in {(time.perf_counter() - started) * 1000:.0f}ms")
+        if new_device is None:
+            result = {
+                'healthy': False,
+                'recovered': False,
+                'message': 'Wiederherstellung fehlgeschlagen',
+                'device_id': None,
+            }
+            self._publish(result, self.config.get("device_name"))
+            if self.on_health:
+                self.on_health(result)
+        # Erfolg meldet der Watchdog mit dem ersten Callback (inkl. Wiederherstellungszeit)
+
+    def _publish(self, result, dev_name, dev_idx=None):
+        """Ersetzt den Snapshot (nie in-place ändern - der Hotkey-Hook liest ohne Lock)"""
+        self._snapshot = {
+            'device_index': self.recorder._current_device_index if result['healthy'] else dev_idx,
+            'device_name': dev_name,
+            'healthy': result['healthy'],
+            'message': result['message'],
+            'checked_at': time.time(),
+        }
+
+    def refresh(self):
+        """Prüft Gerät und Stream und ersetzt den Snapshot (während einer Aufnahme übersprungen)"""
+        recorder = self.recorder
+        if recorder.is_recording:
+            return self._snapshot
+
+        started = time.perf_counter()
+        dev_idx = self.config.get("device_index")
+        dev_name = self.config.get("device_name")
+
+        # Docking-Station: Gerät per Name unter neuer ID wiederfinden - nur wenn der Stream nicht
+        # ohnehin auf dem konfigurierten Gerät läuft (ohne Stream, z.B. Mikrofontest, nichts anfassen)
+        on_configured_device = recorder._current_device_index == dev_idx
+        if recorder._unified_stream and not on_configured_device and time.monotonic() >= self._next_recovery:
+            self._next_recovery = time.monotonic() + RECOVERY_BACKOFF_SECONDS
+            recovered_idx, needs_restart = recorder.ensure_device_available(dev_idx, dev_name)
+            if recovered_idx != dev_idx and recovered_idx is not None:
+                print(f"[Registry] Device ID changed: {dev_idx} -> {recovered_idx}")
+                self.config.set("device_index", recovered_idx)
+                dev_idx = recovered_idx
+
+            # Unter _stream_lock: Ruhemodus oder Hotkey dürfen nicht gleichzeitig öffnen/schließen
+            with recorder._stream_lock:
+                if needs_restart and recorder._unified_stream and not recorder.is_recording:
+                    recorder.stop_monitor()
+                    recorder._start_unified_stream(dev_idx, dev_name)
+
+        # Stream-Zustand (Energiesparmodus-Recovery)
+        result = recorder.check_device_health()
+
+        self._publish(result, dev_name, dev_idx)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if not result['healthy'] or result['recovered'] or elapsed_ms > 200:
+            print(f"[Registry] {result['message']} (device {self._snapshot['device_index']}, {elapsed_ms:.0f}ms)")
+
+        if self.on_health:
+            self.on_health(result)
+        return self._snapshot
@@ -0,0 +1,160 @@
+"""Freihand-Diktat: jede Äußerung läuft parallel durch Transkription und LLM, eingefügt wird in Reihenfolge"""
+import queue
+import asyncio
+import threading
+from concurrent.futures import Future
+from request_engine import CancelToken
+from transcription_pipeline import _context_tail, merge_overlap
+
+MAX_PARALLEL_UTTERANCES = 3
+MAX_PENDING_UTTERANCES = 8  # Mehr wartende Clips blockieren den Segment-Thread (Speicher bleibt konstant)
+OVERLAP_WAIT_SECONDS = 120  # Harter Schnitt: so lange auf das Transkript der vorherigen Äußerung warten
+PREVIOUS_SESSION_WAIT_SECONDS = 300  # So lange wartet das Einfügen auf die vorherige Session
+
+
+class HandsFreeSession:
+    """Sink für den AudioRecorder im Freihand-Modus (submit/submit_missing/close wie SegmentPipeline).
+
+    Die Äußerungen werden als Coroutinen auf der Request-Engine unabhängig voneinander
+    transkribiert und mit process_llm verarbeitet; ein Einfüge-Thread gibt die Ergebnisse strikt in Aufnahme-Reihenfolge
+    an on_result(raw, final, clip, inserted) weiter, sobald alle vorherigen fertig sind.
+    Leere oder fehlgeschlagene Äußerungen werden übersprungen, halten die Reihenfolge aber nicht auf.
+    Mit after (vorherige Session) beginnt das Einfügen erst, wenn deren Einfüge-Thread fertig ist.
+    """
+
+    def __init__(self, api, config, logger, on_result, on_finished=None, mode=None, after=None,
+                 max_workers=MAX_PARALLEL_UTTERANCES, max_pending=MAX_PENDING_UTTERANCES):
+        self.api = api
+        self.config = config
+        self.logger = logger
+        self.mode = mode  # None = aktueller Modus beim Eintreffen der Äußerung
+        self.on_result = on_result
+        self.on_finished = on_finished  # Callback() nach dem letzten Einfügen (aus dem Einfüge-Thread)
+        self.after = after  # Vorherige HandsFreeSession, die evtl. noch einfügt
+        self.max_workers = max_workers
+        self._parallel = None  # asyncio.Semaphore, im Loop angelegt
+        self._token = CancelToken()
+        self._raw_futures = []  # Transkript pro Äußerung (Kontext und Überlappung für die nächste)
+        self._done = {}  # index -> (raw, final, clip), noch nicht an der Reihe
+        self._next_index = 0
+        self._closed = False
+        self._cancelled = False
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._ready = queue.SimpleQueue()
+        self.inserted = 0
+        self._inserter = threading.Thread(target=self._insert_loop, name="HandsFreeInsert", daemon=True)
+        self._inserter.start()
+
+    @property
+    def pending(self):
+        with self._lock:
+            return len(self._raw_futures) - self._next_index
+
+    def submit(self, audio):
+        """Neue Äußerung (AudioClip, aus dem Segment-Thread des Recorders)"""
+        self._slots.acquire()
+        with self._lock:
+            if self._cancelled:
+                self._slots.release()
+                return
+            index = len(self._raw_futures)
+            previous = self._raw_futures[-1] if self._raw_futures else None
+            raw_future = Future()
+            self._raw_futures.append(raw_future)
+            mode = self.mode or self.config.get("mode")
+            future = self.api.engine.submit(self._process(index, audio, previous, raw_future, mode), self._token)
+        future.add_done_callback(lambda _: self._slots.release())
+        self.logger.log(f"[HandsFree] Utterance {index + 1} submitted ({audio.duration:.1f}s)")
+
+    def submit_missing(self, reason):
+        """Äußerung ging vor dem Kodieren verloren - nichts einzufügen, die Reihenfolge bleibt"""
+        self.logger.log(f"[HandsFree] Utterance lost: {reason}", "warning")
+
+    async def _process(self, index, audio, previous, raw_future, mode):
+        if self._parallel is None:
+            self._parallel = asyncio.Semaphore(self.max_workers)
+        async with self._parallel:
+            await self._process_utterance(index, audio, previous, raw_future, mode)
+
+    async def _process_utterance(self, index, audio, previous, raw_future, mode):
+        raw = final = None
+        deadline = self.api.new_deadline()  # Transkription + LLM dieser Äußerung
+        try:
+            context = None
+            if previous is not None and previous.done() and previous.result():
+                context = _context_tail(previous.result())
+            raw = await self.api.transcribe_async(audio, context=context, deadline=deadline)
+            if raw and audio.overlap_seconds > 0 and previous is not None:
+                # Harter Schnitt: doppelte Wörter erst entfernen, wenn die vorherige Äußerung vorliegt
+                before = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(previous)), OVERLAP_WAIT_SECONDS)
+                if before:
+                    raw = merge_overlap(before, raw)
+        except Exception as e:
+            self.logger.log(f"[HandsFree] Utterance {index + 1} transcription failed: {e}", "warning")
+        finally:
+            raw_future.set_result(raw)
+
+        if raw and raw.strip():
+            try:
+                final = await self.api.process_llm_async(raw, mode, deadline=deadline)
+            except Exception as e:
+                self.logger.log(f"[HandsFree] Utterance {index + 1} LLM failed, inserting raw text: {e}", "warning")
+                final = raw
+        self._complete(index, raw, final, audio)
+
+    def _complete(self, index, raw, final, audio):
+        """Fertige Äußerung einreihen - alles, was jetzt lückenlos vorliegt, geht an den Einfüge-Thread"""
+        with self._lock:
+            self._done[index] = (raw, final, audio)
+            while self._next_index in self._done:
+                self._ready.put(self._done.pop(self._next_index))
+                self._next_index += 1
+            if self._closed and self._next_index == len(self._raw_futures):
+                self._ready.put(None)
+
+    def close(self):
+        """Aufnahme beendet - nach der letzten Äußerung endet der Einfüge-Thread"""
+        with self._lock:
+            self._closed = True
+            if self._next_index == len(self._raw_futures):
+                self._ready.put(None)
+
+    def cancel(self):
+        """Verwirft alle noch nicht eingefügten Äußerungen"""
+        with self._lock:
+            self._cancelled = True
+            self._closed = True
+        self._token.cancel()
+        self._ready.put(None)
+
+    def drain(self, timeout=None):
+        """Wartet, bis alle Äußerungen eingefügt sind (True = fertig, False = Timeout)"""
+        self._inserter.join(timeout)
+        return not self._inserter.is_alive()
+
+    def _insert_loop(self):
+        waited = self.after is None
+        while True:
+            item = self._ready.get()
+            if item is None or self._cancelled:
+                break
+            if not waited:
+                # Erst nach der vorherigen Session einfügen - sonst mischen sich die Texte
+                waited = True
+                if not self.after.drain(PREVIOUS_SESSION_WAIT_SECONDS):
+                    self.logger.log("[HandsFree] Previous session still inserting - continuing anyway", "warning")
+                self.after = None
+                if self._cancelled:
+                    break
+            raw, final, audio = item
+            if not final:
+                continue
+            try:
+                self.on_result(raw, final.strip(), audio, self.inserted)
+                self.inserted += 1
+            except Exception as e:
+                self.logger.log(f"[HandsFree] Insert failed: {e}", "error")
+        self.logger.log(f"[HandsFree] Session finished: {self.inserted} utterances inserted")
+        if self.on_finished:
+            self.on_finished()
@@ -0,0 +1,244 @@
+"""Vorkompilierter Hotkey-Matcher: Tastencodes statt Namen, Akkorde und mehrere Hotkeys pro Modus"""
+
+# Generische Modifier aus der Config passen auf beide Seiten
+GENERIC_MODIFIERS = {
+    "ctrl": ("ctrl", "ctrl_l", "ctrl_r"),
+    "alt": ("alt", "alt_l", "alt_r", "alt_gr"),
+    "shift": ("shift", "shift_l", "shift_r"),
+    "cmd": ("cmd", "cmd_l", "cmd_r"),
+}
+MODIFIER_NAMES = frozenset(name for names in GENERIC_MODIFIERS.values() for name in names)
+
+
+def key_name(key):
+    """Config-Name einer pynput-Taste ("ctrl_r", "a", "<65>") - nur für die Hotkey-Erfassung, nicht pro Tastendruck"""
+    try:
+        if hasattr(key, 'char') and key.char:
+            return key.char.lower()
+        elif hasattr(key, 'name'):
+            return key.name.lower()
+    except Exception:
+        pass
+    return str(key).replace("Key.", "").lower()
+
+
+def parse_hotkey(hotkey):
+    """'ctrl_l+alt_l+d' -> ['ctrl_l', 'alt_l', 'd'] - die letzte Taste löst aus, die anderen müssen gehalten sein"""
+    return [part.strip().lower() for part in (hotkey or "").split("+") if part.strip()]
+
+
+class HotkeyBinding:
+    """Ein Hotkey aus der Config; mode=None heißt aktueller Modus aus den Einstellungen.
+
+    Mit action wird statt einer Aufnahme nur action() aufgerufen (Beobachtung, z.B. Strg+V).
+    """
+
+    def __init__(self, hotkey, mode=None, action=None):
+        self.hotkey = hotkey
+        self.keys = parse_hotkey(hotkey)
+        self.mode = mode
+        self.action = action
+
+    def __repr__(self):
+        if self.action is not None:
+            return f"<HotkeyBinding {self.hotkey} -> {getattr(self.action, '__name__', 'action')}>"
+        return f"<HotkeyBinding {self.hotkey} -> {self.mode or 'aktueller Modus'}>"
+
+
+class _Entry:
+    """Kompilierter Hotkey: Bitmasken statt Namen"""
+
+    def __init__(self, binding, groups, release_mask):
+        self.binding = binding
+        self.groups = groups  # Pro Modifier eine Maske - mindestens eine Taste daraus muss gehalten sein
+        self.release_mask = release_mask  # Loslassen einer dieser Tasten beendet den Hotkey
+
+
+class _Table:
+    """Unveränderliche Lookup-Tabellen - wird als Ganzes ausgetauscht"""
+
+    def __init__(self):
+        self.by_key = {}  # pynput Key (Sondertasten) -> Bit
+        self.by_vk = {}  # Virtual-Key-Code -> Bit
+        self.by_char = {}  # Zeichen (KeyCode ohne vk) -> Bit
+        self.names = {}  # Bit -> Name (für on_watch, vorab berechnet)
+        self.triggers = {}  # Bit -> [_Entry], spezifischste zuerst
+        self.watch_mask = 0
+
+
+class HotkeyMatcher:
+    """Wertet jeden systemweiten Tastendruck im pynput-Hook aus - ohne Locks und Strings.
+
+    compile() übersetzt die Hotkey-Namen einmal in pynput-Keys bzw. Virtual-Key-Codes mit je
+    einem Bit. Pro Ereignis: Typprüfung, ein dict-Lookup (unbekannte Tasten sind damit fertig),
+    danach nur Bitoperationen. Gehaltene Tasten werden nicht erneut ausgelöst (Auto-Repeat);
+    ein verpasstes Loslassen (z.B. Sperrbildschirm) kostet damit höchstens einen Tastendruck.
+    Bei mehreren passenden Hotkeys gewinnt der mit den meisten Modifiern.
+
+    Läuft nur im Listener-Thread; compile() und capture() aus anderen Threads tauschen
+    lediglich eine Referenz aus, die beim nächsten Tastendruck ohne aktiven Hotkey greift.
+    """
+
+    def __init__(self, keyboard, on_activate, on_deactivate, on_watch=None):
+        self._keyboard = keyboard
+        self._keycode_cls = keyboard.KeyCode
+        self.on_activate = on_activate  # Callback(binding) - Auslöser gedrückt, Modifier gehalten
+        self.on_deactivate = on_deactivate  # Callback(binding) - eine Taste des aktiven Hotkeys losgelassen
+        self.on_watch = on_watch  # Callback(name) - beobachtete Taste gedrückt (z.B. Ruhemodus)
+        self._table = _Table()
+        self._pending = None
+        self._held = 0
+        self._active = None
+        self._capture = None
+
+    @property
+    def active(self):
+        """Binding, dessen Tasten gerade gehalten werden (oder None)"""
+        entry = self._active
+        return entry.binding if entry is not None else None
+
+    def compile(self, bindings, watch=()):
+        """Neue Hotkeys übernehmen (beliebiger Thread)
+
+        Args:
+            bindings: Liste von HotkeyBinding
+            watch: Tastennamen, bei denen on_watch aufgerufen wird (generische Modifier erlaubt)
+        """
+        table = _Table()
+        bits = {}
+
+        def bit_for(name):
+            if name not in bits:
+                bit = 1 << len(bits)
+                bits[name] = bit
+                table.names[bit] = name
+                self._register(table, name, bit)
+            return bits[name]
+
+        def mask_for(name):
+            mask = 0
+            for variant in GENERIC_MODIFIERS.get(name, (name,)):
+                mask |= bit_for(variant)
+            return mask
+
+        for binding in bindings:
+            if not binding.keys:
+                continue
+            try:
+                trigger = mask_for(binding.keys[-1])
+                groups = tuple(mask_for(name) for name in binding.keys[:-1])
+            except (KeyError, ValueError) as e:
+                print(f"[Hotkey] Unknown key in {binding.hotkey!r}: {e}")
+                continue
+            release_mask = trigger
+            for group in groups:
+                release_mask |= group
+            entry = _Entry(binding, groups, release_mask)
+            for bit in table.names:
+                if bit & trigger:
+                    table.triggers.setdefault(bit, []).append(entry)
+        for entries in table.triggers.values():
+            entries.sort(key=lambda entry: len(entry.groups), reverse=True)
+
+        for name in watch:
+            try:
+                table.watch_mask |= mask_for(name)
+            except (KeyError, ValueError):
+                pass
+        self._pending = table
+
+    def _register(self, table, name, bit):
+        """Name -> pynput-Key bzw. Tastencode (nur beim Kompilieren)"""
+        if len(name) == 1:
+            table.by_char[name] = bit
+            table.by_char[name.upper()] = bit
+            if name.isalnum() and name.isascii():
+                table.by_vk[ord(name.upper())] = bit  # Windows: VK_A..VK_Z, VK_0..VK_9
+        elif name.startswith("<") and name.endswith(">"):
+            table.by_vk[int(name[1:-1])] = bit  # Taste ohne Namen, z.B. "<255>"
+        else:
+            key = self._keyboard.Key[name]
+            table.by_key[key] = bit
+            vk = getattr(key.value, 'vk', None)
+            if vk:
+                table.by_vk[vk] = bit  # Manche Treiber melden Sondertasten als KeyCode
+
+    def capture(self, callback):
+        """Nächsten Hotkey aufnehmen (Einstellungen): callback(name) aus dem Listener-Thread.
+
+        Modifier allein lösen beim Loslassen aus ("ctrl_r"), sonst die erste andere Taste
+        mit allen gehaltenen Modifiern ("ctrl_l+alt_l+d").
+        """
+        self._capture = ([], callback)
+
+    def press(self, key):
+        """pynput on_press"""
+        if self._capture is not None:
+            self._capture_press(key)
+            return
+        if self._pending is not None and self._active is None:
+            self._table, self._pending = self._pending, None
+            self._held = 0
+        table = self._table
+        if key.__class__ is self._keycode_cls:
+            bit = table.by_vk.get(key.vk) if key.vk is not None else table.by_char.get(key.char)
+        else:
+            bit = table.by_key.get(key)
+        if bit is None:
+            return
+        held = self._held
+        if held & bit:
+            return  # Auto-Repeat der gehaltenen Taste
+        held |= bit
+        self._held = held
+        if bit & table.watch_mask and self.on_watch is not None:
+            self.on_watch(table.names[bit])
+        if self._active is not None:
+            return
+        for entry in table.triggers.get(bit, ()):
+            for group in entry.groups:
+                if not held & group:
+                    break
+            else:
+                self._active = entry
+                self.on_activate(entry.binding)
+                return
+
+    def release(self, key):
+        """pynput on_release"""
+        if self._capture is not None:
+            self._capture_release(key)
+            return
+        table = self._table
+        if key.__class__ is self._keycode_cls:
+            bit = table.by_vk.get(key.vk) if key.vk is not None else table.by_char.get(key.char)
+        else:
+            bit = table.by_key.get(key)
+        if bit is None:
+            return
+        self._held &= ~bit
+        entry = self._active
+        if entry is not None and bit & entry.release_mask:
+            self._active = None
+            self.on_deactivate(entry.binding)
+
+    def _capture_press(self, key):
+        modifiers, callback = self._capture
+        name = key_name(key)
+        if len(name) == 1 and not name.isprintable():
+            # Mit gehaltenem Strg liefert Windows Steuerzeichen ("\x04" für D) - dann den Tastencode nehmen
+            vk = getattr(key, 'vk', None)
+            name = chr(vk).lower() if vk is not None and chr(vk).isalnum() and chr(vk).isascii() else f"<{vk}>"
+        if name in MODIFIER_NAMES:
+            if name not in modifiers:
+                modifiers.append(name)
+            return
+        self._capture = None
+        callback("+".join(modifiers + [name]))
+
+    def _capture_release(self, key):
+        modifiers, callback = self._capture
+        if key_name(key) in modifiers:
+            # Nur Modifier gedrückt: der zuletzt gedrückte löst aus, die anderen sind gehalten
+            self._capture = None
+            callback("+".join(modifiers))
@@ -4,9 +4,10 @@ Komplette Migration mit allen Features
 """
 
 import sys
+import json
 import os
 import time
-import threading
+import asyncio
 # numpy is lazy-loaded where needed for faster startup
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
@@ -14,22 +15,30 @@ from PySide6.QtWidgets import (
     QFrame, QScrollArea, QGraphicsDropShadowEffect, QSlider,
     QMessageBox, QSystemTrayIcon, QMenu, QCheckBox, QSpinBox,
     QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView,
-    QProgressBar, QDialog, QDialogButtonBox, QFormLayout, QSizePolicy
+    QProgressBar, QDialog, QDialogButtonBox, QFormLayout, QSizePolicy, QFileDialog
 )
-from PySide6.QtCore import Qt, QSize, Signal, QObject, QThread, QTimer
-from PySide6.QtGui import QFont, QColor, QIcon, QAction, QPixmap, QPainter, QBrush, QPen
+from PySide6.QtCore import Qt, QSize, Signal, QObject, QThread, QTimer, QEvent
+from PySide6.QtGui import QFont, QColor, QIcon, QAction, QPixmap, QPainter, QBrush, QPen, QTextCursor
 import qtawesome as qta
 
 # Import existing modules
 from config import ConfigManager, LANGUAGES, TARGET_LANGUAGES, APP_NAME, APP_VERSION, APP_DATA_DIR, format_hotkey_name
-from audio_handler import AudioRecorder, NO_AUDIO_DETECTED
+from audio_handler import AudioRecorder, NO_AUDIO_DETECTED, MIN_DURATION_SECONDS
 from api_handler import APIHandler
+from request_engine import CancelToken, RequestCancelled
 from data_handler import DataHandler
+from transcription_pipeline import SegmentPipeline
+from hands_free import HandsFreeSession, PREVIOUS_SESSION_WAIT_SECONDS
+from hotkey_matcher import HotkeyMatcher, HotkeyBinding
+from text_injection import TextInjector
+from device_registry import DeviceRegistry
+from audio_idle import StreamIdlePolicy, REARM_KEY_PREFIXES as IDLE_REARM_KEY_PREFIXES
+from audio_telemetry import format_report as format_telemetry_report
+from audio_meter import LevelMeter, MAIN_SOURCE as MAIN_LEVEL_SOURCE, RMS as LEVEL_RMS, MAX_RMS as LEVEL_MAX_RMS
 from updater import check_for_updates, download_update, install_zip_update, install_msi_update
 
 # Lazy imports
 _pyperclip = None
-_pyautogui = None
 _pynput_keyboard = None
 
 
@@ -41,14 +50,6 @@ def _get_pyperclip():
     return _pyperclip
 
 
-def _get_pyautogui():
-    global _pyautogui
-    if _pyautogui is None:
-        import pyautogui
-        _pyautogui = pyautogui
-    return _pyautogui
-
-
 def _get_pynput():
     global _pynput_keyboard
     if _pynput_keyboard is None:
@@ -131,68 +132,106 @@ COLORS = get_colors()
 
 
 # ═══════════════════════════════════════════════════════════════
-# WORKER THREAD FOR TRANSCRIPTION
+# WORKER FOR TRANSCRIPTION (REQUEST ENGINE)
 # ═══════════════════════════════════════════════════════════════
 
-class TranscriptionWorker(QThread):
-    """Worker Thread für Transkription im Hintergrund"""
+class EngineWorker(QObject):
+    """Qt-Adapter für einen Job auf der Request-Engine (statt eines QThreads pro Request).
+
+    job ist eine Coroutine-Factory: start() reicht job() an den Loop der Engine; Signale
+    kommen aus dem Loop-Thread und landen per Queued Connection im UI-Thread. cancel()
+    bricht laufende Requests und Retry-Wartezeiten sofort ab.
+    """
+
+    def __init__(self, engine, job):
+        super().__init__()
+        self.engine = engine
+        self.job = job
+        self.token = CancelToken()
+        self._future = None
+
+    def start(self):
+        self._future = self.engine.submit(self.job(), self.token)
+
+    def isRunning(self):
+        return self._future is not None and not self._future.done()
+
+    def cancel(self):
+        self.token.cancel()
+
+
+class TranscriptionWorker(EngineWorker):
+    """Transkription + LLM als Coroutine im Hintergrund"""
     finished = Signal(str, str)  # (final_text, raw_transcript)
     error = Signal(str)
     status = Signal(str)
 
-    def __init__(self, api, config, data, audio_file):
-        super().__init__()
+    def __init__(self, api, config, data, audio, injector, pipeline=None, mode=None, after=None):
+        super().__init__(api.engine, self._transcribe)
         self.api = api
         self.config = config
         self.data = data
-        self.audio_file = audio_file
+        self.audio = audio  # AudioClip im Speicher
+        self.injector = injector  # TextInjector (Zwischenablage + Strg+V)
+        self.pipeline = pipeline  # SegmentPipeline mit bereits laufenden Segmenten (optional)
+        self.mode = mode  # Modus des Hotkeys (None = aktueller Modus)
+        self.after = after  # HandsFreeSession, die evtl. noch einfügt - erst danach einfügen
 
-    def run(self):
+    async def _transcribe(self):
         try:
             self.status.emit("processing")
-            print(f"[Worker] Starting transcription for: {self.audio_file}")
-
-            print("[Worker] Calling api.transcribe()...")
-            raw = self.api.transcribe(self.audio_file)
+            print(f"[Worker] Starting transcription for: {self.audio}")
+            # Ein Zeitbudget vom Loslassen bis zum Text - Transkription und LLM zusammen
+            deadline = self.api.new_deadline()
+
+            raw = None
+            if self.pipeline is not None:
+                print(f"[Worker] Collecting {self.pipeline.segment_count} pipelined segments...")
+                # Langdiktat: Lücken markieren statt alles zu verwerfen (kein vollständiger Fallback möglich)
+                raw = await self.pipeline.collect_async(timeout=deadline.remaining(),
+                                                        allow_partial=not self.audio.complete)
+                if raw is None:
+                    if not self.audio.complete:
+                        raise Exception("Transkription des Langdiktats fehlgeschlagen")
+                    print("[Worker] No segment result - falling back to full recording")
+
+            if raw is None:
+                print("[Worker] Calling api.transcribe_async()...")
+                raw = await self.api.transcribe_async(self.audio, deadline=deadline)
             print(f"[Worker] Transcribe returned: {len(raw) if raw else 0} chars")
             
             if not raw:
                 raise Exception("Kein Text erkannt")
 
-            mode = self.config.get("mode")
-            print(f"[Worker] Calling api.process_llm() with mode: {mode}")
-            final = self.api.process_llm(raw, mode)
+            mode = self.mode or self.config.get("mode")
+            print(f"[Worker] Calling api.process_llm_async() with mode: {mode}")
+            final = await self.api.process_llm_async(raw, mode, deadline=deadline)
             print(f"[Worker] process_llm returned: {len(final) if final else 0} chars")
+            if self.audio.released_at is not None:
+                self.api.warmup.record_release_to_text(time.perf_counter() - self.audio.released_at)
 
-            self.data.save_entry(mode, raw, final)
+            # SQLite und Einfügen blockieren - kurz in einem Hilfsthread statt im Loop
+            await asyncio.to_thread(self.data.save_entry, mode, raw, final, audio_stats=self.audio.stats)
             print("[Worker] Entry saved to database")
 
-            # Kopiere in Zwischenablage
-            _get_pyperclip().copy(final)
-            print("[Worker] Text copied to clipboard")
-
             # WICHTIG: Signal ZUERST emittieren für UI-Update
             self.finished.emit(final, raw)
             print("[Worker] Finished signal emitted")
 
-            # Dann kurz warten und einfügen (im Worker-Thread)
-            time.sleep(0.15)
-            try:
-                _get_pyautogui().hotkey("ctrl", "v")
-                print("[Worker] Paste executed")
-            except Exception as paste_err:
-                print(f"[Worker] Paste failed: {paste_err}")
+            # Dann einfügen: Zwischenablage bestätigen, gelernte Wartezeit, Strg+V
+            if self.after is not None and not await asyncio.to_thread(self.after.drain, PREVIOUS_SESSION_WAIT_SECONDS):
+                print("[Worker] Hands-free session still inserting - pasting anyway")
+            result = await asyncio.to_thread(self.injector.inject, final)
+            if not result.pasted:
+                print(f"[Worker] Paste failed: {result.error}")
 
+        except (RequestCancelled, asyncio.CancelledError):
+            print("[Worker] Transcription cancelled")
+            raise
         except Exception as e:
             print(f"[Worker] ERROR: {e}")
             self.data.log(str(e), "error")
             self.error.emit(str(e))
-        finally:
-            try:
-                if self.audio_file and os.path.exists(self.audio_file):
-                    os.remove(self.audio_file)
-            except:
-                pass
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -222,21 +261,21 @@ class DeviceLoadWorker(QThread):
 # REFINEMENT WORKER
 # ═══════════════════════════════════════════════════════════════
 
-class RefinementWorker(QThread):
-    """Worker Thread für Nachbearbeitung"""
+class RefinementWorker(EngineWorker):
+    """Nachbearbeitung als Coroutine im Hintergrund"""
     finished = Signal(str)
     error = Signal(str)
 
     def __init__(self, api, text, style, custom_instruction=None):
-        super().__init__()
+        super().__init__(api.engine, self._refine)
         self.api = api
         self.text = text
         self.style = style
         self.custom_instruction = custom_instruction
 
-    def run(self):
+    async def _refine(self):
         try:
-            result = self.api.refine_text(self.text, self.style, self.custom_instruction)
+            result = await self.api.refine_text_async(self.text, self.style, self.custom_instruction)
             self.finished.emit(result)
         except Exception as e:
             self.error.emit(str(e))
@@ -650,10 +689,13 @@ class MicrophoneTestDialog(QDialog):
     """Dialog zum Testen aller Mikrofone mit Live-Level-Anzeige.
 
     - Pausiert Haupt-Stream um Konflikte zu vermeiden
-    - Testet alle Geräte PARALLEL
+    - Testet alle Geräte PARALLEL über den gemeinsamen LevelMeter (öffnet im Hintergrund)
     - Sortiert nach 3 Sekunden: Geräte mit Pegel oben
     """
-    def __init__(self, parent=None, main_recorder=None):
+    stream_failed = Signal(int)  # device_id - Stream-Öffnen läuft im Hintergrund
+    levels_signal = Signal(object)  # LevelSnapshot aus dem Publisher-Thread
+
+    def __init__(self, parent=None, main_recorder=None, meter=None):
         super().__init__(parent)
         self.setWindowTitle("Mikrofone testen")
         self.setMinimumSize(500, 400)
@@ -661,8 +703,9 @@ class MicrophoneTestDialog(QDialog):
 
         self.colors = get_colors()
         self.main_recorder = main_recorder
-        self.streams = []
-        self.device_data = {}  # {device_id: {'bar': QProgressBar, 'row': QWidget, 'rms': float, 'max_rms': float}}
+        self.meter = meter if meter is not None else LevelMeter()
+        self.device_data = {}  # {device_id: {'bar': QProgressBar, 'row': QWidget, 'name': str, 'max_rms': float}}
+        self._bar_levels = {}  # Zuletzt gesetzter Balkenwert - nur Änderungen neu zeichnen
         self.running = True
         self.sorted = False
 
@@ -671,15 +714,13 @@ class MicrophoneTestDialog(QDialog):
             print("[MicTest] Pausiere Haupt-Audio-Stream...")
             self.main_recorder.stop_monitor()
 
+        self.stream_failed.connect(self._mark_unavailable)
+        self.levels_signal.connect(self._update_all_levels)
+        self._on_levels = self.levels_signal.emit  # Gleiche Referenz für subscribe/unsubscribe
         self.setup_ui()
         self.load_devices()
         self.start_all_streams()
 
-        # Timer für UI-Updates
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self._update_all_levels)
-        self.update_timer.start(50)  # 20 FPS
-
         # Nach 3 Sekunden sortieren
         QTimer.singleShot(3000, self._sort_by_level)
 
@@ -712,115 +753,93 @@ class MicrophoneTestDialog(QDialog):
         layout.addWidget(close_btn)
 
     def load_devices(self):
-        import sounddevice as sd
-        devices = sd.query_devices()
-
-        seen_names = set()  # Duplikat-Filter
-        for i, dev in enumerate(devices):
-            if dev["max_input_channels"] > 0:
-                name = dev["name"]
-                name_lower = name.lower()
-
-                # Skip irrelevante Geräte
-                if any(kw in name_lower for kw in ["stereo mix", "output", "loopback", "virtual"]):
-                    continue
-
-                # Skip Duplikate (gleiches Gerät für verschiedene Audio-APIs)
-                # Vergleiche nur die ersten 25 Zeichen (Namen werden manchmal abgeschnitten)
-                name_key = name[:25]
-                if name_key in seen_names:
-                    continue
-                seen_names.add(name_key)
-
-                row = QWidget()
-                row_layout = QHBoxLayout(row)
-                row_layout.setContentsMargins(8, 4, 8, 4)
-
-                name_label = QLabel(dev["name"][:40] + ("..." if len(dev["name"]) > 40 else ""))
-                name_label.setFont(QFont("Segoe UI", 10))
-                name_label.setFixedWidth(250)
-                name_label.setToolTip(dev["name"])
-                row_layout.addWidget(name_label)
-
-                level_bar = QProgressBar()
-                level_bar.setMinimum(0)
-                level_bar.setMaximum(100)
-                level_bar.setValue(0)
-                level_bar.setTextVisible(False)
-                level_bar.setMinimumHeight(16)
-                level_bar.setStyleSheet(f"""
-                    QProgressBar {{
-                        border: 1px solid {self.colors['border']};
-                        border-radius: 4px;
-                        background-color: {self.colors['bg_elevated']};
-                    }}
-                    QProgressBar::chunk {{
-                        background-color: {self.colors['success']};
-                        border-radius: 3px;
-                    }}
-                """)
-                row_layout.addWidget(level_bar)
-
-                self.device_data[i] = {
-                    'bar': level_bar,
-                    'row': row,
-                    'name': dev["name"],
-                    'rms': 0.0,
-                    'max_rms': 0.0
-                }
-                self.devices_layout.addWidget(row)
+        # Gleiche Filterung wie das Geräte-Dropdown (ohne Funktionstest - das übernimmt der Meter)
+        if self.main_recorder:
+            devices = self.main_recorder.get_input_devices(test_functionality=False)
+        else:
+            devices = AudioRecorder().get_input_devices(test_functionality=False)
+
+        for dev in devices:
+            row = QWidget()
+            row_layout = QHBoxLayout(row)
+            row_layout.setContentsMargins(8, 4, 8, 4)
+
+            name_label = QLabel(dev["name"][:40] + ("..." if len(dev["name"]) > 40 else ""))
+            name_label.setFont(QFont("Segoe UI", 10))
+            name_label.setFixedWidth(250)
+            name_label.setToolTip(dev["name"])
+            row_layout.addWidget(name_label)
+
+            level_bar = QProgressBar()
+            level_bar.setMinimum(0)
+            level_bar.setMaximum(100)
+            level_bar.setValue(0)
+            level_bar.setTextVisible(False)
+            level_bar.setMinimumHeight(16)
+            level_bar.setStyleSheet(f"""
+                QProgressBar {{
+                    border: 1px solid {self.colors['border']};
+                    border-radius: 4px;
+                    background-color: {self.colors['bg_elevated']};
+                }}
+                QProgressBar::chunk {{
+                    background-color: {self.colors['success']};
+                    border-radius: 3px;
+                }}
+            """)
+            row_layout.addWidget(level_bar)
+
+            self.device_data[dev["id"]] = {
+                'bar': level_bar,
+                'row': row,
+                'name': dev["name"],
+                'max_rms': 0.0
+            }
+            self.devices_layout.addWidget(row)
 
         self.devices_layout.addStretch()
 
     def start_all_streams(self):
-        """Startet Streams für alle Geräte parallel"""
-        import sounddevice as sd
-        import numpy as np
-
-        def make_callback(device_id):
-            def callback(indata, frames, time_info, status):
-                if self.running and indata.size > 0:
-                    rms = float(np.sqrt(np.mean(indata**2)))
-                    if device_id in self.device_data:
-                        self.device_data[device_id]['rms'] = rms
-                        # Track maximum für Sortierung
-                        if rms > self.device_data[device_id]['max_rms']:
-                            self.device_data[device_id]['max_rms'] = rms
-            return callback
-
-        for device_id in self.device_data.keys():
-            try:
-                stream = sd.InputStream(
-                    samplerate=16000,
-                    device=device_id,
-                    channels=1,
-                    blocksize=1024,
-                    callback=make_callback(device_id)
-                )
-                stream.start()
-                self.streams.append(stream)
-                print(f"[MicTest] Stream gestartet für Device {device_id}")
-            except Exception as e:
-                print(f"[MicTest] Fehler bei Device {device_id}: {e}")
-                bar = self.device_data[device_id]['bar']
-                bar.setStyleSheet(f"""
-                    QProgressBar {{
-                        border: 1px solid {self.colors['accent']};
-                        border-radius: 4px;
-                        background-color: {self.colors['bg_elevated']};
-                    }}
-                """)
-                bar.setFormat("Nicht verfügbar")
-                bar.setTextVisible(True)
-
-    def _update_all_levels(self):
-        """Aktualisiert alle Level-Anzeigen"""
+        """Öffnet alle Geräte im LevelMeter (Hintergrund, parallel) und abonniert die Pegel"""
+        cache = self.main_recorder._get_probe_cache() if self.main_recorder else None
+
+        def mark_failed(device_id):
+            if self.running:
+                self.stream_failed.emit(device_id)
+
+        self.meter.subscribe(self._on_levels)
+        self.meter.open_devices(list(self.device_data), probe_cache=cache, on_failed=mark_failed)
+
+    def _mark_unavailable(self, device_id):
+        """Markiert ein Gerät, dessen Stream nicht geöffnet werden konnte"""
+        if device_id not in self.device_data:
+            return
+        bar = self.device_data[device_id]['bar']
+        bar.setStyleSheet(f"""
+            QProgressBar {{
+                border: 1px solid {self.colors['accent']};
+                border-radius: 4px;
+                background-color: {self.colors['bg_elevated']};
+            }}
+        """)
+        bar.setFormat("Nicht verfügbar")
+        bar.setTextVisible(True)
+
+    def _update_all_levels(self, snapshot):
+        """Übernimmt einen Pegel-Snapshot - nur Balken mit geändertem Wert werden neu gezeichnet"""
         if not self.running:
             return
 
-        for device_id, data in self.device_data.items():
-            level = min(int(data['rms'] * 500), 100)
-            data['bar'].setValue(level)
+        bar_levels = (snapshot.levels[:, LEVEL_RMS] * 500).clip(0, 100).astype(int).tolist()
+        max_rms = snapshot.levels[:, LEVEL_MAX_RMS].tolist()
+        for key, level, peak_rms in zip(snapshot.keys, bar_levels, max_rms):
+            data = self.device_data.get(key)
+            if data is None:
+                continue  # z.B. MAIN_SOURCE
+            data['max_rms'] = peak_rms
+            if self._bar_levels.get(key) != level:
+                self._bar_levels[key] = level
+                data['bar'].setValue(level)
 
     def _sort_by_level(self):
         """Sortiert die Liste nach erkanntem Pegel (höchster oben)"""
@@ -856,16 +875,9 @@ class MicrophoneTestDialog(QDialog):
 
     def closeEvent(self, event):
         self.running = False
-        self.update_timer.stop()
-
-        # Alle Streams schließen
-        for stream in self.streams:
-            try:
-                stream.stop()
-                stream.close()
-            except:
-                pass
-        self.streams.clear()
+        self.meter.unsubscribe(self._on_levels)
+        # Alle Geräte-Streams schließen
+        self.meter.close_devices()
 
         # Haupt-Recorder Stream wieder starten
         if self.main_recorder:
@@ -887,8 +899,11 @@ class ACTScriber(QMainWindow):
     # Signals for thread-safe UI updates from hotkey listener
     hotkey_set_signal = Signal(str)
     overlay_status_signal = Signal(str)
-    transcription_signal = Signal(str)  # For starting transcription from hotkey thread
+    transcription_signal = Signal(object, object, object)  # (AudioClip, pipeline, mode) - starting transcription from hotkey thread
     no_audio_warning_signal = Signal()
+    device_health_signal = Signal(dict)  # Ergebnis der Geräteprüfung aus dem Registry-Thread
+    audio_level_signal = Signal(object)  # LevelSnapshot aus dem LevelMeter-Thread
+    hands_free_text_signal = Signal(str, str, bool)  # (eingefügter Text, Rohtext, erste Äußerung) aus dem Einfüge-Thread
 
     def __init__(self):
         super().__init__()
@@ -905,6 +920,8 @@ class ACTScriber(QMainWindow):
         self.overlay_status_signal.connect(self._on_overlay_status)
         self.transcription_signal.connect(self._on_start_transcription)
         self.no_audio_warning_signal.connect(self.show_no_audio_warning)
+        self.device_health_signal.connect(self._on_device_health)
+        self.hands_free_text_signal.connect(self._on_hands_free_text)
 
         # Core Components
         self.config = ConfigManager()
@@ -912,18 +929,25 @@ class ACTScriber(QMainWindow):
         self.api = APIHandler(self.config, self.data)
         self.recorder = AudioRecorder(
             device_index=self.config.get("device_index"),
-            audio_sensitivity=self.config.get("audio_sensitivity")
+            audio_sensitivity=self.config.get("audio_sensitivity"),
+            vad_trim=self.config.get("vad_trim"),
+            vad_max_pause_seconds=self.config.get("vad_max_pause_seconds"),
+            spool=self.config.get("recording_spool"),
+            low_latency=bool(self.config.get("low_latency_audio"))
         )
+        self.injector = TextInjector(restore_clipboard=bool(self.config.get("restore_clipboard")))
 
         # State
-        self.is_setting_hotkey = False
-        self.hotkey_lock = threading.Lock()
         self.current_worker = None
         self.colors = COLORS
         self.custom_buttons = []  # UI Buttons für Custom Instructions
         self._last_raw_transcript = None  # For repeat functionality
         self._audio_warning_shown = False  # Anti-loop: nur einmal warnen
         self._last_no_audio_warning_time = 0  # Cooldown fuer Audio-Warnung
+        self._segment_pipeline = None  # SegmentPipeline der laufenden Aufnahme
+        self._hands_free = None  # HandsFreeSession des laufenden Freihand-Diktats
+        self._hands_free_last = None  # Zuletzt beendete Session - fügt evtl. noch ein
+        self.hotkey_matcher = None  # HotkeyMatcher im Listener-Thread (setup_hotkey_listener)
 
         # Setup UI
         self.setup_ui()
@@ -968,6 +992,45 @@ class ACTScriber(QMainWindow):
         device_index = self.config.get("device_index")
         device_name = self.config.get("device_name")
         self.recorder.start_monitor(device_index, device_name)
+        # Geräte-Registry erst nach dem Stream-Start (erste Prüfung soll den Stream sehen)
+        self.device_registry.start()
+        self.idle_policy.start()
+        # Nicht abgeschlossene Aufnahmen aus dem Spool anbieten (Absturz/Standby)
+        QTimer.singleShot(1000, self._check_orphaned_recordings)
+
+    def _check_orphaned_recordings(self):
+        """Bietet nach einem Absturz nicht abgeschlossene Aufnahmen zur Transkription an"""
+        try:
+            orphans = self.recorder.find_orphaned_recordings()
+        except Exception as e:
+            print(f"[Spool] Orphan check failed: {e}")
+            return
+
+        for orphan in sorted(orphans, key=lambda o: o['modified'], reverse=True):
+            if orphan['duration'] < MIN_DURATION_SECONDS:
+                self.recorder.discard_recording(orphan['path'])
+                continue
+
+            recorded_at = time.strftime("%d.%m.%Y %H:%M", time.localtime(orphan['modified']))
+            reply = QMessageBox.question(
+                self, "Aufnahme wiederherstellen",
+                f"Eine Aufnahme vom {recorded_at} ({orphan['duration']:.0f} s) wurde nicht abgeschlossen "
+                f"(Absturz oder Standby).\n\nJetzt transkribieren?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            if reply != QMessageBox.StandardButton.Yes:
+                self.recorder.discard_recording(orphan['path'])
+                continue
+
+            try:
+                audio = self.recorder.recover_recording(orphan['path'])
+            except Exception as e:
+                self.data.log(f"[Spool] Recovery failed: {e}", "error")
+                continue
+            print(f"[Spool] Recovered {audio}")
+            self.overlay.set_status("processing")
+            self.start_transcription(audio)
+            break  # Weitere Waisen beim nächsten Start (eine Transkription zur Zeit)
 
     def setup_auto_updater(self):
         """Initialisiert das Auto-Update-System"""
@@ -1193,11 +1256,19 @@ class ACTScriber(QMainWindow):
 
         if view_id == "history":
             self.refresh_history()
+        elif view_id == "help":
+            self.refresh_diagnostics()
+
+        # Pegelanzeige nur abonnieren, solange sie sichtbar ist
+        self.level_meter.unsubscribe(self._on_audio_level)
+        if view_id == "settings":
+            self.level_meter.subscribe(self._on_audio_level)
 
         self.update_nav_icons()
 
         # In Settings: Geräteliste aktualisieren (Stream läuft bereits im Hintergrund)
         if view_id == "settings":
+            self.idle_policy.touch()
             self.refresh_devices()
             # Stream läuft bereits seit App-Start, nur sicherstellen dass er aktiv ist
             if not self.recorder._unified_stream:
@@ -1916,27 +1987,27 @@ class ACTScriber(QMainWindow):
 
     def setup_audio_monitor(self):
         """Richtet den Audio-Pegel Monitor ein"""
-        self.audio_monitor_timer = QTimer()
-        self.audio_monitor_timer.timeout.connect(self.update_audio_level)
-        self.audio_monitor_timer.start(50)  # 20 FPS
-
-        # Device Health Check Timer (für Energiesparmodus-Recovery)
-        self.device_health_timer = QTimer()
-        self.device_health_timer.timeout.connect(self.check_audio_device_health)
-        self.device_health_timer.start(10000)  # Alle 10 Sekunden
-
-    def check_audio_device_health(self):
-        """Prueft periodisch ob das Audio-Device noch funktioniert (Energiesparmodus-Recovery)"""
-        if not hasattr(self, 'recorder') or self.recorder is None:
-            return
+        # Gemeinsamer Pegel-Service (auch für den Mikrofontest) - Snapshots mit 20 Hz, nur bei Änderung.
+        # Abonniert nur, solange die Einstellungen offen sind (sonst läuft kein Publisher-Thread)
+        self.level_meter = LevelMeter(self.recorder)
+        self.audio_level_signal.connect(self.update_audio_level)
+        self._on_audio_level = self.audio_level_signal.emit
+
+        # Ruhemodus: Stream nach Inaktivität schließen, bei Modifier-Taste/Fensterfokus vorab öffnen
+        self.idle_policy = StreamIdlePolicy(
+            self.recorder, self.config, idle_minutes=self.config.get("audio_idle_minutes")
+        )
 
-        # Nicht pruefen waehrend aktiver Aufnahme
-        if self.recorder.is_recording:
-            return
+        # Geräte-Registry: prüft Gerät + Stream im Hintergrund (Energiesparmodus, Docking Station)
+        # Gestartet wird sie in _start_audio_monitor_delayed
+        self.device_registry = DeviceRegistry(
+            self.recorder, self.config,
+            on_health=self.device_health_signal.emit
+        )
 
+    def _on_device_health(self, result):
+        """Verarbeitet das Ergebnis der Geräteprüfung im UI-Thread (Statustext, Log)"""
         try:
-            result = self.recorder.check_device_health()
-
             if result['recovered']:
                 # Device wurde gewechselt - Log und UI-Update
                 self._audio_warning_shown = False  # Reset: Mic ist wieder OK
@@ -1969,11 +2040,11 @@ class ACTScriber(QMainWindow):
         except Exception as e:
             self.data.log(f"[Audio] Health check error: {e}", "error")
 
-    def update_audio_level(self):
-        """Aktualisiert die Audio-Pegel Anzeige (Live + Recording)"""
+    def update_audio_level(self, snapshot):
+        """Aktualisiert die Audio-Pegel Anzeige (Live + Recording) aus einem LevelMeter-Snapshot"""
         if hasattr(self, 'audio_level_bar'):
             try:
-                rms = getattr(self.recorder, 'current_rms', 0)
+                rms = snapshot.rms(MAIN_LEVEL_SOURCE)
                 # Normalisiere auf 0-100 (logarithmische Skala-Gefühl)
                 level = min(100, int(rms * 5000))
                 self.audio_level_bar.setValue(level)
@@ -2274,9 +2345,41 @@ class ACTScriber(QMainWindow):
         log_layout.addWidget(self.log_text)
 
         layout.addWidget(log_card)
+
+        # ══════════════════════════════════════════════════════════
+        # AUDIO-DIAGNOSE - Stream-Telemetrie (Overflows, Latenz, Hotkey bis Audio)
+        # ══════════════════════════════════════════════════════════
+        diag_card = MaterialCard(elevation=1)
+        diag_layout = QVBoxLayout(diag_card)
+        diag_layout.setSpacing(8)
+
+        diag_header = QHBoxLayout()
+        diag_title = QLabel("Audio-Diagnose")
+        diag_title.setFont(QFont("Segoe UI", 11))
+        diag_title.setStyleSheet(f"color: {self.colors['text_light']};")
+        diag_header.addWidget(diag_title)
+        diag_header.addStretch()
+
+        refresh_diag_btn = self.create_action_button("Aktualisieren", "fa5s.sync", "ghost")
+        refresh_diag_btn.clicked.connect(self.refresh_diagnostics)
+        diag_header.addWidget(refresh_diag_btn)
+        export_diag_btn = self.create_action_button("Exportieren", "fa5s.file-export", "ghost")
+        export_diag_btn.clicked.connect(self.export_diagnostics)
+        diag_header.addWidget(export_diag_btn)
+        diag_layout.addLayout(diag_header)
+
+        self.diag_text = QTextEdit()
+        self.diag_text.setReadOnly(True)
+        self.diag_text.setMaximumHeight(130)
+        self.diag_text.setObjectName("TranscriptText")
+        self.diag_text.setFont(QFont("Consolas", 8))
+        diag_layout.addWidget(self.diag_text)
+
+        layout.addWidget(diag_card)
         layout.addStretch()
 
         self.refresh_log()
+        self.refresh_diagnostics()
 
         return view
 
@@ -2285,6 +2388,40 @@ class ACTScriber(QMainWindow):
         log_content = self.data.get_log_content(50)
         self.log_text.setPlainText(log_content)
 
+    def _collect_diagnostics(self):
+        """Stream-Telemetrie + Watchdog-Kennzahlen als dict"""
+        diagnostics = self.recorder.get_diagnostics()
+        if hasattr(self, 'device_registry'):
+            diagnostics.update(self.device_registry.watchdog.get_metrics())
+        if hasattr(self, 'idle_policy'):
+            diagnostics.update(self.idle_policy.get_metrics())
+        diagnostics.update(self.api.warmup.get_metrics())
+        diagnostics['app_version'] = APP_VERSION
+        diagnostics['stream_active'] = self.recorder._unified_stream is not None
+        return diagnostics
+
+    def refresh_diagnostics(self):
+        """Zeigt die aktuelle Audio-Telemetrie in der Hilfe-Ansicht"""
+        try:
+            self.diag_text.setPlainText(format_telemetry_report(self._collect_diagnostics()))
+        except Exception as e:
+            self.diag_text.setPlainText(f"Diagnose nicht verfügbar: {e}")
+
+    def export_diagnostics(self):
+        """Speichert die Audio-Telemetrie als JSON (für Support-Anfragen)"""
+        default_path = os.path.join(os.path.expanduser("~"), f"actscriber_audio_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        path, _ = QFileDialog.getSaveFileName(self, "Audio-Diagnose exportieren", default_path, "JSON (*.json)")
+        if not path:
+            return
+        try:
+            diagnostics = self._collect_diagnostics()
+            diagnostics['exported_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(diagnostics, f, indent=2, ensure_ascii=False)
+            self.data.log(f"[Audio] Diagnose exportiert: {path}", "info")
+        except Exception as e:
+            QMessageBox.warning(self, "Export fehlgeschlagen", f"Diagnose konnte nicht gespeichert werden:\n{e}")
+
     # ═══════════════════════════════════════════════════════════════
     # HELPER METHODS
     # ═══════════════════════════════════════════════════════════════
@@ -2352,18 +2489,9 @@ class ACTScriber(QMainWindow):
         self.repeat_btn.setEnabled(False)
         self.overlay.set_status("processing")
 
-        # Create a copy of the audio file so it doesn't get deleted
-        import shutil
-        temp_copy = last_audio.replace("last_recording", "repeat_temp")
-        try:
-            shutil.copy2(last_audio, temp_copy)
-        except Exception as e:
-            self.data.log(f"Could not copy audio: {e}", "error")
-            self.repeat_btn.setEnabled(True)
-            return
-
-        # Reuse the existing TranscriptionWorker
-        worker = TranscriptionWorker(self.api, self.config, self.data, temp_copy)
+        # Reuse the existing TranscriptionWorker (AudioClip im Speicher - keine Kopie nötig)
+        worker = TranscriptionWorker(self.api, self.config, self.data, last_audio, self.injector,
+                                     after=self._hands_free_last)
         worker.finished.connect(self._on_repeat_finished)
         worker.error.connect(self._on_repeat_error)
         worker.start()
@@ -2441,6 +2569,7 @@ class ACTScriber(QMainWindow):
         if self.settings_view.isVisible():
             self.recorder.stop_monitor()
             self.recorder.start_monitor(device_index=device_id, device_name=self.config.get("device_name"))
+        self.device_registry.refresh_now()
 
     def refresh_devices(self):
         """Lädt Geräteliste neu im Hintergrund (blockiert UI nicht)"""
@@ -2492,7 +2621,7 @@ class ACTScriber(QMainWindow):
 
     def show_mic_test_dialog(self):
         """Öffnet den Dialog zum Testen aller Mikrofone"""
-        dialog = MicrophoneTestDialog(self, main_recorder=self.recorder)
+        dialog = MicrophoneTestDialog(self, main_recorder=self.recorder, meter=self.level_meter)
         dialog.exec()
 
 
@@ -2511,8 +2640,9 @@ class ACTScriber(QMainWindow):
 
     def start_hotkey_capture(self):
         """Startet Hotkey-Erfassung"""
-        with self.hotkey_lock:
-            self.is_setting_hotkey = True
+        if self.hotkey_matcher is None:
+            return
+        self.hotkey_matcher.capture(self._on_hotkey_captured)
         self.hotkey_btn.setText("Drücke eine Taste...")
         self.hotkey_info_label.setText("Warte auf Tastendruck...")
         self.hotkey_info_label.setStyleSheet(f"color: {self.colors['primary']};")
@@ -2527,95 +2657,142 @@ class ACTScriber(QMainWindow):
             keyboard = _get_pynput()
             print("[Hotkey] Starting listener...")
 
-            def get_key_name(key):
-                try:
-                    if hasattr(key, 'char') and key.char:
-                        return key.char.lower()
-                    elif hasattr(key, 'name'):
-                        return key.name.lower()
-                except:
-                    pass
-                return str(key).replace("Key.", "").lower()
-
-            def on_press(key):
-                key_name = get_key_name(key)
-                # print(f"[Hotkey] Key pressed: {key_name}") # Disabled for privacy
-
-                with self.hotkey_lock:
-                    if self.is_setting_hotkey:
-                        self.config.set("hotkey", key_name)
-                        self.is_setting_hotkey = False
-                        # Use signal for thread-safe UI update
-                        self.hotkey_set_signal.emit(key_name)
-                        print(f"[Hotkey] New hotkey set: {key_name}")
-                        return
-
-                target_key = self.config.get("hotkey")
-                if key_name == target_key and not self.recorder.is_recording:
-                    print(f"[Hotkey] Recording started with key: {key_name}")
-                    self.overlay_status_signal.emit("recording")
-
-                    # Auto-Recovery: Prüfe ob Mikrofon noch verfügbar (Docking Station Szenario)
-                    dev_idx = self.config.get("device_index")
-                    dev_name = self.config.get("device_name")
-                    recovered_idx, needs_restart = self.recorder.ensure_device_available(dev_idx, dev_name)
-
-                    if recovered_idx != dev_idx and recovered_idx is not None:
-                        # Gerät hat neue ID bekommen - Config aktualisieren
-                        print(f"[Hotkey] Device ID changed: {dev_idx} -> {recovered_idx}")
-                        self.config.set("device_index", recovered_idx)
-                        dev_idx = recovered_idx
-
-                    if needs_restart and self.recorder._unified_stream:
-                        # Stream neu starten mit korrektem Geraet
-                        self.recorder.stop_monitor()
-                        new_dev = self.recorder._start_unified_stream(dev_idx, dev_name)
-                        if new_dev is None:
-                            # Kein Geraet verfuegbar - Statustext, kein Crash
-                            print("[Hotkey] No audio device available after switch")
-                            self.overlay_status_signal.emit("error")
-                            return
-
-                    self.recorder.start_recording(device_index=dev_idx)
-
-            def on_release(key):
-                key_name = get_key_name(key)
-                target_key = self.config.get("hotkey")
-
-                with self.hotkey_lock:
-                    if self.is_setting_hotkey:
-                        return
-
-                if key_name == target_key and self.recorder.is_recording:
-                    print(f"[Hotkey] Recording stopped with key: {key_name}")
-                    file_path = self.recorder.stop_recording()
-
-                    if file_path == NO_AUDIO_DETECTED:
-                        self.overlay_status_signal.emit("error")
-                        # Use signal for thread-safe warning (with cooldown in handler)
-                        self.no_audio_warning_signal.emit()
-                    elif file_path:
-                        # Validation: Check file size (at least 8KB for valid wav + audio data)
-                        file_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
-                        print(f"[Hotkey] File path: {file_path}, size: {file_size}")
-                        if file_size > 8000:
-                            self.overlay_status_signal.emit("processing")
-                            # Use signal instead of QTimer for thread-safety
-                            self.transcription_signal.emit(file_path)
-                        else:
-                            print(f"[Audio] Warning: Recording file too small or missing ({file_path})")
-                            self.overlay_status_signal.emit("error")
-                            self.no_audio_warning_signal.emit()
-                    else:
-                        print("[Hotkey] No file returned from stop_recording")
-                        self.overlay_status_signal.emit("aborted")
-
-            self.listener = keyboard.Listener(on_press=on_press, on_release=on_release)
+            self.hotkey_matcher = HotkeyMatcher(
+                keyboard,
+                on_activate=self._on_hotkey_activate,
+                on_deactivate=self._on_hotkey_deactivate,
+                on_watch=self._arm_stream  # Ruhemodus: jede Modifier-Taste öffnet den Stream vorab
+            )
+            self._compile_hotkeys()
+            self.listener = keyboard.Listener(on_press=self.hotkey_matcher.press, on_release=self.hotkey_matcher.release)
             self.listener.start()
             print("[Hotkey] Listener started successfully")
         except Exception as e:
             print(f"[Hotkey] Error setting up listener: {e}")
 
+    def _compile_hotkeys(self):
+        """Hotkeys aus der Config in den Matcher übernehmen (Haupt-Hotkey + mode_hotkeys)"""
+        bindings = [HotkeyBinding(self.config.get("hotkey"))]
+        for hotkey, mode in (self.config.get("mode_hotkeys") or {}).items():
+            bindings.append(HotkeyBinding(hotkey, mode))
+        # Strg+V des Nutzers kurz nach dem Einfügen = Einfügen verpasst (lernt die Wartezeit pro Anwendung)
+        bindings.append(HotkeyBinding("ctrl+v", action=self.injector.note_manual_paste))
+        self.hotkey_matcher.compile(bindings, watch=IDLE_REARM_KEY_PREFIXES)
+
+    def _on_hotkey_captured(self, key_name):
+        """Neuer Hotkey aus der Erfassung (Listener-Thread)"""
+        self.config.set("hotkey", key_name)
+        self._compile_hotkeys()
+        # Use signal for thread-safe UI update
+        self.hotkey_set_signal.emit(key_name)
+        print(f"[Hotkey] New hotkey set: {key_name}")
+
+    def _arm_stream(self, key_name):
+        """Stream aus dem Ruhemodus vorab öffnen (Listener-Thread, nicht blockierend)"""
+        idle_policy = getattr(self, 'idle_policy', None)  # Listener läuft schon vor setup_audio_monitor
+        if idle_policy is not None:
+            idle_policy.arm(key_name)
+
+    def _touch_idle(self):
+        """Nutzung für die Ruhemodus-Zeit merken (Listener-Thread)"""
+        idle_policy = getattr(self, 'idle_policy', None)  # Listener läuft schon vor setup_audio_monitor
+        if idle_policy is not None:
+            idle_policy.touch()
+
+    def _device_snapshot(self):
+        """Gerätezustand aus der Registry (Hintergrund-Thread) - im Hook keine Geräteabfrage,
+        sonst hängt Windows den Low-Level-Hook bei langsamer Antwort stillschweigend ab"""
+        registry = getattr(self, 'device_registry', None)  # Listener läuft schon vor setup_audio_monitor
+        if registry is None:
+            return {'device_index': self.config.get("device_index"), 'healthy': True, 'message': 'Noch nicht geprüft'}
+        device = registry.snapshot
+        if not device['healthy']:
+            print(f"[Hotkey] Device not healthy ({device['message']}) - registry refresh requested")
+            registry.refresh_now()
+        return device
+
+    def _on_hotkey_activate(self, binding):
+        """Hotkey gedrückt (Listener-Thread - nicht blockieren)"""
+        if binding.action is not None:
+            binding.action()
+            return
+        self._arm_stream(binding.hotkey)
+
+        # Freihand-Modus: Hotkey schaltet die Daueraufnahme ein und aus
+        if self._hands_free is not None:
+            self._stop_hands_free()
+            return
+        if self.config.get("hands_free_dictation"):
+            self.api.warmup.on_hotkey()
+            self._start_hands_free(time.perf_counter(), binding.mode)
+            return
+
+        if self.recorder.is_recording:
+            return
+        # Verbindungen und Serverless-Funktion parallel zur Aufnahme aufwärmen (nicht blockierend)
+        self.api.warmup.on_hotkey()
+        pressed_at = time.perf_counter()  # Telemetrie: Hotkey bis erster Audio-Block
+        print(f"[Hotkey] Recording started with key: {binding.hotkey}")
+        self.overlay_status_signal.emit("recording")
+
+        dev_idx = self._device_snapshot()['device_index']
+
+        # Segmente schon während der Aufnahme transkribieren (lange Diktate)
+        if self.config.get("segmented_transcription"):
+            self._segment_pipeline = SegmentPipeline(self.api, self.data)
+        else:
+            self._segment_pipeline = None
+        self.recorder.segment_sink = self._segment_pipeline
+        self.recorder.turn_detection = False
+        # Ohne Segmente und ohne VAD-Trim: Request schon jetzt öffnen, der Body endet beim Loslassen.
+        # Mit VAD-Trim wäre der gestreamte Body ungekürzt, der Clip für Wiederholen aber gekürzt
+        if (self._segment_pipeline is None and self.config.get("streaming_upload")
+                and not self.recorder.vad_trim):
+            self.recorder.upload_sink = self.api.open_stream_upload(self.recorder.sample_rate)
+        self.recorder.long_dictation = bool(self.config.get("long_dictation"))
+
+        self.recorder.start_recording(device_index=dev_idx, pressed_at=pressed_at)
+
+    def _on_hotkey_deactivate(self, binding):
+        """Taste des aktiven Hotkeys losgelassen (Listener-Thread)"""
+        if binding.action is not None:
+            return
+        if self._hands_free is not None or not self.recorder.is_recording:
+            return  # Freihand: Loslassen beendet nichts
+
+        print(f"[Hotkey] Recording stopped with key: {binding.hotkey}")
+        released_at = time.perf_counter()  # Telemetrie: Loslassen bis Text (Warmup-Messung)
+        self._touch_idle()
+        audio = self.recorder.stop_recording()
+        pipeline = self._segment_pipeline
+        self._segment_pipeline = None
+
+        if audio == NO_AUDIO_DETECTED:
+            if pipeline:
+                pipeline.cancel()
+            self.overlay_status_signal.emit("error")
+            # Use signal for thread-safe warning (with cooldown in handler)
+            self.no_audio_warning_signal.emit()
+        elif audio:
+            # Validation: Check size (at least 8KB for valid wav + audio data)
+            print(f"[Hotkey] Audio: {audio}")
+            audio.released_at = released_at
+            if audio.size > 8000:
+                self.overlay_status_signal.emit("processing")
+                # Use signal instead of QTimer for thread-safety
+                self.transcription_signal.emit(audio, pipeline, binding.mode)
+            else:
+                print(f"[Audio] Warning: Recording too small ({audio})")
+                if pipeline:
+                    pipeline.cancel()
+                self.overlay_status_signal.emit("error")
+                self.no_audio_warning_signal.emit()
+        else:
+            print("[Hotkey] No audio returned from stop_recording")
+            if pipeline:
+                pipeline.cancel()
+            self.overlay_status_signal.emit("aborted")
+
     def _on_hotkey_set(self, key_name):
         """Signal handler for hotkey being set - runs in main thread"""
         display_name = format_hotkey_name(key_name)
@@ -2631,10 +2808,54 @@ class ACTScriber(QMainWindow):
         """Signal handler for overlay status - runs in main thread"""
         self.overlay.set_status(status)
 
-    def _on_start_transcription(self, file_path):
+    def _start_hands_free(self, pressed_at, mode=None):
+        """Freihand-Diktat starten (aus dem Hotkey-Hook - nicht blockierend)"""
+        device = self._device_snapshot()
+        # Nach der vorherigen Session einfügen (deren letzte Äußerungen laufen evtl. noch)
+        session = HandsFreeSession(self.api, self.config, self.data, mode=mode, after=self._hands_free_last,
+                                   on_result=lambda *result: self._insert_hands_free(*result, mode=mode))
+        session.on_finished = lambda: self.overlay_status_signal.emit("success" if session.inserted else "aborted")
+        self._hands_free = session
+        self.recorder.segment_sink = session
+        self.recorder.turn_detection = True
+        print("[Hotkey] Hands-free dictation started")
+        self.overlay_status_signal.emit("recording")
+        self.recorder.start_recording(device_index=device['device_index'], pressed_at=pressed_at)
+
+    def _stop_hands_free(self):
+        """Freihand-Diktat beenden - angefangene Äußerungen werden noch fertig eingefügt"""
+        self._hands_free_last, self._hands_free = self._hands_free, None
+        self._touch_idle()
+        self.recorder.stop_recording()  # Letzte Äußerung + close() über den Segment-Thread
+        self.recorder.turn_detection = False
+        print("[Hotkey] Hands-free dictation stopped")
+        self.overlay_status_signal.emit("processing")
+
+    def _insert_hands_free(self, raw, text, audio, inserted, mode=None):
+        """Eine fertige Äußerung speichern und einfügen (Einfüge-Thread der Session, in Reihenfolge)"""
+        mode = mode or self.config.get("mode")
+        self.data.save_entry(mode, raw, text, audio_stats=audio.stats)
+        if inserted:
+            text = " " + text  # An die vorherige Äußerung anschließen
+        self.hands_free_text_signal.emit(text, raw, not inserted)
+        result = self.injector.inject(text)
+        if not result.pasted:
+            self.data.log(f"[HandsFree] Paste failed: {result.error}", "warning")
+
+    def _on_hands_free_text(self, text, raw, first):
+        """UI: eingefügte Äußerungen im Ergebnisfeld fortschreiben"""
+        if first:
+            self.transcript_text.setPlainText(text)
+            self._last_raw_transcript = raw
+        else:
+            self.transcript_text.moveCursor(QTextCursor.MoveOperation.End)
+            self.transcript_text.insertPlainText(text)
+            self._last_raw_transcript = f"{self._last_raw_transcript or ''} {raw}".strip()
+
+    def _on_start_transcription(self, audio, pipeline=None, mode=None):
         """Signal handler for starting transcription - runs in main thread"""
-        print(f"[Signal] _on_start_transcription received: {file_path}")
-        self.start_transcription(file_path)
+        print(f"[Signal] _on_start_transcription received: {audio}")
+        self.start_transcription(audio, pipeline, mode)
 
     def show_no_audio_warning(self):
         """Zeigt Warnung bei fehlendem Audio mit huebschem Dialog (max 1x pro 30s)"""
@@ -2664,9 +2885,10 @@ class ACTScriber(QMainWindow):
         msg.setDefaultButton(QMessageBox.StandardButton.Ok)
         msg.exec()
 
-    def start_transcription(self, audio_file):
+    def start_transcription(self, audio, pipeline=None, mode=None):
         """Startet Transkription im Worker Thread"""
-        worker = TranscriptionWorker(self.api, self.config, self.data, audio_file)
+        worker = TranscriptionWorker(self.api, self.config, self.data, audio, self.injector, pipeline, mode,
+                                     after=self._hands_free_last)
         worker.finished.connect(self.on_transcription_finished)
         worker.error.connect(self.on_transcription_error)
         worker.start()
@@ -2679,7 +2901,7 @@ class ACTScriber(QMainWindow):
         if raw_transcript:
             self._last_raw_transcript = raw_transcript
         # Enable repeat button if last recording exists
-        if self.recorder.get_last_recording():
+        if self.recorder.has_last_recording():
             self.repeat_btn.setEnabled(True)
         self.overlay.set_status("success")
         # Update-Check im Hintergrund nach erfolgreicher Transkription
@@ -2734,6 +2956,12 @@ class ACTScriber(QMainWindow):
         """Versteckt Hauptfenster"""
         self.hide()
 
+    def changeEvent(self, event):
+        """Fensterfokus: Stream aus dem Ruhemodus vorab öffnen (Diktat folgt oft direkt)"""
+        if event.type() == QEvent.Type.ActivationChange and self.isActiveWindow() and hasattr(self, 'idle_policy'):
+            self.idle_policy.arm("focus")
+        super().changeEvent(event)
+
     def closeEvent(self, event):
         """Override Close Event - in Tray minimieren"""
         event.ignore()
@@ -2744,19 +2972,28 @@ class ACTScriber(QMainWindow):
         try:
             if hasattr(self, 'auto_update_timer'):
                 self.auto_update_timer.stop()
-            if hasattr(self, 'audio_monitor_timer'):
-                self.audio_monitor_timer.stop()
-            if hasattr(self, 'device_health_timer'):
-                self.device_health_timer.stop()
+            if hasattr(self, 'level_meter'):
+                self.level_meter.close_devices()
+            if hasattr(self, 'device_registry'):
+                self.device_registry.stop()
+            if hasattr(self, 'idle_policy'):
+                self.idle_policy.stop()
+            for session in (self._hands_free, self._hands_free_last):
+                if session is not None:
+                    session.cancel()
+            if hasattr(self, 'injector'):
+                self.injector.flush()
             if hasattr(self, 'listener') and self.listener:
                 self.listener.stop()
             if hasattr(self, 'tray_icon') and self.tray_icon:
                 self.tray_icon.hide()
             # Worker-Thread sauber beenden
+            # Laufende Requests abbrechen, danach den Engine-Loop beenden
             if hasattr(self, 'current_worker') and self.current_worker and self.current_worker.isRunning():
-                print("[App] Waiting for worker thread to finish...")
-                self.current_worker.quit()
-                self.current_worker.wait(3000)  # Max 3 Sekunden warten
+                print("[App] Cancelling running transcription...")
+                self.current_worker.cancel()
+            if hasattr(self, 'api') and self.api:
+                self.api.close()
             if hasattr(self, 'recorder') and self.recorder:
                 self.recorder.close()
             if hasattr(self, 'data') and self.data:
@@ -0,0 +1,159 @@
+"""Asynchrone Request-Engine: ein Event-Loop im Hintergrund, gemeinsamer Verbindungspool, abbrechbare Jobs"""
+import asyncio
+import threading
+import httpx
+
+MAX_CONNECTIONS = 16  # Segmente + Freihand-Äußerungen + Nachbearbeitung gleichzeitig
+MAX_KEEPALIVE_CONNECTIONS = 8
+KEEPALIVE_EXPIRY_SECONDS = 60.0
+CONNECT_TIMEOUT_SECONDS = 10.0
+LOOP_START_TIMEOUT_SECONDS = 5.0
+
+
+class RequestCancelled(Exception):
+    """Job über sein CancelToken abgebrochen"""
+
+
+class CancelToken:
+    """Abbruch für einen oder mehrere Jobs der Engine (cancel() aus beliebigem Thread).
+
+    Laufende Tasks werden im Loop abgebrochen - ein hängender Request oder ein
+    Retry-Timer endet sofort statt nach seinem Timeout.
+    """
+
+    def __init__(self):
+        self._cancelled = False
+        self._tasks = set()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled = True
+            tasks = list(self._tasks)
+        for task in tasks:
+            task.get_loop().call_soon_threadsafe(task.cancel)
+
+    def raise_if_cancelled(self):
+        if self._cancelled:
+            raise RequestCancelled()
+
+    def _attach(self, task):
+        with self._lock:
+            if self._cancelled:
+                return False
+            self._tasks.add(task)
+            return True
+
+    def _detach(self, task):
+        with self._lock:
+            self._tasks.discard(task)
+
+
+class RequestEngine:
+    """Ein asyncio-Loop in einem Daemon-Thread für alle API-Requests.
+
+    submit() reicht eine Coroutine aus beliebigen Threads ein und liefert ein
+    concurrent.futures.Future (result/cancel/add_done_callback wie bisher beim
+    ThreadPoolExecutor). Viele gleichzeitige Requests kosten damit Coroutinen statt
+    Threads, teilen sich einen httpx-Pool (Keep-Alive) und warten mit sleep() ohne
+    einen Thread zu blockieren. Der Loop startet mit start() oder beim ersten Job.
+    """
+
+    def __init__(self, max_connections=MAX_CONNECTIONS):
+        self.max_connections = max_connections
+        self._loop = None
+        self._thread = None
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """Gemeinsamer httpx.AsyncClient - nur innerhalb des Loops verwenden"""
+        return self._client
+
+    @property
+    def loop(self):
+        self._ensure_loop()
+        return self._loop
+
+    @property
+    def running(self):
+        """Loop läuft - submit() blockiert dann nicht (Hotkey-Hook)"""
+        return self._loop is not None
+
+    def start(self):
+        """Loop vorab starten (APIHandler), damit der erste submit() nicht auf den Thread wartet"""
+        self._ensure_loop()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is not None:
+                return
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._run_loop, args=(ready,), name="RequestEngine", daemon=True)
+            self._thread.start()
+            if not ready.wait(LOOP_START_TIMEOUT_SECONDS):
+                raise RuntimeError("Request engine loop did not start")
+
+    def _run_loop(self, ready):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(60.0, connect=CONNECT_TIMEOUT_SECONDS),
+        )
+        self._loop = loop
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(self._client.aclose())
+            loop.close()
+
+    def submit(self, coro, token=None):
+        """Coroutine im Loop starten (beliebiger Thread) -> concurrent.futures.Future"""
+        self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self._guard(coro, token), self._loop)
+
+    def run(self, coro, token=None, timeout=None):
+        """Coroutine ausführen und auf das Ergebnis warten (blockierende Aufrufer, z.B. Tests)"""
+        if self._loop is not None and threading.current_thread() is self._thread:
+            raise RuntimeError("RequestEngine.run() inside the engine loop - use await")
+        return self.submit(coro, token).result(timeout)
+
+    async def _guard(self, coro, token):
+        if token is None:
+            return await coro
+        task = asyncio.current_task()
+        if not token._attach(task):
+            coro.close()
+            raise RequestCancelled()
+        try:
+            return await coro
+        except asyncio.CancelledError:
+            if token.cancelled:
+                raise RequestCancelled() from None
+            raise
+        finally:
+            token._detach(task)
+
+    @staticmethod
+    async def sleep(seconds):
+        """Retry-Wartezeit im Loop (abbrechbar, blockiert keinen Thread)"""
+        await asyncio.sleep(seconds)
+
+    def close(self):
+        """Loop beenden - offene Verbindungen werden geschlossen (App-Ende)"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join(timeout=2.0)
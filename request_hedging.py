@@ -0,0 +1,118 @@
+"""Hedged Requests: langsamer Proxy-Versuch bekommt einen zweiten Versuch über Groq direkt"""
+import time
+import asyncio
+import threading
+from collections import deque
+
+HEDGE_PERCENTILE = 0.9  # Zweiter Versuch, wenn der erste langsamer ist als 90% der letzten Antworten
+HEDGE_WINDOW = 64  # Letzte Latenzen pro Request-Art und Weg
+HEDGE_MIN_SAMPLES = 8  # Vorher kein Hedging (keine belastbare Verteilung)
+HEDGE_MIN_DELAY_SECONDS = 0.3
+HEDGE_MAX_DELAY_SECONDS = 10.0
+HEDGE_BUDGET_RATIO = 0.1  # Höchstens ~10% zusätzliche Requests
+HEDGE_BUDGET_BURST = 2.0  # Angesparte Hedges für eine kurze Serie langsamer Antworten
+
+
+class HedgeBudget:
+    """Token-Bucket: jeder Request spart ratio an, jeder Hedge kostet 1"""
+
+    def __init__(self, ratio=HEDGE_BUDGET_RATIO, burst=HEDGE_BUDGET_BURST):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+        self._lock = threading.Lock()
+
+    def earn(self):
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def take(self):
+        with self._lock:
+            if self.tokens < 1.0:
+                return False
+            self.tokens -= 1.0
+            return True
+
+
+class RequestHedger:
+    """Startet nach dem Perzentil der letzten Latenzen einen zweiten Versuch auf dem anderen Weg.
+
+    Die erste erfolgreiche Antwort gewinnt, der andere Versuch wird abgebrochen. Schlägt
+    einer fehl, zählt der andere weiter. Das Budget begrenzt die zusätzlichen Requests.
+    Latenzen werden pro (Request-Art, Weg) gesammelt - Proxy und Groq direkt haben
+    verschiedene Verteilungen, die Schwelle gilt für den Weg des ersten Versuchs.
+    """
+
+    def __init__(self, percentile=HEDGE_PERCENTILE, window=HEDGE_WINDOW, min_samples=HEDGE_MIN_SAMPLES,
+                 budget=None):
+        self.percentile = percentile
+        self.window = window
+        self.min_samples = min_samples
+        self.budget = budget or HedgeBudget()
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.denied = 0  # Hedge fällig, aber Budget aufgebraucht
+        self._latencies = {}
+        self._lock = threading.Lock()
+
+    def record(self, kind, route, seconds):
+        """Latenz einer erfolgreichen Antwort über route"""
+        with self._lock:
+            self._latencies.setdefault((kind, route), deque(maxlen=self.window)).append(seconds)
+
+    def hedge_delay(self, kind, route):
+        """Wartezeit bis zum zweiten Versuch über route (None = noch zu wenige Messwerte)"""
+        with self._lock:
+            samples = sorted(self._latencies.get((kind, route), ()))
+        if len(samples) < self.min_samples:
+            return None
+        value = samples[min(len(samples) - 1, int(len(samples) * self.percentile))]
+        return min(HEDGE_MAX_DELAY_SECONDS, max(HEDGE_MIN_DELAY_SECONDS, value))
+
+    @property
+    def stats(self):
+        return {"requests": self.requests, "hedges": self.hedges, "hedge_wins": self.hedge_wins,
+                "denied": self.denied,
+                "hedge_rate": self.hedges / self.requests if self.requests else 0.0}
+
+    async def run(self, kind, primary, secondary, attempt):
+        """attempt(route) über primary; nach hedge_delay zusätzlich über secondary (falls nicht None)"""
+        self.requests += 1
+        self.budget.earn()
+        delay = self.hedge_delay(kind, primary) if secondary is not None else None
+        if delay is None:
+            return await attempt(primary)
+
+        first = asyncio.ensure_future(attempt(primary))
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return first.result()
+            if not self.budget.take():
+                self.denied += 1
+                return await first
+            self.hedges += 1
+            print(f"[Hedge] {kind}: {primary} slower than {delay:.2f}s (p{self.percentile * 100:.0f}) "
+                  f"- also trying {secondary} ({self.hedges}/{self.requests} hedged, {self.hedge_wins} won)")
+            second = asyncio.ensure_future(attempt(secondary))
+            tasks.add(second)
+            started = time.perf_counter()
+            pending = set(tasks)
+            errors = {}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.hedge_wins += 1
+                            print(f"[Hedge] {kind}: {secondary} won after {time.perf_counter() - started:.2f}s")
+                        return task.result()
+                    errors[task] = task.exception()
+            # Beide fehlgeschlagen: Fehler des ersten Versuchs entscheidet über den Retry
+            raise errors[first]
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
@@ -0,0 +1,175 @@
+"""Retry-Politik für API-Requests: Retry-After/Rate-Limit-Header, Backoff mit Jitter, Deadline, Circuit Breaker"""
+import re
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+
+RETRY_ATTEMPTS = 3
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 8.0
+RETRY_AFTER_JITTER = 0.1  # Bis zu 10% auf Server-Vorgaben - gleichzeitige Clients nicht im Gleichschritt
+DEFAULT_DEADLINE_SECONDS = 90.0  # Transkription + LLM zusammen, vom Loslassen bis zum Text
+REQUEST_TIMEOUT_SECONDS = 60.0  # Einzelner Request (begrenzt durch die Restzeit der Deadline)
+BREAKER_FAILURE_THRESHOLD = 3  # Aufeinanderfolgende Fehlschläge bis der Weg gesperrt wird
+BREAKER_RESET_SECONDS = 30.0  # Danach ein Probe-Request (halb offen)
+
+# Groq: "2m59.56s", "7.66s", "120ms"
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+class RetryableError(Exception):
+    """Vorübergehender Fehler (Timeout, Verbindung, 5xx, 429) - Wiederholung sinnvoll"""
+
+    def __init__(self, message, retry_after=None, counts_as_failure=True):
+        super().__init__(message)
+        self.retry_after = retry_after  # Sekunden laut Server (Retry-After / Rate-Limit-Reset)
+        self.counts_as_failure = counts_as_failure  # 429 heißt "erreichbar, aber zu viel" - kein Ausfall
+
+
+class DeadlineExceeded(Exception):
+    """Zeitbudget des Diktats aufgebraucht"""
+
+
+class CircuitOpenError(Exception):
+    """Alle Wege gesperrt - schneller Fehler statt Warten auf Timeouts"""
+
+
+def parse_duration(value):
+    """Groq-Dauer ("1m30s", "7.66s", "120ms") oder Sekundenzahl -> Sekunden (None wenn unlesbar)"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts or "".join(n + u for n, u in parts) != value:
+        return None
+    return sum(float(n) * _DURATION_UNITS[u] for n, u in parts)
+
+
+def retry_after_seconds(headers, rate_limited=False):
+    """Wartezeit laut Antwort-Headern: Retry-After (Sekunden oder HTTP-Datum), bei 429 auch x-ratelimit-reset-*"""
+    if headers is None:
+        return None
+    value = headers.get("retry-after")
+    if value is not None:
+        seconds = parse_duration(value)
+        if seconds is None:
+            try:
+                seconds = max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError, IndexError, OverflowError):
+                seconds = None
+        if seconds is not None:
+            return seconds
+    if rate_limited:
+        # Groq: Limit pro Minute (requests) bzw. Tokens - das erschöpfte Limit bestimmt die Wartezeit
+        resets = []
+        for name in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{name}")
+            reset = parse_duration(headers.get(f"x-ratelimit-reset-{name}"))
+            if reset is not None and (remaining is None or str(remaining).strip() in ("0", "0.0")):
+                resets.append(reset)
+        if resets:
+            return max(resets)
+    return None
+
+
+class Deadline:
+    """Zeitbudget über mehrere Requests (Transkription + LLM eines Diktats)"""
+
+    def __init__(self, seconds=DEFAULT_DEADLINE_SECONDS):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def allows(self, delay):
+        """Reicht die Restzeit für eine Wartezeit plus einen sinnvollen Versuch?"""
+        return self.remaining() > delay + 0.5
+
+    def timeout(self, request_timeout=REQUEST_TIMEOUT_SECONDS):
+        """Timeout für den nächsten Request - nie länger als die Restzeit"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"deadline of {self.seconds:.0f}s exceeded")
+        return min(request_timeout, remaining)
+
+
+class RetryPolicy:
+    """Wartezeiten zwischen Versuchen: Server-Vorgabe (+ Jitter), sonst exponentiell mit Equal Jitter"""
+
+    def __init__(self, attempts=RETRY_ATTEMPTS, base=RETRY_BASE_SECONDS, cap=RETRY_MAX_SECONDS, rng=None):
+        self.attempts = attempts
+        self.base = base
+        self.cap = cap
+        self._random = rng or random.Random()
+
+    def delay(self, attempt, retry_after=None):
+        """Wartezeit vor Versuch attempt+1 (attempt = Anzahl bisheriger Fehlschläge, ab 1)"""
+        if retry_after is not None:
+            return retry_after * (1 + self._random.uniform(0, RETRY_AFTER_JITTER))
+        backoff = min(self.cap, self.base * 2 ** (attempt - 1))
+        return backoff / 2 + self._random.uniform(0, backoff / 2)
+
+
+class CircuitBreaker:
+    """Sperrt einen Weg (Proxy / Groq direkt) nach aufeinanderfolgenden Fehlschlägen.
+
+    Geschlossen: alles erlaubt. Offen: sofort ablehnen, bis reset_seconds vorbei sind.
+    Halb offen: genau ein Probe-Request; Erfolg schließt, Fehlschlag öffnet erneut.
+    """
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.open_count = 0
+        self._probe_at = None  # Start des laufenden Probe-Requests (verlorene Probe läuft nach reset_seconds ab)
+        self._lock = threading.Lock()
+
+    def _blocked(self, now):
+        if self.opened_at is None:
+            return False
+        since = self._probe_at if self._probe_at is not None else self.opened_at
+        return now - since < self.reset_seconds
+
+    @property
+    def is_open(self):
+        """Gesperrt (ohne einen Probe-Request zu verbrauchen)"""
+        with self._lock:
+            return self._blocked(time.monotonic())
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            now = time.monotonic()
+            if self._blocked(now):
+                return False
+            self._probe_at = now  # Halb offen: dieser Aufrufer testet den Weg
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                print(f"[Breaker] {self.name} closed again")
+            self.failures = 0
+            self.opened_at = None
+            self._probe_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            probing = self._probe_at is not None
+            if probing or (self.opened_at is None and self.failures >= self.failure_threshold):
+                self.open_count += 1
+                self.opened_at = time.monotonic()
+                self._probe_at = None
+                print(f"[Breaker] {self.name} open after {self.failures} failures")
@@ -0,0 +1,150 @@
+"""Streaming-Upload: die Aufnahme geht schon während des Diktats als chunked multipart an den Proxy"""
+import time
+import queue
+import struct
+import threading
+import uuid
+from audio_handler import build_wav_header
+
+STREAM_BLOCK_TIMEOUT_SECONDS = 10.0  # So lange kein Block vom Consumer (hängender Stream, Absturz) -> Abbruch
+STREAM_RESPONSE_TIMEOUT_SECONDS = 60.0
+UNKNOWN_LENGTH = 0xFFFFFFFF  # RIFF-/data-Länge beim Streamen noch unbekannt - Decoder lesen bis zum Ende
+_ABORT = object()
+
+
+class UploadAborted(Exception):
+    pass
+
+
+def build_stream_wav_header(sample_rate):
+    """WAV-Header mit unbekannter Länge (Streaming) - sonst identisch zu build_wav_header"""
+    header = bytearray(build_wav_header(0, sample_rate))
+    struct.pack_into('<I', header, 4, UNKNOWN_LENGTH)
+    struct.pack_into('<I', header, 40, UNKNOWN_LENGTH)
+    return bytes(header)
+
+
+def multipart_parts(fields, filename, mime_type, boundary):
+    """Kopf (Formularfelder + Header des Datei-Teils) und Abschluss eines multipart/form-data Bodys.
+
+    Gleiches Format wie requests (data= vor files=), damit der gestreamte Body bis auf die
+    WAV-Längen Byte für Byte dem Batch-Upload entspricht.
+    """
+    head = bytearray()
+    for name, value in fields.items():
+        head += f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'.encode()
+        head += value.encode() if isinstance(value, str) else value
+        head += b'\r\n'
+    head += (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f'Content-Type: {mime_type}\r\n\r\n'
+    ).encode()
+    return bytes(head), f'\r\n--{boundary}--\r\n'.encode()
+
+
+class StreamingUpload:
+    """Ein Transkriptions-Request, dessen Body während der Aufnahme entsteht.
+
+    open() startet den POST in einem eigenen Thread - Verbindung, Formularfelder und
+    WAV-Header gehen sofort raus. Der Consumer-Thread hängt mit append() int16-Blöcke an
+    (nur Kopie + Queue, kein Netzwerk), finish() schließt den Body beim Loslassen. Danach
+    bleibt nur die Verarbeitungszeit des Servers. Bei Fehlern liefert result() None und
+    error ist gesetzt - der Aufrufer lädt die Aufnahme dann wie gewohnt hoch.
+    """
+
+    def __init__(self, session, url, fields, headers, sample_rate, filename="recording.wav",
+                 mime_type="audio/wav", boundary=None, timeout=STREAM_RESPONSE_TIMEOUT_SECONDS):
+        self.session = session
+        self.url = url
+        self.boundary = boundary or uuid.uuid4().hex
+        self.headers = dict(headers, **{"Content-Type": f"multipart/form-data; boundary={self.boundary}"})
+        self.timeout = timeout
+        head, self._tail = multipart_parts(fields, filename, mime_type, self.boundary)
+        self._head = head + build_stream_wav_header(sample_rate)
+        self._queue = queue.SimpleQueue()
+        self._done = threading.Event()
+        self.text = None
+        self.error = None
+        self.num_frames = 0
+        self.bytes_sent = 0
+        self.opened_at = None
+        self.finished_at = None
+        self.response_ms = None  # finish() bis Antwort - die Wartezeit nach dem Loslassen
+
+    def open(self):
+        self.opened_at = time.perf_counter()
+        threading.Thread(target=self._run, name="StreamingUpload", daemon=True).start()
+        return self
+
+    def append(self, samples):
+        """Hängt int16-Samples an (Consumer-Thread) - Kopie, der Ringpuffer wird überschrieben"""
+        if self._done.is_set():
+            return  # Request schon gescheitert - nicht weiter puffern
+        self._queue.put(bytes(memoryview(samples).cast("B")))
+        self.num_frames += len(samples)
+
+    def finish(self):
+        """Body abschließen (Loslassen der Taste)"""
+        self.finished_at = time.perf_counter()
+        self._queue.put(None)
+
+    def abort(self):
+        """Aufnahme verworfen (zu kurz, kein Pegel) - Request abbrechen statt fertig senden"""
+        self._queue.put(_ABORT)
+
+    @property
+    def finished(self):
+        return self._done.is_set()
+
+    def result(self, timeout=None):
+        """Transkript oder None (dann ist error gesetzt, außer der Server lieferte leeren Text)
+
+        Args:
+            timeout: Höchstens so lange warten (z.B. Rest der Deadline), sonst Request-Timeout
+        """
+        limit = self.timeout + STREAM_BLOCK_TIMEOUT_SECONDS
+        if timeout is not None:
+            limit = min(limit, max(0.0, timeout))
+        if not self._done.wait(limit):
+            self.error = TimeoutError("Streaming-Upload hat nicht geantwortet")
+            return None
+        return self.text
+
+    def _body(self):
+        self.bytes_sent = len(self._head)
+        yield self._head
+        while True:
+            try:
+                block = self._queue.get(timeout=STREAM_BLOCK_TIMEOUT_SECONDS)
+            except queue.Empty:
+                raise UploadAborted(f"no audio for {STREAM_BLOCK_TIMEOUT_SECONDS:.0f}s")
+            if block is None:
+                break
+            if block is _ABORT:
+                raise UploadAborted("recording discarded")
+            self.bytes_sent += len(block)
+            yield block
+        self.bytes_sent += len(self._tail)
+        yield self._tail
+
+    def _run(self):
+        try:
+            # Generator als Body -> requests sendet mit Transfer-Encoding: chunked
+            response = self.session.post(self.url, data=self._body(), headers=self.headers, timeout=self.timeout)
+            if response.status_code != 200:
+                try:
+                    error_msg = response.json().get("error", response.text)
+                except Exception:
+                    error_msg = response.text
+                raise Exception(f"HTTP {response.status_code}: {error_msg}")
+            self.text = response.json().get("text")
+            if self.finished_at is not None:
+                self.response_ms = (time.perf_counter() - self.finished_at) * 1000
+            print(f"[Stream] Upload complete: {self.bytes_sent / 1e6:.2f}MB, "
+                  f"response {self.response_ms or 0:.0f}ms after release")
+        except Exception as e:
+            self.error = e
+            if not isinstance(e, UploadAborted):
+                print(f"[Stream] Upload failed: {e}")
+        finally:
+            self._done.set()
@@ -0,0 +1,283 @@
+"""
+FLAC-Encoder: Encode -> Decode Round-Trip mit einem Referenz-Decoder im Test.
+
+Kodiert synthetische Aufnahmen mit FlacEncoder und dekodiert sie mit einem kleinen,
+unabhängigen FLAC-Decoder (STREAMINFO, Frame-Header mit CRC-8, Konstant-, Verbatim- und
+Fixed-Subframes mit Rice-Residuen, CRC-16). Prüft Bit-Gleichheit mit dem Original für
+volle Blöcke, einen angebrochenen letzten Block, digitale Stille, Extremwerte (int16-Grenzen,
+Vollausschlag-Rechteck) und einen Clip kürzer als ein Block.
+
+Ausfuehren:  python test_audio_codec.py
+"""
+
+import math
+import random
+import struct
+import sys
+
+# ──────────────────────────────────────────────────────────────
+# Test-Konfiguration
+# ──────────────────────────────────────────────────────────────
+
+SAMPLE_RATE = 16000
+PARTIAL_FRAMES = 777  # Angebrochener letzter Block
+SEED = 4711
+
+failures = []
+
+# ──────────────────────────────────────────────────────────────
+# Hilfs-Funktionen
+# ──────────────────────────────────────────────────────────────
+
+def header(text):
+    print(f"\n{'='*60}")
+    print(f"  {text}")
+    print(f"{'='*60}")
+
+
+def step(num, text):
+    print(f"\n--- Schritt {num}: {text} ---")
+
+
+def ok(msg):
+    print(f"  [OK] {msg}")
+
+
+def fail(msg):
+    failures.append(msg)
+    print(f"  [FAIL] {msg}")
+
+
+def crc8(data):
+    crc = 0
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+def crc16(data):
+    crc = 0
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x8005) & 0xFFFF if crc & 0x8000 else (crc << 1) & 0xFFFF
+    return crc
+
+
+class BitReader:
+    """MSB-first über einen Bit-String - langsam, aber für Test-Clips reicht es"""
+
+    def __init__(self, data, pos=0):
+        self.bits = "".join(f"{b:08b}" for b in data)
+        self.pos = pos * 8
+
+    def read(self, n):
+        value = int(self.bits[self.pos:self.pos + n], 2) if n else 0
+        self.pos += n
+        return value
+
+    def read_signed(self, n):
+        value = self.read(n)
+        return value - (1 << n) if value >= 1 << (n - 1) else value
+
+    def unary(self):
+        end = self.bits.index("1", self.pos)
+        q = end - self.pos
+        self.pos = end + 1
+        return q
+
+    def align(self):
+        self.pos = (self.pos + 7) // 8 * 8
+
+    @property
+    def byte_pos(self):
+        return self.pos // 8
+
+
+FIXED_COEFFS = {0: (), 1: (1,), 2: (2, -1), 3: (3, -3, 1), 4: (4, -6, 4, -1)}
+BLOCK_SIZE_CODES = {0b0001: 192, 0b1000: 256, 0b1001: 512, 0b1010: 1024, 0b1011: 2048, 0b1100: 4096}
+
+
+def decode_flac(data):
+    """Referenz-Decoder für Mono 16-bit -> (sample_rate, total_samples, samples, stats)"""
+    if data[:4] != b"fLaC":
+        raise ValueError("Kein fLaC-Marker")
+    last_and_type, length = data[4], int.from_bytes(data[5:8], "big")
+    if last_and_type & 0x7F != 0:
+        raise ValueError("Erster Metadaten-Block ist nicht STREAMINFO")
+    info = data[8:8 + length]
+    packed = int.from_bytes(info[10:18], "big")
+    sample_rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    bits_per_sample = ((packed >> 36) & 0x1F) + 1
+    total = packed & ((1 << 36) - 1)
+    if channels != 1 or bits_per_sample != 16:
+        raise ValueError(f"{channels} Kanäle, {bits_per_sample} bit")
+    pos = 8 + length
+    if not last_and_type & 0x80:
+        raise ValueError("STREAMINFO ist nicht der letzte Metadaten-Block")
+
+    reader = BitReader(data)
+    reader.pos = pos * 8
+    samples = []
+    stats = {"constant": 0, "verbatim": 0, "fixed": 0, "frames": 0}
+    while reader.byte_pos < len(data):
+        start = reader.byte_pos
+        if reader.read(16) != 0xFFF8:
+            raise ValueError(f"Frame {stats['frames']}: kein Sync-Code bei Byte {start}")
+        size_code = reader.read(4)
+        reader.read(4)  # Sample-Rate-Code
+        reader.read(8)  # Kanäle, Bits/Sample, reserviert
+        # Frame-Nummer im erweiterten UTF-8-Format
+        first = reader.read(8)
+        extra = 0
+        while first & (0x80 >> extra):
+            extra += 1
+        number = first & (0xFF >> (extra + 1))
+        for _ in range(max(0, extra - 1)):
+            number = (number << 6) | (reader.read(8) & 0x3F)
+        if number != stats["frames"]:
+            raise ValueError(f"Frame-Nummer {number} statt {stats['frames']}")
+        if size_code == 0b0111:
+            block = reader.read(16) + 1
+        else:
+            block = BLOCK_SIZE_CODES[size_code]
+        header_end = reader.byte_pos
+        if reader.read(8) != crc8(data[start:header_end]):
+            raise ValueError(f"Frame {number}: CRC-8 falsch")
+
+        if reader.read(1):
+            raise ValueError("Padding-Bit gesetzt")
+        kind = reader.read(6)
+        if reader.read(1):
+            raise ValueError("Wasted bits nicht unterstützt")
+        if kind == 0:
+            samples.extend([reader.read_signed(16)] * block)
+            stats["constant"] += 1
+        elif kind == 1:
+            samples.extend(reader.read_signed(16) for _ in range(block))
+            stats["verbatim"] += 1
+        elif kind & 0b111000 == 0b001000:
+            order = kind & 0b111
+            out = [reader.read_signed(16) for _ in range(order)]
+            if reader.read(2) != 0 or reader.read(4) != 0:
+                raise ValueError("Nur Rice-Methode 0 mit Partition-Ordnung 0 erwartet")
+            k = reader.read(4)
+            coeffs = FIXED_COEFFS[order]
+            for _ in range(block - order):
+                u = (reader.unary() << k) | reader.read(k)
+                residual = (u >> 1) ^ -(u & 1)
+                out.append(residual + sum(c * out[-1 - i] for i, c in enumerate(coeffs)))
+            samples.extend(out)
+            stats["fixed"] += 1
+        else:
+            raise ValueError(f"Unbekannter Subframe-Typ {kind:06b}")
+        reader.align()
+        frame_end = reader.byte_pos
+        if reader.read(16) != crc16(data[start:frame_end]):
+            raise ValueError(f"Frame {number}: CRC-16 falsch")
+        stats["frames"] += 1
+    return sample_rate, total, samples, stats
+
+
+def make_clip(samples):
+    from audio_handler import AudioClip, build_wav_header
+    pcm = struct.pack(f"<{len(samples)}h", *samples)
+    return AudioClip(build_wav_header(len(samples), SAMPLE_RATE) + pcm, SAMPLE_RATE, len(samples))
+
+
+def speech_like(n, rng):
+    """Ton mit Obertönen, Hüllkurve und Rauschen - komprimiert gut, aber nicht trivial"""
+    out = []
+    for i in range(n):
+        t = i / SAMPLE_RATE
+        env = 0.5 + 0.5 * math.sin(2 * math.pi * 3 * t)
+        value = env * (6000 * math.sin(2 * math.pi * 220 * t) + 2000 * math.sin(2 * math.pi * 660 * t))
+        out.append(int(value + rng.gauss(0, 150)))
+    return out
+
+
+def round_trip(encoder, samples, label):
+    """Kodiert, dekodiert und vergleicht -> stats oder None"""
+    clip = make_clip(samples)
+    encoded = encoder.encode(clip)
+    try:
+        sample_rate, total, decoded, stats = decode_flac(bytes(encoded.data))
+    except Exception as e:
+        fail(f"{label}: Dekodieren fehlgeschlagen: {e}")
+        return None
+    if encoded.mime_type != "audio/flac" or not encoded.filename.endswith(".flac"):
+        fail(f"{label}: {encoded.filename} / {encoded.mime_type}")
+    if sample_rate != SAMPLE_RATE or total != len(samples):
+        fail(f"{label}: STREAMINFO {sample_rate} Hz / {total} Samples statt {len(samples)}")
+    if decoded != list(samples):
+        diff = next((i for i, (a, b) in enumerate(zip(decoded, samples)) if a != b), min(len(decoded), len(samples)))
+        fail(f"{label}: weicht ab ab Sample {diff} ({len(decoded)} statt {len(samples)} Samples)")
+        return None
+    ok(f"{label}: {len(samples)} Samples bit-identisch, {clip.size} -> {encoded.size} bytes, "
+       f"{stats['frames']} Frames (fixed {stats['fixed']}, konstant {stats['constant']}, verbatim {stats['verbatim']})")
+    return stats
+
+
+# ──────────────────────────────────────────────────────────────
+# Test-Runner
+# ──────────────────────────────────────────────────────────────
+
+def main():
+    header("FLAC ROUND-TRIP")
+    from audio_codec import FlacEncoder, FLAC_BLOCK_SIZE
+    encoder = FlacEncoder()
+    rng = random.Random(SEED)
+
+    # ── Sprachähnlich, angebrochener letzter Block ──
+    step(1, f"3 volle Blöcke + {PARTIAL_FRAMES} Samples (sprachähnliches Signal)")
+    samples = speech_like(3 * FLAC_BLOCK_SIZE + PARTIAL_FRAMES, rng)
+    stats = round_trip(encoder, samples, "Sprache")
+    if stats and stats["frames"] == 4 and stats["fixed"] == 4:
+        ok("Letzter Block mit eigener Länge, alle Frames mit Fixed-Prädiktor")
+    elif stats:
+        fail(f"Frames: {stats}")
+
+    # ── Stille ──
+    step(2, "Digitale Stille und konstanter Offset")
+    round_trip(encoder, [0] * (FLAC_BLOCK_SIZE + PARTIAL_FRAMES), "Stille")
+    stats = round_trip(encoder, [-32768] * FLAC_BLOCK_SIZE + [32767] * PARTIAL_FRAMES, "Konstant an den Grenzen")
+    if stats and stats["constant"] == 2:
+        ok("Konstante Blöcke als Konstant-Subframe")
+    elif stats:
+        fail(f"Frames: {stats}")
+
+    # ── Extremwerte ──
+    step(3, "Extremwerte: Vollausschlag-Rechteck, Rauschen über den ganzen int16-Bereich")
+    square = [32767 if (i // 2) % 2 else -32768 for i in range(FLAC_BLOCK_SIZE)]
+    noise = [rng.randint(-32768, 32767) for _ in range(FLAC_BLOCK_SIZE + PARTIAL_FRAMES)]
+    stats = round_trip(encoder, square + noise, "Extremwerte")
+    if stats and stats["verbatim"] >= 1:
+        ok("Unkomprimierbares Rauschen als Verbatim-Subframe")
+    elif stats:
+        fail(f"Frames: {stats}")
+    ramp = [max(-32768, min(32767, (i - 2048) * 16)) for i in range(FLAC_BLOCK_SIZE)]
+    round_trip(encoder, ramp + square[:PARTIAL_FRAMES], "Rampe bis in die Begrenzung")
+
+    # ── Kurze Clips ──
+    step(4, "Clips kürzer als ein Block")
+    round_trip(encoder, speech_like(PARTIAL_FRAMES, rng), "Teilblock")
+    round_trip(encoder, [5, -3, 32767, -32768, 0, 1, 2, 3, 4, 5], "10 Samples")
+
+    # ── Viele Frames (UTF-8-Frame-Nummern über 127) ──
+    step(5, "Kleine Blockgröße: mehr als 128 Frames")
+    small = FlacEncoder(block_size=64)
+    stats = round_trip(small, speech_like(200 * 64 + 5, rng), "Blockgröße 64")
+    if stats and stats["frames"] == 201:
+        ok("Mehrbyte-Frame-Nummern korrekt")
+    elif stats:
+        fail(f"Frames: {stats}")
+
+    header("FEHLGESCHLAGEN" if failures else "ALLE TESTS ABGESCHLOSSEN")
+    return not failures
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
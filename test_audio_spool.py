@@ -0,0 +1,165 @@
+"""
+Aufnahme-Spool: Absturz während der Aufnahme und Wiederherstellung.
+
+Ein Kindprozess legt einen RecordingSpool an, hängt Audio an (mit Vergrößern der Datei),
+synchronisiert, hängt weiteres Audio ohne Sync an und beendet sich dann hart mit
+os._exit - ohne finalize(). Danach prüft der Test: find_orphans findet den Spool,
+orphan_info meldet die gesicherte Dauer, recover_orphan liefert eine gültige WAV-Datei
+(wave-Modul) mit genau den Samples bis zum letzten Sync. Ein regulär finalisierter
+Spool ist keine Waise.
+
+Ausfuehren:  python test_audio_spool.py
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import wave
+from array import array
+
+# ──────────────────────────────────────────────────────────────
+# Test-Konfiguration
+# ──────────────────────────────────────────────────────────────
+
+SAMPLE_RATE = 16000
+CAPACITY_FRAMES = 4000  # Kleiner als die Aufnahme -> Datei muss wachsen
+SYNCED_FRAMES = 24000  # Bis zum Sync geschrieben (1.5s)
+UNSYNCED_FRAMES = 8000  # Nach dem Sync, vor dem Absturz
+
+failures = []
+
+# Kindprozess: Aufnahme bis zum "Absturz" (kein finalize, kein Schließen)
+CRASH_SCRIPT = """
+import os, sys
+from array import array
+import audio_spool
+audio_spool.SPOOL_SYNC_SECONDS = 3600  # Nur der explizite Sync zählt
+directory, capacity, synced, unsynced = sys.argv[1], *map(int, sys.argv[2:5])
+spool = audio_spool.RecordingSpool.create({rate}, capacity, directory=directory)
+samples = array('h', ((i * 37) % 65536 - 32768 for i in range(synced + unsynced)))
+for start in range(0, synced, 1024):
+    spool.append(samples[start:min(start + 1024, synced)])
+spool.sync()
+spool.append(samples[synced:])
+print(spool.path, flush=True)
+os._exit(1)
+""".format(rate=SAMPLE_RATE)
+
+# ──────────────────────────────────────────────────────────────
+# Hilfs-Funktionen
+# ──────────────────────────────────────────────────────────────
+
+def header(text):
+    print(f"\n{'='*60}")
+    print(f"  {text}")
+    print(f"{'='*60}")
+
+
+def step(num, text):
+    print(f"\n--- Schritt {num}: {text} ---")
+
+
+def ok(msg):
+    print(f"  [OK] {msg}")
+
+
+def fail(msg):
+    failures.append(msg)
+    print(f"  [FAIL] {msg}")
+
+
+def expected_samples(n):
+    return array('h', ((i * 37) % 65536 - 32768 for i in range(n)))
+
+
+# ──────────────────────────────────────────────────────────────
+# Test-Runner
+# ──────────────────────────────────────────────────────────────
+
+def main():
+    header("AUFNAHME-SPOOL (Absturz + Wiederherstellung)")
+    from audio_spool import (RecordingSpool, find_orphans, orphan_info, recover_orphan,
+                             SPOOL_ACTIVE_SUFFIX, SPOOL_DONE_SUFFIX)
+    directory = tempfile.mkdtemp(prefix="spool_test_")
+    clips = []
+
+    try:
+        # ── Absturz ──
+        step(1, f"Kindprozess schreibt {SYNCED_FRAMES} + {UNSYNCED_FRAMES} Frames und stirbt ohne finalize()")
+        proc = subprocess.run(
+            [sys.executable, "-c", CRASH_SCRIPT, directory,
+             str(CAPACITY_FRAMES), str(SYNCED_FRAMES), str(UNSYNCED_FRAMES)],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, timeout=60,
+        )
+        spool_path = proc.stdout.strip().splitlines()[-1] if proc.stdout.strip() else None
+        if proc.returncode == 1 and spool_path and spool_path.endswith(SPOOL_ACTIVE_SUFFIX) and os.path.exists(spool_path):
+            ok(f"Abgestürzt mit Exit-Code 1, {os.path.basename(spool_path)} liegt noch da")
+        else:
+            fail(f"Kindprozess: Exit-Code {proc.returncode}, Ausgabe {proc.stdout!r} {proc.stderr[-500:]!r}")
+            return False
+
+        # ── Waisen finden ──
+        step(2, "find_orphans / orphan_info")
+        orphans = find_orphans(directory)
+        if orphans == [spool_path]:
+            ok("Waisen-Spool gefunden")
+        else:
+            fail(f"find_orphans: {orphans}")
+        info = orphan_info(spool_path)
+        if abs(info['duration'] - SYNCED_FRAMES / SAMPLE_RATE) < 1e-9:
+            ok(f"Gesicherte Dauer {info['duration']:.2f}s (Stand des letzten Syncs)")
+        else:
+            fail(f"orphan_info: {info}")
+
+        # ── Wiederherstellen ──
+        step(3, "recover_orphan liefert eine gültige WAV-Datei")
+        clip = recover_orphan(spool_path)
+        clips.append(clip)
+        done_path = spool_path[:-len(SPOOL_ACTIVE_SUFFIX)] + SPOOL_DONE_SUFFIX
+        if clip.path == done_path and not os.path.exists(spool_path) and not find_orphans(directory):
+            ok(f"Umbenannt in {os.path.basename(done_path)}, keine Waisen mehr")
+        else:
+            fail(f"Pfad {clip.path}, .recording noch da: {os.path.exists(spool_path)}")
+        with wave.open(done_path, "rb") as wf:
+            params = (wf.getnchannels(), wf.getsampwidth(), wf.getframerate(), wf.getnframes())
+            frames = wf.readframes(wf.getnframes())
+        if params == (1, 2, SAMPLE_RATE, SYNCED_FRAMES):
+            ok(f"WAV: mono, 16 bit, {SAMPLE_RATE} Hz, {SYNCED_FRAMES} Frames")
+        else:
+            fail(f"WAV-Parameter {params}")
+        if frames == expected_samples(SYNCED_FRAMES).tobytes():
+            ok("Samples bis zum letzten Sync identisch")
+        else:
+            fail("Samples weichen ab")
+        if os.path.getsize(done_path) == 44 + SYNCED_FRAMES * 2 and clip.num_frames == SYNCED_FRAMES \
+                and clip.sample_rate == SAMPLE_RATE and bytes(clip.pcm) == frames:
+            ok("Datei auf Header + Daten gekürzt, SpoolClip stimmt mit der Datei überein")
+        else:
+            fail(f"Dateigröße {os.path.getsize(done_path)}, SpoolClip {clip.num_frames} Frames")
+
+        # ── Regulär finalisiert ──
+        step(4, "Regulär finalisierter Spool ist keine Waise")
+        spool = RecordingSpool.create(SAMPLE_RATE, CAPACITY_FRAMES, directory=directory)
+        spool.append(expected_samples(6000))
+        clip = spool.finalize()
+        clips.append(clip)
+        if not find_orphans(directory) and clip.num_frames == 6000 and bytes(clip.pcm) == expected_samples(6000).tobytes():
+            ok(f"{os.path.basename(clip.path)}: 6000 Frames, keine Waisen")
+        else:
+            fail(f"Waisen {find_orphans(directory)}, {clip.num_frames} Frames")
+
+    finally:
+        for clip in clips:
+            clip.data.release()  # Sonst hält der memoryview das mmap offen
+            clip._mmap.close()
+            clip._file.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    header("FEHLGESCHLAGEN" if failures else "ALLE TESTS ABGESCHLOSSEN")
+    return not failures
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,224 @@
+"""
+Voice-Activity-Detection: keep_frames / apply_keep auf einem synthetischen Signal.
+
+Baut eine Aufnahme aus leisem Rauschen (Stille) und lauten Tönen (Sprache) auf
+30ms-Frame-Grenzen und prüft: welche Frames keep_frames behält (Padding um die Sprache,
+führende/abschließende Stille weg, lange Pause auf VAD_MAX_PAUSE_SECONDS gekürzt),
+dass apply_keep genau diese Frames kopiert (int16 und float32, mit und ohne out=,
+Rest-Samples hinter dem letzten Frame) und die Fälle, in denen nichts zu entfernen ist.
+
+Ausfuehren:  python test_audio_vad.py
+"""
+
+import sys
+
+# ──────────────────────────────────────────────────────────────
+# Test-Konfiguration
+# ──────────────────────────────────────────────────────────────
+
+SAMPLE_RATE = 16000
+NOISE_STD = 20  # Rauschboden (int16), deutlich unter VAD_MIN_ENERGY * VAD_NOISE_FACTOR
+TONE_AMPLITUDE = 8000
+REMAINDER = 100  # Samples hinter dem letzten vollen Frame
+# (Art, Frames): Stille vorne, Sprache, lange Pause, Sprache, Stille hinten
+LAYOUT = [("silence", 40), ("speech", 40), ("silence", 100), ("speech", 40), ("silence", 40)]
+SEED = 4711
+
+failures = []
+
+# ──────────────────────────────────────────────────────────────
+# Hilfs-Funktionen
+# ──────────────────────────────────────────────────────────────
+
+def header(text):
+    print(f"\n{'='*60}")
+    print(f"  {text}")
+    print(f"{'='*60}")
+
+
+def step(num, text):
+    print(f"\n--- Schritt {num}: {text} ---")
+
+
+def ok(msg):
+    print(f"  [OK] {msg}")
+
+
+def fail(msg):
+    failures.append(msg)
+    print(f"  [FAIL] {msg}")
+
+
+def make_signal(np, layout, frame_len, remainder=REMAINDER, tail="silence"):
+    """int16-Aufnahme nach layout -> (samples, voiced): voiced = erwartete Sprach-Frames"""
+    rng = np.random.default_rng(SEED)
+
+    def part(kind, n):
+        noise = rng.normal(0, NOISE_STD, n)
+        if kind == "speech":
+            return TONE_AMPLITUDE * np.sin(2 * np.pi * 440 * np.arange(n) / SAMPLE_RATE) + noise
+        return noise
+
+    parts = [part(kind, frames * frame_len) for kind, frames in layout]
+    parts.append(part(tail, remainder))  # Rest-Samples hinter dem letzten vollen Frame
+    voiced = [kind == "speech" for kind, frames in layout for _ in range(frames)]
+    samples = np.clip(np.concatenate(parts), -32768, 32767).astype(np.int16)
+    return samples, np.array(voiced)
+
+
+def expected_keep(np, voiced):
+    """keep_frames nachgerechnet: Padding, Pausen kürzen, Ränder abschneiden (Python-Schleife)"""
+    from audio_vad import VAD_PAD_SECONDS, VAD_MAX_PAUSE_SECONDS, VAD_FRAME_MS
+    pad = max(1, int(VAD_PAD_SECONDS * 1000 / VAD_FRAME_MS))
+    max_pause = int(VAD_MAX_PAUSE_SECONDS * 1000 / VAD_FRAME_MS)
+    n = len(voiced)
+    speech = [any(voiced[max(0, i - pad):i + pad + 1]) for i in range(n)]
+    keep = list(speech)
+    i = 0
+    while i < n:
+        if speech[i]:
+            i += 1
+            continue
+        j = i
+        while j < n and not speech[j]:
+            j += 1
+        head, tail = max_pause // 2, max_pause - max_pause // 2
+        for k in range(i, j):
+            keep[k] = (k - i < head) or (k >= j - tail)
+        i = j
+    first = speech.index(True)
+    last = n - 1 - speech[::-1].index(True)
+    keep = [k and first <= idx <= last for idx, k in enumerate(keep)]
+    return np.array(keep)
+
+
+def mask_copy(np, samples, keep, frame_len):
+    """Referenz für apply_keep: Sample-Maske (Rest-Samples folgen dem letzten Frame)"""
+    mask = np.repeat(keep, frame_len)
+    rest = len(samples) - len(mask)
+    mask = np.concatenate((mask, np.full(rest, bool(keep[-1]))))
+    return samples[mask]
+
+
+# ──────────────────────────────────────────────────────────────
+# Test-Runner
+# ──────────────────────────────────────────────────────────────
+
+def main():
+    header("VOICE-ACTIVITY-DETECTION (keep_frames / apply_keep)")
+    from audio_handler import _get_numpy
+    from audio_vad import (frame_activity, keep_frames, apply_keep, kept_length, compress_silence,
+                           VAD_FRAME_MS, VAD_PAD_SECONDS, VAD_MAX_PAUSE_SECONDS)
+    np = _get_numpy()
+    frame_len = int(SAMPLE_RATE * VAD_FRAME_MS / 1000)
+    pad = max(1, int(VAD_PAD_SECONDS * 1000 / VAD_FRAME_MS))
+    max_pause = int(VAD_MAX_PAUSE_SECONDS * 1000 / VAD_FRAME_MS)
+    samples, voiced = make_signal(np, LAYOUT, frame_len)
+
+    # ── Frame-Klassifikation ──
+    step(1, f"{len(voiced)} Frames à {frame_len} Samples klassifizieren")
+    detected, detected_len = frame_activity(samples, SAMPLE_RATE)
+    if detected_len == frame_len and np.array_equal(detected, voiced):
+        ok(f"{int(voiced.sum())} Sprach-Frames, {int((~voiced).sum())} Stille-Frames erkannt")
+    else:
+        wrong = np.flatnonzero(detected != voiced) if len(detected) == len(voiced) else "Länge"
+        fail(f"Abweichende Frames: {wrong}")
+
+    # ── keep_frames ──
+    step(2, "keep_frames: Padding, Ränder, lange Pause")
+    keep = keep_frames(samples, SAMPLE_RATE)
+    expected = expected_keep(np, voiced)
+    if keep is None:
+        fail("keep_frames lieferte None")
+        return False
+    if np.array_equal(keep, expected):
+        ok(f"{int(keep.sum())} von {len(keep)} Frames behalten (wie nachgerechnet)")
+    else:
+        fail(f"Abweichende Frames: {np.flatnonzero(keep != expected)}")
+    if keep[voiced].all():
+        ok("Alle Sprach-Frames behalten")
+    else:
+        fail("Sprach-Frames verworfen")
+    first_speech = int(np.flatnonzero(voiced)[0])
+    last_speech = int(np.flatnonzero(voiced)[-1])
+    kept = np.flatnonzero(keep)
+    if kept[0] == first_speech - pad and kept[-1] == last_speech + pad:
+        ok(f"Stille vorne/hinten bis auf {pad} Frames Padding entfernt")
+    else:
+        fail(f"Behalten von Frame {kept[0]} bis {kept[-1]}, Sprache {first_speech}..{last_speech}")
+    pause_start, pause_frames = LAYOUT[0][1] + LAYOUT[1][1], LAYOUT[2][1]
+    pause_kept = int(keep[pause_start:pause_start + pause_frames].sum())
+    if pause_kept == max_pause + 2 * pad:
+        ok(f"Pause {pause_frames * VAD_FRAME_MS / 1000:.1f}s -> {pause_kept * VAD_FRAME_MS / 1000:.2f}s "
+           f"({VAD_MAX_PAUSE_SECONDS:.1f}s + Padding)")
+    else:
+        fail(f"Pause: {pause_kept} Frames behalten, erwartet {max_pause + 2 * pad}")
+
+    # ── apply_keep ──
+    step(3, "apply_keep kopiert genau die behaltenen Frames")
+    total = kept_length(len(samples), keep, frame_len)
+    trimmed = apply_keep(samples, keep, frame_len)
+    reference = mask_copy(np, samples, keep, frame_len)
+    if len(trimmed) == total == int(keep.sum()) * frame_len and np.array_equal(trimmed, reference):
+        ok(f"{len(samples)} -> {len(trimmed)} Samples, Rest-Samples hinter Stille verworfen")
+    else:
+        fail(f"Länge {len(trimmed)} (kept_length {total}), identisch: {np.array_equal(trimmed, reference)}")
+    out = np.full(total + 50, 12345, dtype=np.int16)
+    apply_keep(samples, keep, frame_len, out=out)
+    if np.array_equal(out[:total], reference) and (out[total:] == 12345).all():
+        ok("out= wird vorne beschrieben, dahinter unverändert")
+    else:
+        fail("apply_keep mit out= weicht ab")
+    as_float = samples.astype(np.float32) / 32768
+    keep_float = keep_frames(as_float, SAMPLE_RATE)
+    trimmed_float = apply_keep(as_float, keep_float, frame_len) if keep_float is not None else None
+    if (keep_float is not None and np.array_equal(keep_float, keep)
+            and trimmed_float.dtype == np.float32 and np.array_equal(trimmed_float, reference.astype(np.float32) / 32768)):
+        ok("float32-Aufnahme: gleiche Frames, dtype bleibt float32")
+    else:
+        fail("float32-Aufnahme weicht ab")
+    trimmed_cs, removed = compress_silence(samples, SAMPLE_RATE)
+    if np.array_equal(trimmed_cs, trimmed) and abs(removed - (len(samples) - total) / SAMPLE_RATE) < 1e-9:
+        ok(f"compress_silence: {removed:.2f}s entfernt")
+    else:
+        fail(f"compress_silence: {len(trimmed_cs)} Samples, {removed:.2f}s entfernt")
+
+    # ── Rest-Samples hinter Sprache ──
+    step(4, "Aufnahme endet mitten in der Sprache (Rest-Samples bleiben)")
+    cut, cut_voiced = make_signal(np, LAYOUT[:4], frame_len, tail="speech")
+    keep = keep_frames(cut, SAMPLE_RATE)
+    if keep is None or not keep[-1]:
+        fail(f"Letzter Frame nicht behalten: {keep if keep is None else keep[-5:]}")
+    else:
+        trimmed = apply_keep(cut, keep, frame_len)
+        reference = mask_copy(np, cut, keep, frame_len)
+        if len(trimmed) == kept_length(len(cut), keep, frame_len) == int(keep.sum()) * frame_len + REMAINDER \
+                and np.array_equal(trimmed, reference):
+            ok(f"{REMAINDER} Rest-Samples angehängt, {len(trimmed)} Samples")
+        else:
+            fail(f"Länge {len(trimmed)}, identisch: {np.array_equal(trimmed, reference)}")
+
+    # ── Nichts zu entfernen ──
+    step(5, "Nichts zu entfernen: durchgehend Sprache, digitale Stille, zu kurz")
+    speech_only, _ = make_signal(np, [("speech", 60)], frame_len, tail="speech")
+    results = {
+        "Sprache": keep_frames(speech_only, SAMPLE_RATE),
+        "Stille": keep_frames(np.zeros(60 * frame_len, dtype=np.int16), SAMPLE_RATE),
+        "Kürzer als ein Frame": keep_frames(speech_only[:frame_len - 1], SAMPLE_RATE),
+    }
+    if all(value is None for value in results.values()):
+        ok("keep_frames liefert None")
+    else:
+        fail(f"Nicht None: {[name for name, value in results.items() if value is not None]}")
+    unchanged, removed = compress_silence(speech_only, SAMPLE_RATE)
+    if unchanged is speech_only and removed == 0.0:
+        ok("compress_silence gibt das Original-Array zurück")
+    else:
+        fail("compress_silence hat kopiert oder gekürzt")
+
+    header("FEHLGESCHLAGEN" if failures else "ALLE TESTS ABGESCHLOSSEN")
+    return not failures
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
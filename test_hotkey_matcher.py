@@ -0,0 +1,250 @@
+"""
+Hotkey-Matcher: Funktionstest und Benchmark mit synthetischen Tastenströmen.
+
+Prüft Einzeltaste, Akkorde, generische Modifier, Auto-Repeat, mehrere Hotkeys mit Modus
+und die Hotkey-Erfassung. Misst danach die Kosten pro Tastenereignis im Vergleich zum
+bisherigen Pfad (get_key_name + Lock + config.get) - über dieselbe Ereignisfolge.
+
+Ausfuehren:  python test_hotkey_matcher.py
+"""
+
+import random
+import sys
+import threading
+import time
+
+# ──────────────────────────────────────────────────────────────
+# Test-Konfiguration
+# ──────────────────────────────────────────────────────────────
+
+BENCH_EVENTS = 200_000
+BENCH_HOTKEY_EVERY = 500  # Jeder 500. Anschlag ist der Hotkey, sonst normales Tippen
+BENCH_RUNS = 3  # Bester von mehreren Durchläufen
+TEXT = "der kläger beantragt die klage abzuweisen und die kosten dem beklagten aufzuerlegen "
+
+failures = []
+
+# ──────────────────────────────────────────────────────────────
+# Hilfs-Funktionen
+# ──────────────────────────────────────────────────────────────
+
+def header(text):
+    print(f"\n{'='*60}")
+    print(f"  {text}")
+    print(f"{'='*60}")
+
+
+def step(num, text):
+    print(f"\n--- Schritt {num}: {text} ---")
+
+
+def ok(msg):
+    print(f"  [OK] {msg}")
+
+
+def fail(msg):
+    failures.append(msg)
+    print(f"  [FAIL] {msg}")
+
+
+def char_key(keyboard, char):
+    """KeyCode wie vom Windows-Hook: vk + Zeichen"""
+    vk = ord(char.upper()) if char.isascii() and char.isalnum() else 0xDE
+    return keyboard.KeyCode(vk=vk, char=char)
+
+
+class Recorder:
+    """Sammelt on_activate/on_deactivate"""
+
+    def __init__(self):
+        self.events = []
+
+    def activate(self, binding):
+        self.events.append(("down", binding.hotkey, binding.mode))
+
+    def deactivate(self, binding):
+        self.events.append(("up", binding.hotkey, binding.mode))
+
+
+def make_stream(keyboard, n):
+    """Synthetischer Tastenstrom: (press?, key) - Tippen mit Shift, dazwischen der Hotkey"""
+    rng = random.Random(42)
+    events = []
+    i = 0
+    while len(events) < n:
+        char = TEXT[i % len(TEXT)]
+        i += 1
+        if i % BENCH_HOTKEY_EVERY == 0:
+            events.append((True, keyboard.Key.ctrl_r))
+            events.extend([(True, keyboard.Key.ctrl_r)] * 3)  # Auto-Repeat
+            events.append((False, keyboard.Key.ctrl_r))
+        if char == " ":
+            key = keyboard.Key.space
+        else:
+            key = char_key(keyboard, char)
+        shift = rng.random() < 0.05
+        if shift:
+            events.append((True, keyboard.Key.shift))
+        events.append((True, key))
+        events.append((False, key))
+        if shift:
+            events.append((False, keyboard.Key.shift))
+    return events
+
+
+# ──────────────────────────────────────────────────────────────
+# Test-Runner
+# ──────────────────────────────────────────────────────────────
+
+def main(keyboard=None):
+    header("HOTKEY-MATCHER")
+    if keyboard is None:
+        from pynput import keyboard
+    from hotkey_matcher import HotkeyMatcher, HotkeyBinding, key_name
+
+    Key = keyboard.Key
+    rec = Recorder()
+    watched = []
+    matcher = HotkeyMatcher(keyboard, rec.activate, rec.deactivate, on_watch=watched.append)
+    matcher.compile([
+        HotkeyBinding("ctrl_r"),
+        HotkeyBinding("ctrl_l+alt_l+t", "Übersetzer"),
+        HotkeyBinding("ctrl+shift+d", "Diktat"),
+    ], watch=("ctrl", "alt", "shift", "cmd"))
+
+    def feed(*events):
+        for pressed, key in events:
+            (matcher.press if pressed else matcher.release)(key)
+
+    # ── Einzeltaste + Auto-Repeat ──
+    step(1, "Einzeltaste mit Auto-Repeat")
+    feed((True, Key.ctrl_r), (True, Key.ctrl_r), (True, Key.ctrl_r), (False, Key.ctrl_r))
+    if rec.events == [("down", "ctrl_r", None), ("up", "ctrl_r", None)]:
+        ok("Einmal ausgelöst, Loslassen beendet")
+    else:
+        fail(f"Ereignisse: {rec.events}")
+
+    # ── Akkord ──
+    step(2, "Akkord ctrl_l+alt_l+t")
+    rec.events.clear()
+    t = char_key(keyboard, "t")
+    feed((True, t), (False, t))  # Ohne Modifier: nichts
+    feed((True, Key.ctrl_l), (True, Key.alt_l), (True, keyboard.KeyCode(vk=ord("T"), char="\x14")))
+    feed((False, Key.alt_l), (False, t), (False, Key.ctrl_l))
+    if rec.events == [("down", "ctrl_l+alt_l+t", "Übersetzer"), ("up", "ctrl_l+alt_l+t", "Übersetzer")]:
+        ok("Akkord mit Modus, Steuerzeichen über den Tastencode erkannt")
+    else:
+        fail(f"Ereignisse: {rec.events}")
+
+    # ── Generische Modifier ──
+    step(3, "Generische Modifier ctrl+shift+d")
+    rec.events.clear()
+    d = char_key(keyboard, "d")
+    feed((True, Key.ctrl_r), (True, Key.shift_l), (True, d), (False, d), (False, Key.shift_l), (False, Key.ctrl_r))
+    if rec.events[:1] == [("down", "ctrl_r", None)] and ("down", "ctrl+shift+d", "Diktat") not in rec.events:
+        ok("ctrl_r löst sofort aus - Akkord nicht während eines aktiven Hotkeys")
+    else:
+        fail(f"Ereignisse: {rec.events}")
+    rec.events.clear()
+    feed((True, Key.shift_r), (True, Key.ctrl_l), (True, d), (False, d), (False, Key.ctrl_l), (False, Key.shift_r))
+    if rec.events == [("down", "ctrl+shift+d", "Diktat"), ("up", "ctrl+shift+d", "Diktat")]:
+        ok("ctrl_l/shift_r passen auf ctrl/shift")
+    else:
+        fail(f"Ereignisse: {rec.events}")
+
+    # ── Beobachtete Tasten ──
+    step(4, "Beobachtete Modifier (Ruhemodus)")
+    if watched and set(watched) <= {"ctrl_r", "ctrl_l", "shift_l", "shift_r", "alt_l"}:
+        ok(f"on_watch: {len(watched)} Aufrufe ({', '.join(sorted(set(watched)))})")
+    else:
+        fail(f"on_watch: {watched}")
+
+    # ── Erfassung ──
+    step(5, "Hotkey-Erfassung")
+    captured = []
+    matcher.capture(captured.append)
+    feed((True, Key.ctrl_l), (True, Key.alt_l), (True, keyboard.KeyCode(vk=ord("K"), char="\x0b")))
+    matcher.capture(captured.append)
+    feed((False, Key.alt_l), (False, Key.ctrl_l), (True, Key.ctrl_r), (False, Key.ctrl_r))
+    if captured == ["ctrl_l+alt_l+k", "ctrl_r"]:
+        ok(f"Erfasst: {captured}")
+    else:
+        fail(f"Erfasst: {captured}")
+
+    # ── Neu kompilieren während aktivem Hotkey ──
+    step(6, "Neu kompilieren während der Aufnahme")
+    rec.events.clear()
+    feed((True, Key.ctrl_r))
+    matcher.compile([HotkeyBinding("f9")])
+    feed((True, char_key(keyboard, "a")), (False, Key.ctrl_r), (True, Key.f9), (False, Key.f9))
+    if rec.events == [("down", "ctrl_r", None), ("up", "ctrl_r", None), ("down", "f9", None), ("up", "f9", None)]:
+        ok("Alte Tabelle bis zum Loslassen, danach f9")
+    else:
+        fail(f"Ereignisse: {rec.events}")
+
+    # ── Benchmark ──
+    step(7, f"Benchmark: {BENCH_EVENTS} Ereignisse")
+    events = make_stream(keyboard, BENCH_EVENTS)
+    expected = sum(1 for i, (pressed, key) in enumerate(events)
+                   if pressed and key is Key.ctrl_r and not (i and events[i - 1] == (True, Key.ctrl_r)))
+
+    # Bisheriger Pfad aus setup_hotkey_listener
+    config = {"hotkey": "ctrl_r"}
+    lock = threading.Lock()
+    state = {"setting": False, "recording": False, "count": 0}
+
+    def legacy_press(key):
+        name = key_name(key)
+        with lock:
+            if state["setting"]:
+                return
+        target = config.get("hotkey")
+        if name == target or name.startswith(("ctrl", "alt", "shift", "cmd")):
+            pass
+        if name == target and not state["recording"]:
+            state["recording"] = True
+            state["count"] += 1
+
+    def legacy_release(key):
+        name = key_name(key)
+        target = config.get("hotkey")
+        with lock:
+            if state["setting"]:
+                return
+        if name == target and state["recording"]:
+            state["recording"] = False
+
+    counts = {"new": 0}
+    bench = HotkeyMatcher(keyboard, lambda b: counts.__setitem__("new", counts["new"] + 1), lambda b: None,
+                          on_watch=lambda name: None)
+    bench.compile([HotkeyBinding("ctrl_r"), HotkeyBinding("ctrl_l+alt_l+t", "Übersetzer")],
+                  watch=("ctrl", "alt", "shift", "cmd"))
+
+    def run(press, release):
+        start = time.perf_counter()
+        for pressed, key in events:
+            if pressed:
+                press(key)
+            else:
+                release(key)
+        return (time.perf_counter() - start) / len(events) * 1e9
+
+    legacy_ns = min(run(legacy_press, legacy_release) for _ in range(BENCH_RUNS))
+    matcher_ns = min(run(bench.press, bench.release) for _ in range(BENCH_RUNS))
+    print(f"  Bisher:  {legacy_ns:7.0f} ns/Ereignis")
+    print(f"  Matcher: {matcher_ns:7.0f} ns/Ereignis ({legacy_ns / matcher_ns:.1f}x)")
+    if counts["new"] == state["count"] == expected * BENCH_RUNS:
+        ok(f"Beide Pfade: {expected} Auslösungen")
+    else:
+        fail(f"Auslösungen: Matcher {counts['new']}, bisher {state['count']}, erwartet {expected}")
+    if matcher_ns < legacy_ns:
+        ok("Matcher ist schneller")
+    else:
+        fail("Matcher ist nicht schneller als der bisherige Pfad")
+
+    header("FEHLGESCHLAGEN" if failures else "ALLE TESTS ABGESCHLOSSEN")
+    return not failures
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
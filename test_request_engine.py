@@ -0,0 +1,231 @@
+"""
+Request-Engine: viele gleichzeitige API-Requests als Coroutinen gegen einen lokalen Stand-in-Proxy.
+
+Startet einen lokalen HTTP-Server, der /api/transcribe und /api/chat mit künstlicher
+Latenz nachbildet, und prüft über die echte APIHandler-Logik:
+viele parallele Transkriptionen ohne Thread pro Request, Chat + JSON-Auswertung,
+Abbruch über CancelToken, Retry-Wartezeit ohne blockierten Loop, blockierende Wrapper.
+
+Ausfuehren:  python test_request_engine.py
+"""
+
+import http.server
+import json
+import sys
+import threading
+import time
+
+# ──────────────────────────────────────────────────────────────
+# Test-Konfiguration
+# ──────────────────────────────────────────────────────────────
+
+SERVER_PORT = 18929  # ungewoehnlicher Port um Konflikte zu vermeiden
+SERVER_DELAY = 0.3  # Simulierte Whisper-/LLM-Verarbeitungszeit pro Request
+CONCURRENT_REQUESTS = 40
+SLOW_DELAY = 5.0  # Für den Abbruch-Test
+
+failures = []
+
+# ──────────────────────────────────────────────────────────────
+# Hilfs-Funktionen
+# ──────────────────────────────────────────────────────────────
+
+def header(text):
+    print(f"\n{'='*60}")
+    print(f"  {text}")
+    print(f"{'='*60}")
+
+
+def step(num, text):
+    print(f"\n--- Schritt {num}: {text} ---")
+
+
+def ok(msg):
+    print(f"  [OK] {msg}")
+
+
+def fail(msg):
+    failures.append(msg)
+    print(f"  [FAIL] {msg}")
+
+
+class FakeConfig:
+    def __init__(self):
+        self.values = {"language": "Deutsch", "upload_codec": "wav", "custom_instructions": "",
+                       "target_language": "Englisch"}
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def get_language_code(self):
+        return "de"
+
+
+class FakeLogger:
+    def __init__(self):
+        self.lines = []
+
+    def log(self, message, level="info"):
+        self.lines.append((level, message))
+
+
+class FakeProxyHandler(http.server.BaseHTTPRequestHandler):
+    """Antwortet nach SERVER_DELAY; X-Test-Delay / rate_limit_once steuern Sonderfälle"""
+
+    protocol_version = "HTTP/1.1"
+    rate_limit_once = False
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        cls = FakeProxyHandler
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+            limited, cls.rate_limit_once = cls.rate_limit_once, False
+        try:
+            if limited:
+                self._reply(429, {"error": "rate limited"})
+                return
+            time.sleep(float(self.headers.get("X-Test-Delay", SERVER_DELAY)))
+            if self.path == "/api/transcribe":
+                self._reply(200, {"text": f"Transkript {len(body)} bytes"})
+            else:
+                content = json.dumps({"text": "Formatierter Text."})
+                self._reply(200, {"choices": [{"message": {"content": content}}]})
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client hat abgebrochen
+
+
+def client_threads():
+    """Threads ohne die des Test-Servers (ein Thread pro Keep-Alive-Verbindung)"""
+    return sum(1 for t in threading.enumerate() if "process_request_thread" not in t.name)
+
+
+def make_clip(seconds=1.0):
+    from audio_handler import AudioClip, build_wav_header
+    frames = int(16000 * seconds)
+    return AudioClip(build_wav_header(frames, 16000) + b"\x00\x01" * frames, 16000, frames)
+
+
+# ──────────────────────────────────────────────────────────────
+# Test-Runner
+# ──────────────────────────────────────────────────────────────
+
+def main():
+    header("REQUEST-ENGINE SIMULATION")
+    import api_handler
+    from request_engine import CancelToken, RequestCancelled
+
+    server = http.server.ThreadingHTTPServer(("localhost", SERVER_PORT), FakeProxyHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_handler.PROXY_BASE_URL = f"http://localhost:{SERVER_PORT}"
+    api_handler.USE_PROXY = True
+    logger = FakeLogger()
+    api = api_handler.APIHandler(FakeConfig(), logger)
+
+    try:
+        # ── Viele gleichzeitige Transkriptionen ──
+        step(1, f"{CONCURRENT_REQUESTS} gleichzeitige Transkriptionen")
+        clip = make_clip()
+        api.transcribe(clip)  # Loop + Verbindung aufwärmen
+        threads_before = client_threads()
+        start = time.perf_counter()
+        futures = [api.engine.submit(api.transcribe_async(clip)) for _ in range(CONCURRENT_REQUESTS)]
+        peak_threads = 0
+        while not all(f.done() for f in futures):
+            peak_threads = max(peak_threads, client_threads() - threads_before)
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        results = [f.result() for f in futures]
+        if all(r and r.startswith("Transkript") for r in results):
+            ok(f"{len(results)} Ergebnisse in {elapsed * 1000:.0f}ms (seriell wären es {CONCURRENT_REQUESTS * SERVER_DELAY:.0f}s)")
+        else:
+            fail(f"Ergebnisse: {results[:3]}")
+        if FakeProxyHandler.peak >= api.engine.max_connections // 2:
+            ok(f"Server sah bis zu {FakeProxyHandler.peak} gleichzeitige Requests (Pool-Limit {api.engine.max_connections})")
+        else:
+            fail(f"Nur {FakeProxyHandler.peak} gleichzeitige Requests beim Server")
+        if peak_threads < CONCURRENT_REQUESTS // 4:
+            ok(f"Zusätzliche Client-Threads: höchstens {peak_threads} (statt {CONCURRENT_REQUESTS})")
+        else:
+            fail(f"{peak_threads} zusätzliche Client-Threads")
+
+        # ── Chat + JSON ──
+        step(2, "process_llm_async / refine_text über /api/chat")
+        final = api.engine.run(api.process_llm_async("rohtext", "Dynamisches Diktat"))
+        refined = api.refine_text("rohtext", "compact")
+        if final == "Formatierter Text." and refined == "Formatierter Text.":
+            ok("LLM-Antworten ausgewertet")
+        else:
+            fail(f"LLM: {final!r}, Refine: {refined!r}")
+
+        # ── Abbruch ──
+        step(3, "Abbruch über CancelToken")
+        token = CancelToken()
+
+        async def slow_chat():
+            response = await api.engine.client.post(
+                f"{api_handler.PROXY_BASE_URL}/api/chat", json={}, headers={"X-Test-Delay": str(SLOW_DELAY)})
+            return response.status_code
+
+        future = api.engine.submit(slow_chat(), token)
+        time.sleep(0.2)
+        cancelled_at = time.perf_counter()
+        token.cancel()
+        try:
+            future.result(timeout=2)
+            fail("Request lief trotz Abbruch zu Ende")
+        except RequestCancelled:
+            ok(f"RequestCancelled nach {(time.perf_counter() - cancelled_at) * 1000:.0f}ms (statt {SLOW_DELAY:.0f}s)")
+        except Exception as e:
+            fail(f"Unerwarteter Fehler: {type(e).__name__}: {e}")
+        late = api.engine.submit(slow_chat(), token)
+        try:
+            late.result(timeout=1)
+            fail("Abgebrochenes Token startet neue Jobs")
+        except RequestCancelled:
+            ok("Neue Jobs mit abgebrochenem Token starten nicht")
+
+        # ── Retry-Wartezeit blockiert den Loop nicht ──
+        step(4, "Rate-Limit-Retry wartet asynchron")
+        FakeProxyHandler.rate_limit_once = True
+        retry_future = api.engine.submit(api.transcribe_async(clip))
+        time.sleep(0.1)  # Erster Versuch bekommt 429 und wartet (Backoff der RetryPolicy)
+        start = time.perf_counter()
+        quick = api.transcribe(clip)
+        quick_ms = (time.perf_counter() - start) * 1000
+        retried = retry_future.result(timeout=10)
+        if quick and quick_ms < 1500 and retried:
+            ok(f"Anderer Request während des Retry-Timers in {quick_ms:.0f}ms fertig, Retry danach erfolgreich")
+        else:
+            fail(f"Request während Retry: {quick_ms:.0f}ms, Retry-Ergebnis {retried!r}")
+
+    finally:
+        api.close()
+        server.shutdown()
+
+    header("FEHLGESCHLAGEN" if failures else "ALLE TESTS ABGESCHLOSSEN")
+    return not failures
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
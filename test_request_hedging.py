@@ -0,0 +1,248 @@
+"""
+Hedged Requests: langsamer Proxy gegen schnelles Groq direkt (lokaler Stand-in).
+
+Startet einen lokalen HTTP-Server für /api/* (Proxy) und /openai/v1/* (Groq direkt) mit
+einstellbarer Latenz pro Weg und prüft über die echte APIHandler-Logik: Hedge-Schwelle
+aus dem Perzentil der letzten Latenzen, zweiter Versuch gewinnt bei langsamem Proxy,
+schneller Proxy gewinnt gegen einen langsamen Hedge, Budget begrenzt die Zusatz-Requests,
+ohne request_hedging oder API Key kein zweiter Versuch.
+
+Ausfuehren:  python test_request_hedging.py
+"""
+
+import http.server
+import json
+import os
+import sys
+import threading
+import time
+
+# ──────────────────────────────────────────────────────────────
+# Test-Konfiguration
+# ──────────────────────────────────────────────────────────────
+
+SERVER_PORT = 18933  # ungewoehnlicher Port um Konflikte zu vermeiden
+FAST = 0.05
+SLOW = 1.5  # Langsamer Serverless-Aufruf
+WARMUP_REQUESTS = 12
+BUDGET_REQUESTS = 20
+
+failures = []
+
+# ──────────────────────────────────────────────────────────────
+# Hilfs-Funktionen
+# ──────────────────────────────────────────────────────────────
+
+def header(text):
+    print(f"\n{'='*60}")
+    print(f"  {text}")
+    print(f"{'='*60}")
+
+
+def step(num, text):
+    print(f"\n--- Schritt {num}: {text} ---")
+
+
+def ok(msg):
+    print(f"  [OK] {msg}")
+
+
+def fail(msg):
+    failures.append(msg)
+    print(f"  [FAIL] {msg}")
+
+
+class FakeConfig:
+    def __init__(self, **values):
+        self.values = {"language": "Deutsch", "upload_codec": "wav", "custom_instructions": "",
+                       "target_language": "Englisch", "api_key": "test-key", "request_hedging": True}
+        self.values.update(values)
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def get_language_code(self):
+        return "de"
+
+
+class FakeLogger:
+    def log(self, message, level="info"):
+        pass
+
+
+class LatencyServer(http.server.BaseHTTPRequestHandler):
+    """Antwortet nach delay[weg] Sekunden; hits zählt die Requests pro Weg"""
+
+    protocol_version = "HTTP/1.1"
+    delay = {"proxy": FAST, "groq": FAST}
+    hits = {"proxy": 0, "groq": 0}
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        route = "proxy" if self.path.startswith("/api/") else "groq"
+        with LatencyServer.lock:
+            LatencyServer.hits[route] += 1
+        time.sleep(LatencyServer.delay[route])
+        if self.path.endswith("/transcribe") or self.path.endswith("/transcriptions"):
+            payload = {"text": f"Transkript via {route}"}
+        else:
+            content = json.dumps({"text": f"Formatiert via {route}."})
+            payload = {"id": "chat-1", "object": "chat.completion", "created": 0, "model": "test",
+                       "choices": [{"index": 0, "finish_reason": "stop",
+                                    "message": {"role": "assistant", "content": content}}]}
+        data = json.dumps(payload).encode()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Verlierer wurde abgebrochen
+
+
+def set_delays(proxy, groq):
+    with LatencyServer.lock:
+        LatencyServer.delay = {"proxy": proxy, "groq": groq}
+        LatencyServer.hits = {"proxy": 0, "groq": 0}
+
+
+def make_clip(seconds=1.0):
+    from audio_handler import AudioClip, build_wav_header
+    frames = int(16000 * seconds)
+    return AudioClip(build_wav_header(frames, 16000) + b"\x00\x01" * frames, 16000, frames)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+# ──────────────────────────────────────────────────────────────
+# Test-Runner
+# ──────────────────────────────────────────────────────────────
+
+def main():
+    header("HEDGED REQUESTS (Proxy vs. Groq direkt)")
+    os.environ["GROQ_BASE_URL"] = f"http://localhost:{SERVER_PORT}"
+    import api_handler
+    from request_hedging import RequestHedger, HedgeBudget, HEDGE_MIN_DELAY_SECONDS
+
+    # ── Perzentil ──
+    step(1, "Hedge-Schwelle aus dem Perzentil der letzten Latenzen")
+    hedger = RequestHedger(percentile=0.9, min_samples=8)
+    for i in range(7):
+        hedger.record("Whisper", "proxy", 0.5)
+    too_few = hedger.hedge_delay("Whisper", "proxy")
+    for latency in (0.5, 0.6, 0.7, 0.8, 0.9, 1.0, 1.1, 4.0, 0.5, 0.5, 0.5, 0.5, 0.5):
+        hedger.record("Whisper", "proxy", latency)
+    for i in range(10):
+        hedger.record("Whisper", "direct", 0.1)
+    proxy_delay = hedger.hedge_delay("Whisper", "proxy")
+    if (too_few is None and proxy_delay == 1.1 and hedger.hedge_delay("Chat", "proxy") is None
+            and hedger.hedge_delay("Whisper", "direct") == HEDGE_MIN_DELAY_SECONDS):
+        ok(f"p90 von 20 Werten = {proxy_delay:.1f}s, unter 8 Werten kein Hedging, je Request-Art und Weg")
+    else:
+        fail(f"Schwelle {proxy_delay} (zu wenige Werte: {too_few}, "
+             f"direkt {hedger.hedge_delay('Whisper', 'direct')})")
+
+    http_server = http.server.ThreadingHTTPServer(("localhost", SERVER_PORT), LatencyServer)
+    http_server.daemon_threads = True
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+    api_handler.PROXY_BASE_URL = f"http://localhost:{SERVER_PORT}"
+    api_handler.USE_PROXY = True
+    api = api_handler.APIHandler(FakeConfig(), FakeLogger())
+    clip = make_clip()
+
+    try:
+        # ── Latenzen sammeln ──
+        step(2, f"{WARMUP_REQUESTS} schnelle Proxy-Antworten")
+        set_delays(FAST, FAST)
+        for _ in range(WARMUP_REQUESTS):
+            api.transcribe(clip)
+            api.refine_text("rohtext", "compact")
+        delay = api.hedger.hedge_delay("Whisper", "proxy")
+        if api.hedger.hedges == 0 and LatencyServer.hits["groq"] == 0 and delay is not None:
+            ok(f"Kein Hedge, Schwelle jetzt {delay:.2f}s (Minimum {HEDGE_MIN_DELAY_SECONDS:.1f}s)")
+        else:
+            fail(f"Hedges {api.hedger.hedges}, Groq-Requests {LatencyServer.hits['groq']}, Schwelle {delay}")
+
+        # ── Langsamer Proxy ──
+        step(3, f"Proxy braucht {SLOW:.1f}s - Hedge über Groq direkt gewinnt")
+        set_delays(SLOW, FAST)
+        result, elapsed = timed(api.transcribe, clip)
+        if result == "Transkript via groq" and elapsed < delay + FAST + 0.5:
+            ok(f"Antwort nach {elapsed:.2f}s statt {SLOW:.1f}s")
+        else:
+            fail(f"Ergebnis {result!r} nach {elapsed:.2f}s")
+        refined, elapsed = timed(api.refine_text, "rohtext", "compact")
+        if refined == "Formatiert via groq.":
+            ok(f"Chat ebenso: {elapsed:.2f}s")
+        else:
+            fail(f"Chat: {refined!r} nach {elapsed:.2f}s")
+        if api.hedger.hedge_wins == 2 and not api.breakers["proxy"].failures:
+            ok("Hedge-Gewinne gezählt, abgebrochener Proxy-Versuch zählt nicht als Ausfall")
+        else:
+            fail(f"Stats {api.hedger.stats}, Proxy-Fehlschläge {api.breakers['proxy'].failures}")
+        if api.hedger.hedge_delay("Whisper", "direct") is None and api.hedger.hedge_delay("Whisper", "proxy") == delay:
+            ok("Groq-Antworten landen in eigener Statistik, Proxy-Schwelle unverändert")
+        else:
+            fail(f"Schwellen: Proxy {api.hedger.hedge_delay('Whisper', 'proxy')}, "
+                 f"direkt {api.hedger.hedge_delay('Whisper', 'direct')}")
+
+        # ── Hedge verliert ──
+        step(4, "Proxy knapp über der Schwelle, Groq noch langsamer - Proxy gewinnt")
+        wins = api.hedger.hedge_wins
+        set_delays(delay + 0.3, SLOW)
+        result, elapsed = timed(api.transcribe, clip)
+        if result == "Transkript via proxy" and elapsed < SLOW and api.hedger.hedge_wins == wins:
+            ok(f"Proxy nach {elapsed:.2f}s, Groq-Versuch abgebrochen")
+        else:
+            fail(f"Ergebnis {result!r} nach {elapsed:.2f}s, Gewinne {api.hedger.hedge_wins}")
+
+        # ── Budget ──
+        step(5, f"{BUDGET_REQUESTS} langsame Proxy-Antworten hintereinander - Budget begrenzt")
+        api.hedger.budget = HedgeBudget()
+        hedges_before = api.hedger.hedges
+        set_delays(delay + 0.4, FAST)
+        for _ in range(BUDGET_REQUESTS):
+            api.transcribe(clip)
+        hedged = api.hedger.hedges - hedges_before
+        budget = api.hedger.budget
+        limit = budget.burst + budget.ratio * BUDGET_REQUESTS
+        if 0 < hedged <= limit and api.hedger.denied > 0:
+            ok(f"{hedged} Hedges bei {BUDGET_REQUESTS} Requests (Budget {limit:.0f}), {api.hedger.denied} verweigert")
+        else:
+            fail(f"{hedged} Hedges (Budget {limit:.0f}), verweigert {api.hedger.denied}")
+        stats = api.hedger.stats
+        print(f"  Stats: {stats['requests']} Requests, {stats['hedges']} Hedges ({stats['hedge_rate']:.0%}), "
+              f"{stats['hedge_wins']} gewonnen")
+
+        # ── Ohne Hedging ──
+        step(6, "request_hedging aus bzw. ohne API Key - kein zweiter Versuch")
+        api.hedger.budget = HedgeBudget()
+        for values in ({"request_hedging": False}, {"api_key": ""}):
+            api.config.values.update(values)
+            set_delays(delay + 0.4, FAST)
+            result = api.transcribe(clip)
+            api.config.values.update({"request_hedging": True, "api_key": "test-key"})
+            if result == "Transkript via proxy" and LatencyServer.hits["groq"] == 0:
+                ok(f"{values}: nur Proxy")
+            else:
+                fail(f"{values}: {result!r}, Groq-Requests {LatencyServer.hits['groq']}")
+
+    finally:
+        api.close()
+        http_server.shutdown()
+
+    header("FEHLGESCHLAGEN" if failures else "ALLE TESTS ABGESCHLOSSEN")
+    return not failures
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,341 @@
+"""
+Retry-Politik: Fehlerinjektion gegen einen lokalen Stand-in für Proxy und Groq.
+
+Startet einen lokalen HTTP-Server, der /api/* (Proxy) und /openai/v1/* (Groq direkt)
+nachbildet und pro Weg hängen, 5xx oder 429 mit Retry-After/Rate-Limit-Headern liefern
+kann. Prüft über die echte APIHandler-Logik: Header-Auswertung und Jitter-Grenzen,
+eingehaltene Server-Wartezeiten, die obere Latenzgrenze durch die gemeinsame Deadline
+(Transkription + LLM), schnellen Fehler bei offenem Circuit Breaker, Umschalten auf
+Groq direkt und das Schließen nach einem erfolgreichen Probe-Request.
+
+Ausfuehren:  python test_retry_policy.py
+"""
+
+import http.server
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+# ──────────────────────────────────────────────────────────────
+# Test-Konfiguration
+# ──────────────────────────────────────────────────────────────
+
+SERVER_PORT = 18931  # ungewoehnlicher Port um Konflikte zu vermeiden
+SERVER_DELAY = 0.05
+HANG_SECONDS = 30.0  # "Hängender" Server - länger als jede erlaubte Wartezeit
+TEST_DEADLINE = 3.0  # Deadline pro Diktat im Test (Standard 90s)
+RETRY_AFTER = 1.0
+RATE_LIMIT_RESET = "1.2s"
+SLACK = 0.6  # Toleranz für Server-Latenz und Scheduling
+
+failures = []
+
+# ──────────────────────────────────────────────────────────────
+# Hilfs-Funktionen
+# ──────────────────────────────────────────────────────────────
+
+def header(text):
+    print(f"\n{'='*60}")
+    print(f"  {text}")
+    print(f"{'='*60}")
+
+
+def step(num, text):
+    print(f"\n--- Schritt {num}: {text} ---")
+
+
+def ok(msg):
+    print(f"  [OK] {msg}")
+
+
+def fail(msg):
+    failures.append(msg)
+    print(f"  [FAIL] {msg}")
+
+
+class FakeConfig:
+    def __init__(self, **values):
+        self.values = {"language": "Deutsch", "upload_codec": "wav", "custom_instructions": "",
+                       "target_language": "Englisch", "request_deadline_seconds": TEST_DEADLINE}
+        self.values.update(values)
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def get_language_code(self):
+        return "de"
+
+
+class FakeLogger:
+    def __init__(self):
+        self.lines = []
+
+    def log(self, message, level="info"):
+        self.lines.append((level, message))
+
+
+class FaultServer(http.server.BaseHTTPRequestHandler):
+    """Stand-in für Proxy (/api/*) und Groq (/openai/v1/*).
+
+    behavior[weg] steuert die Antwort: "ok", "hang", "down" (503), "retry_after"
+    (429 mit Retry-After), "rate_limit" (429 mit x-ratelimit-*). Ein Fehlerverhalten
+    gilt für fault_count[weg] Requests, danach antwortet der Weg normal.
+    """
+
+    protocol_version = "HTTP/1.1"
+    behavior = {"proxy": "ok", "groq": "ok"}
+    fault_count = {"proxy": 0, "groq": 0}
+    hits = {"proxy": 0, "groq": 0}
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        cls = FaultServer
+        route = "proxy" if self.path.startswith("/api/") else "groq"
+        with cls.lock:
+            cls.hits[route] += 1
+            behavior = cls.behavior[route]
+            if behavior != "ok" and cls.fault_count[route] > 0:
+                cls.fault_count[route] -= 1
+            else:
+                behavior = "ok"
+        if behavior == "hang":
+            time.sleep(HANG_SECONDS)
+            return
+        if behavior == "down":
+            self._reply(503, {"error": "unavailable"})
+        elif behavior == "retry_after":
+            self._reply(429, {"error": "rate limited"}, {"Retry-After": str(RETRY_AFTER)})
+        elif behavior == "rate_limit":
+            self._reply(429, {"error": {"message": "rate limited", "type": "requests"}}, {
+                "x-ratelimit-limit-requests": "30",
+                "x-ratelimit-remaining-requests": "0",
+                "x-ratelimit-reset-requests": RATE_LIMIT_RESET,
+                "x-ratelimit-remaining-tokens": "5000",
+                "x-ratelimit-reset-tokens": "7.66s",
+            })
+        else:
+            time.sleep(SERVER_DELAY)
+            self._reply_ok(route)
+
+    def _reply_ok(self, route):
+        text = "Transkript via proxy" if route == "proxy" else "Transkript via groq"
+        if self.path.endswith("/transcribe") or self.path.endswith("/transcriptions"):
+            self._reply(200, {"text": text})
+            return
+        content = json.dumps({"text": f"Formatiert via {route}."})
+        self._reply(200, {"id": "chat-1", "object": "chat.completion", "created": 0, "model": "test",
+                          "choices": [{"index": 0, "finish_reason": "stop",
+                                       "message": {"role": "assistant", "content": content}}]})
+
+    def _reply(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client hat abgebrochen
+
+
+def inject(route, behavior, count):
+    with FaultServer.lock:
+        FaultServer.behavior[route] = behavior
+        FaultServer.fault_count[route] = count
+        FaultServer.hits = {"proxy": 0, "groq": 0}
+
+
+def make_clip(seconds=1.0):
+    from audio_handler import AudioClip, build_wav_header
+    frames = int(16000 * seconds)
+    return AudioClip(build_wav_header(frames, 16000) + b"\x00\x01" * frames, 16000, frames)
+
+
+def dictation(api, clip, mode="Dynamisches Diktat"):
+    """Wie TranscriptionWorker._transcribe: eine Deadline für Transkription und LLM -> (raw, final, Sekunden)"""
+    from retry_policy import RetryableError, DeadlineExceeded, CircuitOpenError
+
+    async def run():
+        deadline = api.new_deadline()
+        try:
+            raw = await api.transcribe_async(clip, deadline=deadline)
+        except (RetryableError, DeadlineExceeded, CircuitOpenError):
+            raw = None  # TranscriptionWorker meldet den Fehler, hier zählt nur die Zeit
+        final = await api.process_llm_async(raw or "rohtext", mode, deadline=deadline)
+        return raw, final
+
+    start = time.perf_counter()
+    raw, final = api.engine.run(run())
+    return raw, final, time.perf_counter() - start
+
+
+# ──────────────────────────────────────────────────────────────
+# Test-Runner
+# ──────────────────────────────────────────────────────────────
+
+def main():
+    header("RETRY-POLITIK (Fehlerinjektion)")
+    os.environ["GROQ_BASE_URL"] = f"http://localhost:{SERVER_PORT}"
+    import api_handler
+    from retry_policy import RetryPolicy, parse_duration, retry_after_seconds, RETRY_AFTER_JITTER
+
+    # ── Header und Jitter ──
+    step(1, "Retry-After / Rate-Limit-Header und Jitter-Grenzen")
+    groq_headers = {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "2m59.56s",
+                    "x-ratelimit-remaining-tokens": "120", "x-ratelimit-reset-tokens": "7.66s"}
+    cases = [
+        (parse_duration("2m59.56s"), 179.56),
+        (parse_duration("120ms"), 0.12),
+        (retry_after_seconds({"retry-after": "3"}), 3.0),
+        (retry_after_seconds(groq_headers, rate_limited=True), 179.56),
+        (retry_after_seconds(groq_headers), None),  # Rate-Limit-Header nur bei 429
+    ]
+    if all(got is not None and expected is not None and abs(got - expected) < 1e-6 or got == expected
+           for got, expected in cases):
+        ok("Sekunden, Groq-Dauern und x-ratelimit-reset-* korrekt ausgewertet")
+    else:
+        fail(f"Header-Auswertung: {cases}")
+    http_date = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 10))
+    if 8.0 <= (retry_after_seconds({"retry-after": http_date}) or 0) <= 10.0:
+        ok("Retry-After als HTTP-Datum")
+    else:
+        fail(f"HTTP-Datum: {retry_after_seconds({'retry-after': http_date})}")
+
+    policy = RetryPolicy(rng=random.Random(7))
+    within = True
+    for attempt in range(1, 8):
+        backoff = min(policy.cap, policy.base * 2 ** (attempt - 1))
+        samples = [policy.delay(attempt) for _ in range(200)]
+        within &= all(backoff / 2 <= d <= backoff for d in samples)
+    server = [policy.delay(1, RETRY_AFTER) for _ in range(200)]
+    within &= all(RETRY_AFTER <= d <= RETRY_AFTER * (1 + RETRY_AFTER_JITTER) for d in server)
+    if within and len({round(d, 6) for d in server}) > 100:
+        ok(f"Backoff in [b/2, b] bis {policy.cap:.0f}s, Server-Vorgabe + bis {RETRY_AFTER_JITTER:.0%} Jitter")
+    else:
+        fail("Wartezeiten außerhalb der Grenzen oder ohne Jitter")
+
+    http_server = http.server.ThreadingHTTPServer(("localhost", SERVER_PORT), FaultServer)
+    http_server.daemon_threads = True
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+    api_handler.PROXY_BASE_URL = f"http://localhost:{SERVER_PORT}"
+    clip = make_clip()
+    apis = []
+
+    def new_api(use_proxy=True, **values):
+        api_handler.USE_PROXY = use_proxy
+        api = api_handler.APIHandler(FakeConfig(**values), FakeLogger())
+        apis.append(api)
+        return api
+
+    try:
+        # ── Retry-After vom Proxy ──
+        step(2, f"Proxy 429 mit Retry-After: {RETRY_AFTER:.0f}")
+        api = new_api(request_deadline_seconds=30)
+        inject("proxy", "retry_after", 1)
+        start = time.perf_counter()
+        result = api.transcribe(clip)
+        elapsed = time.perf_counter() - start
+        if result == "Transkript via proxy" and RETRY_AFTER <= elapsed <= RETRY_AFTER * 1.1 + SLACK:
+            ok(f"Nach {elapsed:.2f}s erfolgreich (Server verlangte {RETRY_AFTER:.1f}s)")
+        else:
+            fail(f"Ergebnis {result!r} nach {elapsed:.2f}s")
+        if not api.breakers["proxy"].failures:
+            ok("429 zählt nicht als Ausfall für den Circuit Breaker")
+        else:
+            fail(f"Breaker zählt 429: {api.breakers['proxy'].failures}")
+
+        # ── Groq Rate-Limit-Header ──
+        step(3, f"Groq direkt 429 mit x-ratelimit-reset-requests: {RATE_LIMIT_RESET}")
+        api = new_api(use_proxy=False, api_key="test-key", request_deadline_seconds=30)
+        inject("groq", "rate_limit", 1)
+        start = time.perf_counter()
+        result = api.transcribe(clip)
+        elapsed = time.perf_counter() - start
+        reset = parse_duration(RATE_LIMIT_RESET)
+        if result == "Transkript via groq" and reset <= elapsed <= reset * 1.1 + SLACK:
+            ok(f"Nach {elapsed:.2f}s erfolgreich (Reset {reset:.1f}s, Token-Limit nicht erschöpft)")
+        else:
+            fail(f"Ergebnis {result!r} nach {elapsed:.2f}s")
+
+        # ── Hängender Proxy: Deadline begrenzt das ganze Diktat ──
+        step(4, f"Hängender Proxy - Deadline {TEST_DEADLINE:.0f}s für Transkription + LLM")
+        api = new_api()
+        inject("proxy", "hang", 100)
+        raw, final, elapsed = dictation(api, clip)
+        if raw is None and final == "rohtext":
+            ok("Transkription fehlgeschlagen, LLM liefert den Rohtext zurück")
+        else:
+            fail(f"raw={raw!r}, final={final!r}")
+        if elapsed <= TEST_DEADLINE + SLACK:
+            ok(f"Diktat nach {elapsed:.2f}s beendet (vorher bis zu 2 x 3 x 60s + Wartezeiten)")
+        else:
+            fail(f"Diktat dauerte {elapsed:.2f}s (Deadline {TEST_DEADLINE:.0f}s)")
+
+        # ── Circuit Breaker: schneller Fehler ──
+        step(5, "Proxy fällt aus (503) - Circuit Breaker öffnet")
+        api = new_api(request_deadline_seconds=30)
+        inject("proxy", "down", 100)
+        raw, final, elapsed = dictation(api, clip)
+        hits = FaultServer.hits["proxy"]
+        if api.breakers["proxy"].is_open and raw is None:
+            ok(f"Breaker offen nach {hits} Proxy-Requests, erstes Diktat nach {elapsed:.2f}s beendet")
+        else:
+            fail(f"Breaker offen: {api.breakers['proxy'].is_open}, raw={raw!r}")
+        inject("proxy", "down", 100)
+        raw, final, elapsed = dictation(api, clip)
+        if FaultServer.hits["proxy"] == 0 and elapsed < 0.2 and final == "rohtext":
+            ok(f"Nächstes Diktat schlägt ohne Request in {elapsed * 1000:.0f}ms fehl")
+        else:
+            fail(f"{FaultServer.hits['proxy']} Proxy-Requests, {elapsed:.2f}s, final={final!r}")
+
+        # ── Umschalten auf Groq direkt ──
+        step(6, "Mit eigenem API Key: offener Proxy-Breaker schaltet auf Groq direkt")
+        api.config.values["api_key"] = "test-key"
+        inject("proxy", "down", 100)
+        raw, final, elapsed = dictation(api, clip)
+        if raw == "Transkript via groq" and final == "Formatiert via groq." and FaultServer.hits["proxy"] == 0:
+            ok(f"Transkription und LLM über Groq direkt in {elapsed * 1000:.0f}ms")
+        else:
+            fail(f"raw={raw!r}, final={final!r}, Proxy-Requests {FaultServer.hits['proxy']}")
+
+        api2 = new_api(api_key="test-key", request_deadline_seconds=30)
+        inject("proxy", "down", 100)
+        result = api2.transcribe(clip)
+        if result == "Transkript via groq" and FaultServer.hits["proxy"] == api2.breakers["proxy"].failure_threshold:
+            ok(f"Schon im laufenden Diktat umgeschaltet (nach {FaultServer.hits['proxy']} Proxy-Fehlschlägen)")
+        else:
+            fail(f"Ergebnis {result!r}, Proxy-Requests {FaultServer.hits['proxy']}")
+
+        # ── Halb offen: Probe schließt den Breaker ──
+        step(7, "Proxy wieder erreichbar - Probe-Request schließt den Breaker")
+        breaker = api.breakers["proxy"]
+        breaker.reset_seconds = 0.3
+        inject("proxy", "ok", 0)
+        time.sleep(0.4)
+        result = api.transcribe(clip)
+        if result == "Transkript via proxy" and not breaker.is_open and breaker.opened_at is None:
+            ok("Probe über den Proxy erfolgreich, Breaker geschlossen")
+        else:
+            fail(f"Ergebnis {result!r}, Breaker offen: {breaker.is_open}")
+
+    finally:
+        for api in apis:
+            api.close()
+        http_server.shutdown()
+
+    header("FEHLGESCHLAGEN" if failures else "ALLE TESTS ABGESCHLOSSEN")
+    return not failures
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,237 @@
+"""
+Streaming-Upload-Simulation: Testet den chunked Upload gegen einen lokalen Stand-in-Proxy.
+
+Startet einen lokalen HTTP-Server, der /api/transcribe nachbildet und den chunked Body
+mitschneidet, streamt eine synthetische Aufnahme in Blöcken und prüft:
+vollständiger Body, Byte-Gleichheit mit dem Batch-Upload (requests files=/data=),
+Daten schon vor dem Loslassen unterwegs, Abbruch, Fehlerfall und begrenztes Warten.
+
+Ausfuehren:  python test_streaming_upload.py
+"""
+
+import http.server
+import json
+import math
+import struct
+import sys
+import threading
+import time
+from array import array
+
+# ──────────────────────────────────────────────────────────────
+# Test-Konfiguration
+# ──────────────────────────────────────────────────────────────
+
+SERVER_PORT = 18928  # ungewoehnlicher Port um Konflikte zu vermeiden
+SAMPLE_RATE = 16000
+BLOCK_FRAMES = 1024  # wie CONSUMER_CHUNK_FRAMES
+NUM_BLOCKS = 40  # ca. 2.6 s Aufnahme
+FIELDS = {"prompt": "Juristisches Diktat. Korrekte Rechtschreibung, Groß- und Kleinschreibung, Interpunktion.",
+          "language": "de"}
+
+failures = []
+
+# ──────────────────────────────────────────────────────────────
+# Hilfs-Funktionen
+# ──────────────────────────────────────────────────────────────
+
+def header(text):
+    print(f"\n{'='*60}")
+    print(f"  {text}")
+    print(f"{'='*60}")
+
+
+def step(num, text):
+    print(f"\n--- Schritt {num}: {text} ---")
+
+
+def ok(msg):
+    print(f"  [OK] {msg}")
+
+
+def fail(msg):
+    failures.append(msg)
+    print(f"  [FAIL] {msg}")
+
+
+def make_blocks():
+    """Synthetische Aufnahme: 440-Hz-Ton als int16-Blöcke"""
+    blocks = []
+    for b in range(NUM_BLOCKS):
+        block = array('h', (
+            int(8000 * math.sin(2 * math.pi * 440 * (b * BLOCK_FRAMES + i) / SAMPLE_RATE))
+            for i in range(BLOCK_FRAMES)
+        ))
+        blocks.append(block)
+    return blocks
+
+
+class FakeProxyHandler(http.server.BaseHTTPRequestHandler):
+    """Nimmt den chunked Body Stück für Stück an und merkt ihn sich"""
+
+    protocol_version = "HTTP/1.1"
+    requests_seen = []
+    first_chunk_at = None
+    status = 200
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = bytearray()
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            while True:
+                line = self.rfile.readline()
+                if not line:
+                    # Client hat abgebrochen - unvollständigen Body festhalten
+                    FakeProxyHandler.requests_seen.append((dict(self.headers), bytes(body)))
+                    return
+                size = int(line.split(b";")[0], 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                body += self.rfile.read(size)
+                self.rfile.readline()
+                if FakeProxyHandler.first_chunk_at is None and len(body) > 0:
+                    FakeProxyHandler.first_chunk_at = time.perf_counter()
+        else:
+            body += self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        FakeProxyHandler.requests_seen.append((dict(self.headers), bytes(body)))
+
+        if FakeProxyHandler.status == 200:
+            data = json.dumps({"text": f"{len(body)} bytes"}).encode()
+        else:
+            data = json.dumps({"error": "kaputt"}).encode()
+        self.send_response(FakeProxyHandler.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+# ──────────────────────────────────────────────────────────────
+# Test-Runner
+# ──────────────────────────────────────────────────────────────
+
+def main():
+    header("STREAMING-UPLOAD SIMULATION")
+    import requests
+    from audio_handler import AudioClip, build_wav_header
+    from streaming_upload import StreamingUpload, build_stream_wav_header
+
+    server = http.server.ThreadingHTTPServer(("localhost", SERVER_PORT), FakeProxyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://localhost:{SERVER_PORT}/api/transcribe"
+    session = requests.Session()
+    blocks = make_blocks()
+    pcm = b"".join(block.tobytes() for block in blocks)
+    num_frames = NUM_BLOCKS * BLOCK_FRAMES
+
+    try:
+        # ── Batch-Body wie in APIHandler._transcribe_via_proxy ──
+        step(1, "Batch-Body (requests files= / data=)")
+        clip = AudioClip(build_wav_header(num_frames, SAMPLE_RATE) + pcm, SAMPLE_RATE, num_frames)
+        batch_body, content_type = requests.models.RequestEncodingMixin._encode_files(
+            {"file": (clip.filename, clip.data, clip.mime_type)}, FIELDS
+        )
+        boundary = content_type.split("boundary=")[1]
+        ok(f"{len(batch_body)} bytes, boundary {boundary}")
+
+        # ── Streaming mit derselben Boundary ──
+        step(2, "Streaming-Upload während der 'Aufnahme'")
+        upload = StreamingUpload(session, url, FIELDS, {"X-User-ID": "test"}, SAMPLE_RATE, boundary=boundary).open()
+        for block in blocks:
+            upload.append(block)
+            time.sleep(BLOCK_FRAMES / SAMPLE_RATE / 4)  # Consumer-Takt (beschleunigt)
+        released_at = time.perf_counter()
+        upload.finish()
+        text = upload.result()
+        headers, received = FakeProxyHandler.requests_seen[-1]
+
+        if upload.error is None and text == f"{len(received)} bytes":
+            ok(f"Antwort: {text!r}, {upload.response_ms:.1f}ms nach dem Loslassen")
+        else:
+            fail(f"Antwort: {text!r}, Fehler: {upload.error}")
+        if headers.get("Transfer-Encoding", "").lower() == "chunked" and "Content-Length" not in headers:
+            ok("Transfer-Encoding: chunked")
+        else:
+            fail(f"Kein chunked Upload: {headers}")
+        if FakeProxyHandler.first_chunk_at is not None and FakeProxyHandler.first_chunk_at < released_at:
+            ok(f"Erste Daten {(released_at - FakeProxyHandler.first_chunk_at) * 1000:.0f}ms vor dem Loslassen beim Server")
+        else:
+            fail("Server hat vor dem Loslassen nichts empfangen")
+        if upload.bytes_sent == len(received) and upload.num_frames == num_frames:
+            ok(f"Vollständig: {len(received)} bytes, {upload.num_frames} Frames")
+        else:
+            fail(f"Unvollständig: gesendet {upload.bytes_sent}, empfangen {len(received)}, Frames {upload.num_frames}")
+
+        # ── Byte-Gleichheit ──
+        step(3, "Byte-Vergleich mit dem Batch-Body")
+        stream_header = build_stream_wav_header(SAMPLE_RATE)
+        if received.count(stream_header) != 1:
+            fail("Streaming-WAV-Header nicht genau einmal im Body")
+        # Einziger erlaubter Unterschied: die beim Streamen unbekannten RIFF-/data-Längen
+        patched = received.replace(stream_header, build_wav_header(num_frames, SAMPLE_RATE), 1)
+        if patched == batch_body:
+            ok("Body identisch zum Batch-Upload (bis auf die zwei WAV-Längenfelder)")
+        else:
+            diff = next((i for i, (a, b) in enumerate(zip(patched, batch_body)) if a != b), min(len(patched), len(batch_body)))
+            fail(f"Body weicht ab ab Byte {diff} (stream {len(patched)}, batch {len(batch_body)})")
+        lengths = struct.unpack_from("<I", stream_header, 4)[0], struct.unpack_from("<I", stream_header, 40)[0]
+        if lengths == (0xFFFFFFFF, 0xFFFFFFFF):
+            ok("Streaming-Header mit unbekannter Länge")
+        else:
+            fail(f"Unerwartete Längen im Streaming-Header: {lengths}")
+
+        # ── Abbruch ──
+        step(4, "Abbruch (Aufnahme verworfen)")
+        count = len(FakeProxyHandler.requests_seen)
+        upload = StreamingUpload(session, url, FIELDS, {}, SAMPLE_RATE).open()
+        upload.append(blocks[0])
+        upload.abort()
+        if upload.result() is None and upload.error is not None:
+            ok(f"Abgebrochen: {type(upload.error).__name__}")
+        else:
+            fail("Abbruch lieferte ein Ergebnis")
+        time.sleep(0.2)
+        complete = [body for _, body in FakeProxyHandler.requests_seen[count:] if body.endswith(b"--\r\n")]
+        if not complete:
+            ok("Server hat keinen vollständigen Body bekommen")
+        else:
+            fail("Abgebrochener Upload kam vollständig an")
+
+        # ── Server-Fehler -> Fallback ──
+        step(5, "Server-Fehler (Aufrufer lädt dann normal hoch)")
+        FakeProxyHandler.status = 500
+        upload = StreamingUpload(session, url, FIELDS, {}, SAMPLE_RATE).open()
+        for block in blocks[:3]:
+            upload.append(block)
+        upload.finish()
+        if upload.result() is None and upload.error is not None:
+            ok(f"Fehler gemeldet: {upload.error}")
+        else:
+            fail("Server-Fehler nicht erkannt")
+
+        # ── Warten begrenzt (Rest der Deadline) ──
+        step(6, "result(timeout) kehrt nach dem Rest der Deadline zurück")
+        FakeProxyHandler.status = 200
+        upload = StreamingUpload(session, url, FIELDS, {}, SAMPLE_RATE).open()
+        upload.append(blocks[0])  # Kein finish(): Antwort kommt nie
+        start = time.perf_counter()
+        text = upload.result(timeout=0.3)
+        waited = time.perf_counter() - start
+        if text is None and not upload.finished and waited < 1.0:
+            ok(f"Nach {waited * 1000:.0f}ms zurück, Upload läuft noch")
+        else:
+            fail(f"Ergebnis {text!r} nach {waited:.2f}s, beendet: {upload.finished}")
+        upload.abort()
+
+    finally:
+        server.shutdown()
+
+    header("FEHLGESCHLAGEN" if failures else "ALLE TESTS ABGESCHLOSSEN")
+    return not failures
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
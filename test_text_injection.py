@@ -0,0 +1,170 @@
+"""
+Text-Einfügen: Headless-Test des TextInjector mit dem FakeBackend.
+
+Prüft bestätigtes Schreiben bei verzögerter Zwischenablage, Einfügen ohne die festen
+150ms, das Lernen der Wartezeit pro Zielanwendung (verpasstes Einfügen -> Nutzer drückt
+selbst Strg+V), das Ignorieren des eigenen Strg+V, das Zurückholen der vorherigen
+Zwischenablage und die persistierten Wartezeiten.
+
+Ausfuehren:  python test_text_injection.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# ──────────────────────────────────────────────────────────────
+# Test-Konfiguration
+# ──────────────────────────────────────────────────────────────
+
+SLOW_TARGET = "mstsc.exe"  # Remote-Desktop: synchronisiert die Zwischenablage erst nach ~80ms
+SLOW_TARGET_DELAY = 0.08
+FAST_TARGET = "winword.exe"
+WRITE_LATENCY = 0.01
+LEARN_ROUNDS = 12
+SETTLED_ROUNDS = 5  # Die letzten Runden müssen alle ankommen
+
+failures = []
+
+# ──────────────────────────────────────────────────────────────
+# Hilfs-Funktionen
+# ──────────────────────────────────────────────────────────────
+
+def header(text):
+    print(f"\n{'='*60}")
+    print(f"  {text}")
+    print(f"{'='*60}")
+
+
+def step(num, text):
+    print(f"\n--- Schritt {num}: {text} ---")
+
+
+def ok(msg):
+    print(f"  [OK] {msg}")
+
+
+def fail(msg):
+    failures.append(msg)
+    print(f"  [FAIL] {msg}")
+
+
+# ──────────────────────────────────────────────────────────────
+# Test-Runner
+# ──────────────────────────────────────────────────────────────
+
+def main():
+    header("TEXT-EINFÜGEN (FakeBackend)")
+    import text_injection
+    from text_injection import TextInjector, FakeBackend, DEFAULT_PASTE_DELAY_MS
+
+    cache_path = os.path.join(tempfile.mkdtemp(), "paste_delays.json")
+    backend = FakeBackend(write_latency=WRITE_LATENCY, required_delays={SLOW_TARGET: SLOW_TARGET_DELAY})
+    injector = TextInjector(backend, path=cache_path)
+
+    # ── Bestätigtes Schreiben ──
+    step(1, "Zwischenablage bestätigen und einfügen")
+    backend.current_target = FAST_TARGET
+    result = injector.inject("Sehr geehrte Damen und Herren,")
+    if result.pasted and backend.pasted == [(FAST_TARGET, "Sehr geehrte Damen und Herren,")]:
+        ok(f"Eingefügt: {result}")
+    else:
+        fail(f"Nicht eingefügt: {result}, {backend.pasted}")
+    if WRITE_LATENCY * 1000 <= result.confirm_ms < WRITE_LATENCY * 1000 + 20:
+        ok(f"Bestätigt nach {result.confirm_ms:.1f}ms (Schreiblatenz {WRITE_LATENCY * 1000:.0f}ms)")
+    else:
+        fail(f"Bestätigung nach {result.confirm_ms:.1f}ms")
+    if result.total_ms < 150:
+        ok(f"Gesamt {result.total_ms:.0f}ms statt fester 150ms + Kopieren")
+    else:
+        fail(f"Gesamt {result.total_ms:.0f}ms")
+
+    # ── Nur kopieren ──
+    step(2, "Nur kopieren (ohne Strg+V)")
+    count = len(backend.pasted)
+    if injector.copy("nur kopiert") and backend.read_clipboard() == "nur kopiert" and len(backend.pasted) == count:
+        ok("Zwischenablage gesetzt, nichts eingefügt")
+    else:
+        fail("copy() hat eingefügt oder nicht geschrieben")
+
+    # ── Lernen pro Zielanwendung ──
+    step(3, f"Wartezeit lernen ({SLOW_TARGET} braucht {SLOW_TARGET_DELAY * 1000:.0f}ms)")
+    backend.current_target = SLOW_TARGET
+    delays = []
+    landed = []
+    for i in range(LEARN_ROUNDS):
+        missed_before = len(backend.missed)
+        injector.inject(f"Absatz {i}")
+        injector.note_manual_paste()  # Eigenes Strg+V im Hook: muss ignoriert werden
+        if len(backend.missed) > missed_before:
+            # Nutzer merkt, dass nichts kam, und drückt selbst Strg+V
+            injector._own_paste_until = 0.0
+            injector.note_manual_paste()
+            landed.append(False)
+        else:
+            landed.append(True)
+        delays.append(injector.delay_for(SLOW_TARGET))
+    print(f"  Wartezeiten: {', '.join(f'{d:.0f}' for d in delays)} ms")
+    if backend.missed and all(landed[-SETTLED_ROUNDS:]):
+        ok(f"{len(backend.missed)} verpasst, die letzten {SETTLED_ROUNDS} angekommen")
+    else:
+        fail(f"Angekommen: {landed}")
+    if injector.delay_for(SLOW_TARGET) >= SLOW_TARGET_DELAY * 1000 * 0.5:
+        ok(f"{SLOW_TARGET}: {injector.delay_for(SLOW_TARGET):.0f}ms gelernt")
+    else:
+        fail(f"{SLOW_TARGET}: nur {injector.delay_for(SLOW_TARGET):.0f}ms")
+    if injector.delay_for(FAST_TARGET) < DEFAULT_PASTE_DELAY_MS:
+        ok(f"{FAST_TARGET}: {injector.delay_for(FAST_TARGET):.0f}ms (unabhängig, schrumpft nach Erfolg)")
+    else:
+        fail(f"{FAST_TARGET}: {injector.delay_for(FAST_TARGET):.0f}ms")
+
+    # ── Eigenes Strg+V ──
+    step(4, "Eigenes Strg+V zählt nicht als Fehlschlag")
+    backend.current_target = FAST_TARGET
+    before = injector.delay_for(FAST_TARGET)
+    injector.inject("eins")
+    injector.note_manual_paste()  # Innerhalb der Karenzzeit nach dem eigenen Strg+V
+    injector.inject("zwei")
+    if injector.delay_for(FAST_TARGET) <= before:
+        ok(f"Wartezeit {before:.0f} -> {injector.delay_for(FAST_TARGET):.0f}ms")
+    else:
+        fail(f"Wartezeit gestiegen: {before:.0f} -> {injector.delay_for(FAST_TARGET):.0f}ms")
+
+    # ── Zwischenablage zurückholen ──
+    step(5, "Vorherige Zwischenablage zurückholen")
+    text_injection.RESTORE_DELAY_SECONDS = 0.05
+    injector.restore_clipboard = True
+    backend.write_clipboard("Aktenzeichen 4 O 123/24")
+    time.sleep(WRITE_LATENCY * 2)
+    injector.inject("Diktat A")
+    injector.inject("Diktat B")  # Vor dem Zurückholen: gesichert bleibt die Zwischenablage des Nutzers
+    time.sleep(0.3)
+    if backend.read_clipboard() == "Aktenzeichen 4 O 123/24":
+        ok("Zwischenablage des Nutzers zurück (auch nach zwei schnellen Einfügungen)")
+    else:
+        fail(f"Zwischenablage: {backend.read_clipboard()!r}")
+    injector.inject("Diktat C")
+    backend.write_clipboard("neu kopiert")
+    time.sleep(0.3)
+    if backend.read_clipboard() == "neu kopiert":
+        ok("Inzwischen Kopiertes wird nicht überschrieben")
+    else:
+        fail(f"Zwischenablage überschrieben: {backend.read_clipboard()!r}")
+    injector.restore_clipboard = False
+
+    # ── Persistenz ──
+    step(6, "Gelernte Wartezeiten persistiert")
+    injector.flush()
+    reloaded = TextInjector(FakeBackend(), path=cache_path)
+    if abs(reloaded.delay_for(SLOW_TARGET) - injector.delay_for(SLOW_TARGET)) < 1e-6:
+        ok(f"Neu geladen: {SLOW_TARGET} {reloaded.delay_for(SLOW_TARGET):.0f}ms")
+    else:
+        fail(f"Neu geladen: {reloaded.delay_for(SLOW_TARGET)} statt {injector.delay_for(SLOW_TARGET)}")
+
+    header("FEHLGESCHLAGEN" if failures else "ALLE TESTS ABGESCHLOSSEN")
+    return not failures
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
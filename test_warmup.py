@@ -0,0 +1,266 @@
+"""
+Verbindungs-Warmup: Loslassen-bis-Text mit und ohne Warmup gegen einen lokalen Stand-in-Proxy.
+
+Der Stand-in bildet die Kosten nach dem Leerlauf nach: jede neue Verbindung kostet
+CONNECT_PENALTY (DNS + TCP + TLS), der erste Request nach COLD_AFTER Sekunden Ruhe
+zusätzlich COLD_PENALTY (Serverless-Kaltstart); Verbindungen schließt er nach
+IDLE_CLOSE Sekunden. Geprüft wird über die echte APIHandler-Logik: Warmup beim
+Hotkey-Druck über beide Verbindungspools, kein Ping wenn schon warm, die gemessene
+Zeit vom Loslassen bis zum Text (kalt vs. aufgewärmt) und das adaptive Keep-Alive.
+
+Ausfuehren:  python test_warmup.py
+"""
+
+import http.server
+import json
+import sys
+import threading
+import time
+
+# ──────────────────────────────────────────────────────────────
+# Test-Konfiguration
+# ──────────────────────────────────────────────────────────────
+
+SERVER_PORT = 18935  # ungewoehnlicher Port um Konflikte zu vermeiden
+SERVER_DELAY = 0.1  # Whisper-/LLM-Verarbeitung
+CONNECT_PENALTY = 0.15
+COLD_PENALTY = 0.6
+COLD_AFTER = 1.0
+IDLE_CLOSE = 0.8
+RECORD_SECONDS = 1.2  # Aufnahmedauer zwischen Drücken und Loslassen
+ROUNDS = 3
+
+failures = []
+
+# ──────────────────────────────────────────────────────────────
+# Hilfs-Funktionen
+# ──────────────────────────────────────────────────────────────
+
+def header(text):
+    print(f"\n{'='*60}")
+    print(f"  {text}")
+    print(f"{'='*60}")
+
+
+def step(num, text):
+    print(f"\n--- Schritt {num}: {text} ---")
+
+
+def ok(msg):
+    print(f"  [OK] {msg}")
+
+
+def fail(msg):
+    failures.append(msg)
+    print(f"  [FAIL] {msg}")
+
+
+class FakeConfig:
+    def __init__(self, **values):
+        self.values = {"language": "Deutsch", "upload_codec": "wav", "custom_instructions": "",
+                       "target_language": "Englisch", "connection_warmup": True}
+        self.values.update(values)
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def get_language_code(self):
+        return "de"
+
+
+class FakeLogger:
+    def log(self, message, level="info"):
+        pass
+
+
+class ColdStartProxy(http.server.BaseHTTPRequestHandler):
+    """Proxy-Stand-in mit Verbindungs- und Kaltstartkosten"""
+
+    protocol_version = "HTTP/1.1"
+    timeout = IDLE_CLOSE  # Leerlaufende Verbindungen schließt der Server
+    lock = threading.Lock()
+    last_request = 0.0
+    health_connections = set()
+    health_pings = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _penalty(self):
+        cls = ColdStartProxy
+        delay = 0.0
+        if not getattr(self, "_connected", False):
+            self._connected = True
+            delay += CONNECT_PENALTY
+        with cls.lock:
+            if time.monotonic() - cls.last_request > COLD_AFTER:
+                delay += COLD_PENALTY
+            cls.last_request = time.monotonic()
+        time.sleep(delay)
+        with cls.lock:
+            cls.last_request = time.monotonic()
+
+    def do_GET(self):
+        self._penalty()
+        if self.path == "/api/health":
+            with ColdStartProxy.lock:
+                ColdStartProxy.health_pings += 1
+                ColdStartProxy.health_connections.add(id(self))
+        self._reply({"status": "ok"})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._penalty()
+        time.sleep(SERVER_DELAY)
+        if self.path == "/api/transcribe":
+            self._reply({"text": "Transkript"})
+        else:
+            content = json.dumps({"text": "Formatierter Text."})
+            self._reply({"choices": [{"message": {"content": content}}]})
+        with ColdStartProxy.lock:
+            ColdStartProxy.last_request = time.monotonic()
+
+    def _reply(self, payload):
+        data = json.dumps(payload).encode()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def make_clip(seconds=1.0):
+    from audio_handler import AudioClip, build_wav_header
+    frames = int(16000 * seconds)
+    return AudioClip(build_wav_header(frames, 16000) + b"\x00\x01" * frames, 16000, frames)
+
+
+def go_idle():
+    """Bis der Server die Verbindungen geschlossen hat und die Funktion kalt ist"""
+    time.sleep(max(COLD_AFTER, IDLE_CLOSE) + 0.4)
+
+
+def dictation(api, clip):
+    """Hotkey drücken, aufnehmen, loslassen - wie TranscriptionWorker._transcribe -> (Zustand, Sekunden)"""
+    state = api.warmup.on_hotkey()
+    time.sleep(RECORD_SECONDS)
+    released_at = time.perf_counter()
+
+    async def job():
+        deadline = api.new_deadline()
+        raw = await api.transcribe_async(clip, deadline=deadline)
+        return await api.process_llm_async(raw, "Dynamisches Diktat", deadline=deadline)
+
+    final = api.engine.run(job())
+    elapsed = time.perf_counter() - released_at
+    api.warmup.record_release_to_text(elapsed, state)
+    if final != "Formatierter Text.":
+        fail(f"Diktat lieferte {final!r}")
+    return state, elapsed
+
+
+# ──────────────────────────────────────────────────────────────
+# Test-Runner
+# ──────────────────────────────────────────────────────────────
+
+def main():
+    header("VERBINDUNGS-WARMUP (kalt vs. aufgewärmt)")
+    import api_handler
+    import warmup
+
+    server = http.server.ThreadingHTTPServer(("localhost", SERVER_PORT), ColdStartProxy)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_handler.PROXY_BASE_URL = f"http://localhost:{SERVER_PORT}"
+    api_handler.USE_PROXY = True
+    api = api_handler.APIHandler(FakeConfig(), FakeLogger())
+    clip = make_clip()
+    # Zeitskala des Stand-ins: warm nur, solange der Server die Verbindung offen hält
+    warmup.WARM_SECONDS = IDLE_CLOSE * 0.6
+    min_gaps, warmup.KEEPALIVE_MIN_GAPS = warmup.KEEPALIVE_MIN_GAPS, 1000  # Keep-Alive erst in Schritt 4
+
+    try:
+        # ── Kalt vs. aufgewärmt ──
+        step(1, f"{ROUNDS} Diktate nach Leerlauf, abwechselnd ohne und mit Warmup")
+        for _ in range(ROUNDS):
+            for enabled in (False, True):
+                api.warmup.enabled = enabled
+                go_idle()
+                state, elapsed = dictation(api, clip)
+                print(f"  {state:>6}: {elapsed * 1000:.0f}ms vom Loslassen bis zum Text")
+        metrics = api.warmup.get_metrics()
+        cold_ms = metrics["release_to_text_cold_ms"]
+        warmed_ms = metrics["release_to_text_warmed_ms"]
+        if metrics["release_to_text_cold_count"] == ROUNDS and metrics["release_to_text_warmed_count"] == ROUNDS:
+            ok(f"Gemessen: {ROUNDS}x kalt, {ROUNDS}x aufgewärmt")
+        else:
+            fail(f"Messwerte: {metrics}")
+        saved = COLD_PENALTY + CONNECT_PENALTY
+        if cold_ms - warmed_ms >= saved * 1000 * 0.7:
+            ok(f"Median kalt {cold_ms:.0f}ms, aufgewärmt {warmed_ms:.0f}ms "
+               f"(-{cold_ms - warmed_ms:.0f}ms, Kaltstart + Verbindung {saved * 1000:.0f}ms)")
+        else:
+            fail(f"Median kalt {cold_ms:.0f}ms, aufgewärmt {warmed_ms:.0f}ms")
+
+        # ── Beide Verbindungspools ──
+        step(2, "Warmup über den Engine-Pool und die Session des Streaming-Uploads")
+        ColdStartProxy.health_connections = set()
+        go_idle()
+        api.warmup.on_hotkey()
+        time.sleep(COLD_PENALTY + CONNECT_PENALTY + 0.3)
+        if len(ColdStartProxy.health_connections) >= 2 and api.warmup.is_warm:
+            ok(f"/api/health über {len(ColdStartProxy.health_connections)} Verbindungen, "
+               f"Warmup {api.warmup.last_warmup_ms:.0f}ms")
+        else:
+            fail(f"Health-Verbindungen {len(ColdStartProxy.health_connections)}, warm: {api.warmup.is_warm}")
+
+        # ── Schon warm ──
+        step(3, "Hotkey kurz nach einem Diktat - kein zusätzlicher Ping")
+        pings = ColdStartProxy.health_pings
+        state = api.warmup.on_hotkey()
+        time.sleep(0.2)
+        if state == "warm" and ColdStartProxy.health_pings == pings:
+            ok("Zustand warm, kein Ping")
+        else:
+            fail(f"Zustand {state}, Pings {pings} -> {ColdStartProxy.health_pings}")
+
+        # ── Adaptives Keep-Alive ──
+        step(4, "Keep-Alive nur bei reger Nutzung und nur für den erwarteten Abstand")
+        api.warmup.close()
+        manager = warmup.WarmupManager(api, enabled=True)
+        api.warmup = manager
+        manager._gaps.extend([warmup.KEEPALIVE_MAX_SECONDS * 2] * 5)
+        if manager.keepalive_horizon() == 0.0:
+            ok("Seltene Nutzung (Abstände > 15 min): keine Keep-Alive-Pings")
+        else:
+            fail(f"Horizont bei seltener Nutzung: {manager.keepalive_horizon()}")
+        manager._gaps.clear()
+        warmup.KEEPALIVE_MIN_GAPS = min_gaps
+        warmup.KEEPALIVE_INTERVAL_SECONDS = 0.3
+        gap = 0.8
+        for _ in range(warmup.KEEPALIVE_MIN_GAPS + 1):
+            manager.on_hotkey()
+            time.sleep(gap)
+        horizon = manager.keepalive_horizon()
+        time.sleep(horizon + 0.5)
+        pings = manager.keepalive_pings
+        time.sleep(1.0)
+        if pings > 0 and manager.keepalive_pings == pings and manager._keepalive.done():
+            ok(f"Horizont {horizon:.1f}s bei {gap:.1f}s Abstand: {pings} Keep-Alive-Pings, danach Ruhe")
+        else:
+            fail(f"Horizont {horizon:.1f}s, Pings {pings} -> {manager.keepalive_pings}")
+        print(f"  Metriken: {manager.get_metrics()}")
+
+    finally:
+        api.close()
+        server.shutdown()
+
+    header("FEHLGESCHLAGEN" if failures else "ALLE TESTS ABGESCHLOSSEN")
+    return not failures
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
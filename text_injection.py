@@ -0,0 +1,334 @@
+"""Text-Einfügen: Zwischenablage schreiben, bestätigen, Strg+V - mit gelernter Wartezeit pro Zielanwendung"""
+import os
+import sys
+import json
+import time
+import threading
+from config import APP_DATA_DIR
+
+PASTE_DELAY_FILE = os.path.join(APP_DATA_DIR, "paste_delays.json")
+CLIPBOARD_CONFIRM_TIMEOUT_SECONDS = 0.5  # So lange auf die eigene Zwischenablage warten (gesperrt durch andere App)
+CLIPBOARD_POLL_SECONDS = 0.002
+DEFAULT_PASTE_DELAY_MS = 40.0  # Unbekannte Zielanwendung - vorher fest 150ms für alle
+MIN_PASTE_DELAY_MS = 0.0
+MAX_PASTE_DELAY_MS = 400.0
+PASTE_DELAY_DECAY = 0.85  # Nach erfolgreichem Einfügen: Wartezeit langsam verkürzen
+PASTE_DELAY_FLOOR_MARGIN = 1.25  # Abstand zur höchsten verpassten Wartezeit dieses Ziels
+PASTE_DELAY_BACKOFF_MS = 60.0  # Nach Fehlschlag mindestens so lange warten (sonst verdoppeln)
+MANUAL_PASTE_WINDOW_SECONDS = 4.0  # Strg+V des Nutzers so kurz danach = unser Einfügen kam nicht an
+OWN_PASTE_GRACE_SECONDS = 0.3  # Eigenes (synthetisches) Strg+V im Hook ignorieren
+RESTORE_DELAY_SECONDS = 0.5  # Vorherige Zwischenablage erst zurück, wenn das Ziel sie gelesen hat
+UNKNOWN_TARGET = "*"
+
+
+class ClipboardPasteBackend:
+    """Windows: pyperclip + pyautogui, Zielanwendung = Prozess des Vordergrundfensters"""
+
+    def __init__(self):
+        self._pyperclip = None
+        self._pyautogui = None
+        self._user32 = None
+        self._kernel32 = None
+
+    def _clipboard(self):
+        if self._pyperclip is None:
+            import pyperclip
+            self._pyperclip = pyperclip
+        return self._pyperclip
+
+    def target(self):
+        """Exe-Name des Vordergrundfensters ("winword.exe") oder None"""
+        if sys.platform != "win32":
+            return None
+        try:
+            import ctypes
+            from ctypes import wintypes
+            if self._user32 is None:
+                self._user32 = ctypes.windll.user32
+                self._kernel32 = ctypes.windll.kernel32
+            hwnd = self._user32.GetForegroundWindow()
+            if not hwnd:
+                return None
+            pid = wintypes.DWORD()
+            self._user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+            handle = self._kernel32.OpenProcess(0x1000, False, pid.value)  # PROCESS_QUERY_LIMITED_INFORMATION
+            if not handle:
+                return None
+            try:
+                buf = ctypes.create_unicode_buffer(260)
+                size = wintypes.DWORD(len(buf))
+                if not self._kernel32.QueryFullProcessImageNameW(handle, 0, buf, ctypes.byref(size)):
+                    return None
+            finally:
+                self._kernel32.CloseHandle(handle)
+            return os.path.basename(buf.value).lower() or None
+        except Exception:
+            return None
+
+    def read_clipboard(self):
+        """Text der Zwischenablage (leer bei Bildern/Dateien - die lassen sich nicht wiederherstellen)"""
+        return self._clipboard().paste()
+
+    def write_clipboard(self, text):
+        self._clipboard().copy(text)
+
+    def send_paste(self):
+        if self._pyautogui is None:
+            import pyautogui
+            self._pyautogui = pyautogui
+        self._pyautogui.hotkey("ctrl", "v")
+
+
+class FakeBackend:
+    """Headless-Backend für Tests: Zwischenablage im Speicher, Ziele mit eigener Mindest-Wartezeit.
+
+    write_latency simuliert eine verzögert sichtbare Zwischenablage; ein Ziel aus
+    required_delays übernimmt den Text nur, wenn seit dem Schreiben genug Zeit vergangen ist
+    (sonst "verpasst" - wie ein Remote-Desktop, der die Zwischenablage erst synchronisiert).
+    """
+
+    def __init__(self, write_latency=0.0, required_delays=None):
+        self.write_latency = write_latency
+        self.required_delays = dict(required_delays or {})  # Ziel -> Sekunden
+        self.current_target = None
+        self.clipboard = ""
+        self.pasted = []  # (Ziel, Text) - was tatsächlich angekommen ist
+        self.missed = []  # (Ziel, Text) - Strg+V zu früh
+        self._pending = None
+        self._written_at = 0.0
+
+    def target(self):
+        return self.current_target
+
+    def read_clipboard(self):
+        if self._pending is not None and time.perf_counter() - self._written_at >= self.write_latency:
+            self.clipboard, self._pending = self._pending, None
+        return self.clipboard
+
+    def write_clipboard(self, text):
+        self._pending = text
+        self._written_at = time.perf_counter()
+
+    def send_paste(self):
+        text = self.read_clipboard()
+        required = self.required_delays.get(self.current_target, 0.0)
+        if time.perf_counter() - self._written_at >= required:
+            self.pasted.append((self.current_target, text))
+        else:
+            self.missed.append((self.current_target, text))
+
+
+class InjectionResult:
+    """Ablauf eines Einfügens (Millisekunden, für Log und Tests)"""
+
+    def __init__(self, target):
+        self.target = target
+        self.confirmed = False
+        self.pasted = False
+        self.confirm_ms = 0.0
+        self.delay_ms = 0.0
+        self.total_ms = 0.0
+        self.error = None
+
+    def __repr__(self):
+        state = "pasted" if self.pasted else ("copied" if self.confirmed else f"failed: {self.error}")
+        return (f"<Injection {self.target or UNKNOWN_TARGET}: {state}, confirm {self.confirm_ms:.1f}ms, "
+                f"delay {self.delay_ms:.0f}ms, total {self.total_ms:.1f}ms>")
+
+
+class TextInjector:
+    """Fügt Text über die Zwischenablage in die aktive Anwendung ein.
+
+    Statt fester 150ms: Text schreiben, per Rücklesen bestätigen, dann nur die für diese
+    Zielanwendung gelernte Wartezeit abwarten und Strg+V senden. Ob Text angekommen ist,
+    lässt sich von außen nicht sehen - drückt der Nutzer kurz danach selbst Strg+V
+    (note_manual_paste aus dem Hotkey-Hook), gilt das Einfügen als verpasst und die Wartezeit
+    für dieses Ziel wächst; sonst schrumpft sie langsam. Optional kommt danach die vorherige
+    Zwischenablage zurück (nur Text).
+    """
+
+    def __init__(self, backend=None, restore_clipboard=False, path=PASTE_DELAY_FILE):
+        self.backend = backend or ClipboardPasteBackend()
+        self.restore_clipboard = restore_clipboard
+        self.path = path
+        self._delays = {}  # Ziel -> {"delay_ms", "floor_ms", "ok", "missed"}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._last = None  # (Ziel, Zeitpunkt Strg+V) des letzten Einfügens, noch nicht bewertet
+        self._manual_paste_at = None
+        self._own_paste_until = 0.0
+        self._restore_timer = None
+        self._restore_pending = None  # Eingefügter Text, nach dem zurückgeholt wird
+        self._restore_text = None  # Zwischenablage des Nutzers vor dem ersten noch nicht zurückgeholten Einfügen
+        self.load()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._delays = json.load(f)
+        except Exception as e:
+            print(f"[Inject] Delay cache load error: {e}")
+            self._delays = {}
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or not self.path:
+                return
+            delays = {target: dict(entry) for target, entry in self._delays.items()}
+            self._dirty = False
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(delays, f, indent=2)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"[Inject] Delay cache save error: {e}")
+
+    def delay_for(self, target):
+        """Gelernte Wartezeit in ms zwischen bestätigter Zwischenablage und Strg+V"""
+        entry = self._delays.get(target or UNKNOWN_TARGET)
+        return entry["delay_ms"] if entry else DEFAULT_PASTE_DELAY_MS
+
+    def note_manual_paste(self):
+        """Nutzer hat Strg+V gedrückt (Listener-Thread - nur Zeitstempel, Auswertung beim nächsten Einfügen)"""
+        now = time.perf_counter()
+        if now >= self._own_paste_until:
+            self._manual_paste_at = now
+
+    def copy(self, text):
+        """Nur in die Zwischenablage (bestätigt), ohne Einfügen"""
+        return self.inject(text, paste=False).confirmed
+
+    def inject(self, text, paste=True):
+        """Text in die Zwischenablage schreiben, bestätigen und einfügen (blockiert - Worker-Thread)"""
+        with self._lock:
+            started = time.perf_counter()
+            self._settle()
+            target = self.backend.target() if paste else None
+            result = InjectionResult(target)
+            if self.restore_clipboard and paste:
+                self._remember_clipboard()
+
+            result.confirmed = self._write_confirmed(text)
+            result.confirm_ms = (time.perf_counter() - started) * 1000
+            if not result.confirmed:
+                result.error = "clipboard not confirmed"
+            elif paste:
+                delay_ms = self.delay_for(target)
+                if delay_ms > 0:
+                    time.sleep(delay_ms / 1000)
+                if self.backend.read_clipboard() != text and not self._write_confirmed(text):
+                    result.error = "clipboard changed before paste"  # z.B. Zwischenablage-Manager
+                else:
+                    try:
+                        self._own_paste_until = time.perf_counter() + OWN_PASTE_GRACE_SECONDS
+                        self.backend.send_paste()
+                        result.pasted = True
+                        self._last = (target, time.perf_counter())
+                        self._manual_paste_at = None
+                    except Exception as e:
+                        result.error = str(e)
+                result.delay_ms = delay_ms
+            if paste and self._restore_text is not None:
+                self._schedule_restore(text, result.delay_ms)
+            result.total_ms = (time.perf_counter() - started) * 1000
+
+        print(f"[Inject] {result}")
+        if self._dirty:
+            self.save()
+        return result
+
+    def flush(self):
+        """Letztes Einfügen bewerten und Wartezeiten speichern (Beenden)"""
+        with self._lock:
+            self._settle()
+            if self._restore_timer is not None:
+                self._restore_timer.cancel()
+                self._restore_timer = None
+                self._restore(self._restore_pending)
+        self.save()
+
+    def _write_confirmed(self, text):
+        """Schreiben und zurücklesen, bis der Text sichtbar ist (ein zweiter Versuch, falls gesperrt)"""
+        for _ in range(2):
+            try:
+                self.backend.write_clipboard(text)
+            except Exception as e:
+                print(f"[Inject] Clipboard write failed: {e}")
+                continue
+            deadline = time.perf_counter() + CLIPBOARD_CONFIRM_TIMEOUT_SECONDS
+            while True:
+                try:
+                    if self.backend.read_clipboard() == text:
+                        return True
+                except Exception:
+                    pass
+                if time.perf_counter() >= deadline:
+                    break
+                time.sleep(CLIPBOARD_POLL_SECONDS)
+        return False
+
+    def _settle(self):
+        """Vorheriges Einfügen bewerten: Strg+V des Nutzers im Zeitfenster = verpasst, sonst Erfolg"""
+        if self._last is None:
+            return
+        target, pasted_at = self._last
+        manual = self._manual_paste_at
+        missed = manual is not None and pasted_at < manual <= pasted_at + MANUAL_PASTE_WINDOW_SECONDS
+        self._learn(target, missed)
+        self._last = None
+        self._manual_paste_at = None
+
+    def _learn(self, target, missed):
+        key = target or UNKNOWN_TARGET
+        entry = self._delays.setdefault(key, {"delay_ms": DEFAULT_PASTE_DELAY_MS, "floor_ms": 0.0, "ok": 0, "missed": 0})
+        if missed:
+            # Verpasste Wartezeit merken - beim Verkürzen nie wieder darunter
+            entry["floor_ms"] = max(entry.get("floor_ms", 0.0), entry["delay_ms"])
+            entry["delay_ms"] = min(MAX_PASTE_DELAY_MS, max(PASTE_DELAY_BACKOFF_MS, entry["delay_ms"] * 2))
+            entry["missed"] += 1
+            print(f"[Inject] Paste into {key} missed - delay now {entry['delay_ms']:.0f}ms")
+        else:
+            floor = max(MIN_PASTE_DELAY_MS, entry.get("floor_ms", 0.0) * PASTE_DELAY_FLOOR_MARGIN)
+            entry["delay_ms"] = max(floor, round(entry["delay_ms"] * PASTE_DELAY_DECAY, 1))
+            entry["ok"] += 1
+        self._dirty = True
+
+    def _remember_clipboard(self):
+        """Zwischenablage des Nutzers sichern - bei schnell aufeinander folgenden Einfügungen nur die erste"""
+        if self._restore_timer is not None:
+            self._restore_timer.cancel()
+            self._restore_timer = None
+            return  # _restore_text ist noch die ursprüngliche Zwischenablage
+        try:
+            previous = self.backend.read_clipboard()
+        except Exception:
+            previous = None
+        self._restore_text = previous if previous else None
+
+    def _schedule_restore(self, text, delay_ms):
+        self._restore_pending = text
+        timer = threading.Timer(max(RESTORE_DELAY_SECONDS, delay_ms * 4 / 1000), self._restore_later, args=(text,))
+        timer.daemon = True
+        self._restore_timer = timer
+        timer.start()
+
+    def _restore_later(self, text):
+        with self._lock:
+            if self._restore_timer is None or self._restore_pending != text:
+                return  # Inzwischen neues Einfügen - das holt die Zwischenablage zurück
+            self._restore_timer = None
+            self._restore(text)
+
+    def _restore(self, text):
+        """Vorherige Zwischenablage zurück, solange dort noch unser Text steht (nicht überschreiben, was der Nutzer kopiert hat)"""
+        previous, self._restore_text = self._restore_text, None
+        if previous is None:
+            return
+        try:
+            if self.backend.read_clipboard() == text:
+                self.backend.write_clipboard(previous)
+        except Exception as e:
+            print(f"[Inject] Clipboard restore failed: {e}")
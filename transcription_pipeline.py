@@ -0,0 +1,190 @@
+"""Segment-Pipeline: Transkribiert Segmente schon während der Hotkey noch gehalten wird"""
+import re
+import asyncio
+import threading
+from concurrent.futures import Future
+from request_engine import CancelToken
+from retry_policy import Deadline, RetryableError
+
+MAX_PARALLEL_SEGMENTS = 3
+MAX_PENDING_SEGMENTS = 6  # Mehr wartende Clips blockieren den Segment-Thread (Speicher bleibt konstant)
+COLLECT_TIMEOUT_SECONDS = 180
+SEGMENT_ATTEMPTS = 2  # Segmente nach Übertragungsfehlern einmal wiederholen
+PROMPT_CONTEXT_CHARS = 200  # Ende des vorherigen Segments als Whisper-Prompt (Kontinuität)
+OVERLAP_MAX_WORDS = 12  # Maximal so viele doppelte Wörter am Segmentanfang suchen
+OVERLAP_MIN_WORDS = 2  # Einzelne Wörter können legitim doppelt vorkommen
+MISSING_SEGMENT_MARKER = "[…]"
+
+_WORD_STRIP = re.compile(r"^\W+|\W+$")
+
+
+def _normalize_word(word):
+    return _WORD_STRIP.sub("", word).lower()
+
+
+def merge_overlap(previous, current, max_words=OVERLAP_MAX_WORDS, min_words=OVERLAP_MIN_WORDS):
+    """Entfernt am Anfang von current die Wörter, die schon am Ende von previous stehen.
+
+    Harte Segment-Schnitte überlappen im Audio, daher transkribiert Whisper die
+    Überlappung zweimal. Verglichen wird ohne Satzzeichen und Groß-/Kleinschreibung.
+    """
+    prev_words = [_normalize_word(w) for w in previous.split()[-max_words:]]
+    cur_split = current.split()
+    cur_words = [_normalize_word(w) for w in cur_split[:max_words]]
+
+    for k in range(min(len(prev_words), len(cur_words)), min_words - 1, -1):
+        if prev_words[-k:] == cur_words[:k] and any(cur_words[:k]):
+            return " ".join(cur_split[k:])
+    return current
+
+
+def _context_tail(text, max_chars=PROMPT_CONTEXT_CHARS):
+    """Letzte max_chars Zeichen, an einer Wortgrenze beginnend"""
+    text = text.strip()
+    if len(text) <= max_chars:
+        return text
+    tail = text[-max_chars:]
+    space = tail.find(" ")
+    return tail[space + 1:] if space != -1 else tail
+
+
+class SegmentPipeline:
+    """Nimmt Segmente vom AudioRecorder entgegen und transkribiert sie parallel im Hintergrund.
+
+    Jedes Segment ist eine Coroutine auf der Request-Engine der API (kein Thread pro
+    Segment). Nach dem Loslassen wartet collect_async() nur noch auf die letzten Segmente
+    und fügt die Teil-Transkripte in Aufnahme-Reihenfolge zusammen.
+    """
+
+    def __init__(self, api, logger, max_workers=MAX_PARALLEL_SEGMENTS, max_pending=MAX_PENDING_SEGMENTS):
+        self.api = api
+        self.logger = logger
+        self.max_workers = max_workers
+        self._parallel = None  # asyncio.Semaphore, im Loop angelegt
+        self._token = CancelToken()
+        self._futures = []
+        self._overlaps = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._closed = threading.Event()
+        self._cancelled = False
+
+    @property
+    def segment_count(self):
+        with self._lock:
+            return len(self._futures)
+
+    def submit(self, audio):
+        """Startet die Transkription eines Segments (AudioClip, wird vom Segment-Thread des Recorders aufgerufen)
+
+        Blockiert, solange MAX_PENDING_SEGMENTS Clips auf ihre Transkription warten.
+        """
+        self._slots.acquire()
+        with self._lock:
+            if self._cancelled:
+                self._slots.release()
+                return
+            index = len(self._futures)
+            previous = self._futures[-1] if self._futures else None
+            future = self.api.engine.submit(self._transcribe_segment(index, audio, previous), self._token)
+            self._futures.append(future)
+            self._overlaps.append(audio.overlap_seconds > 0)
+        future.add_done_callback(lambda _: self._slots.release())
+        self.logger.log(f"[Pipeline] Segment {index + 1} submitted")
+
+    def submit_missing(self, reason):
+        """Segment ging vor dem Kodieren verloren - zählt in collect_async als fehlgeschlagen"""
+        with self._lock:
+            if self._cancelled:
+                return
+            index = len(self._futures)
+            future = Future()
+            future.set_result(None)
+            self._futures.append(future)
+            self._overlaps.append(False)
+        self.logger.log(f"[Pipeline] Segment {index + 1} missing: {reason}", "warning")
+
+    async def _transcribe_segment(self, index, audio, previous):
+        """Transkribiert ein Segment mit dem Ende des vorherigen als Kontext (falls schon fertig)"""
+        if self._parallel is None:
+            self._parallel = asyncio.Semaphore(self.max_workers)
+        async with self._parallel:
+            context = None
+            if previous is not None and previous.done() and not previous.cancelled() and previous.exception() is None:
+                if previous.result():
+                    context = _context_tail(previous.result())
+
+            for attempt in range(SEGMENT_ATTEMPTS):
+                try:
+                    return await self.api.transcribe_async(audio, context=context)
+                except RetryableError as e:
+                    # Nur Übertragungsfehler wiederholen - Abbruch, Deadline und offener Breaker enden sofort
+                    self.logger.log(f"[Pipeline] Segment {index + 1} attempt {attempt + 1} failed: {e}", "warning")
+            return None
+
+    def close(self):
+        """Keine weiteren Segmente - Aufnahme beendet"""
+        self._closed.set()
+
+    def cancel(self):
+        """Verwirft alle Segmente (z.B. bei zu kurzer oder stiller Aufnahme)"""
+        with self._lock:
+            self._cancelled = True
+        self._token.cancel()  # Laufende Requests und Retry-Wartezeiten enden sofort
+        self._closed.set()
+
+    async def collect_async(self, timeout=COLLECT_TIMEOUT_SECONDS, allow_partial=False):
+        """Wartet auf alle Segmente und gibt das zusammengesetzte Transkript zurück.
+
+        Args:
+            timeout: Gesamtbudget für alle Segmente zusammen (nicht pro Segment)
+            allow_partial: Fehlende Segmente als MISSING_SEGMENT_MARKER einsetzen statt abzubrechen
+                (Langdiktat - die komplette Aufnahme liegt nicht mehr im Speicher)
+
+        Returns:
+            str oder None: None wenn keine Segmente vorliegen oder ein Segment fehlgeschlagen ist
+            (der Aufrufer transkribiert dann die komplette Aufnahme). Stille Segmente (leerer
+            Text) zählen nicht als Fehler und fallen weg - nur Stille ergibt "".
+        """
+        deadline = Deadline(timeout)
+        if not await asyncio.to_thread(self._closed.wait, deadline.remaining()):
+            self.logger.log("[Pipeline] Timeout waiting for recording end", "warning")
+            return None
+
+        with self._lock:
+            futures = list(self._futures)
+            overlaps = list(self._overlaps)
+
+        if not futures:
+            return None
+
+        texts = []
+        missing = 0
+        for index, future in enumerate(futures):
+            try:
+                # shield: Timeout/Abbruch des Wartens bricht nicht das Segment selbst ab
+                text = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), deadline.remaining())
+            except Exception as e:
+                self.logger.log(f"[Pipeline] Segment {index + 1} error: {e or type(e).__name__}", "warning")
+                text = None
+            if text is None:
+                self.logger.log(f"[Pipeline] Segment {index + 1} failed", "warning")
+                if not allow_partial:
+                    return None
+                missing += 1
+                texts.append(MISSING_SEGMENT_MARKER)
+                continue
+
+            text = text.strip()
+            if not text:
+                self.logger.log(f"[Pipeline] Segment {index + 1} is silent - skipped")
+                continue
+            if overlaps[index] and texts and texts[-1] != MISSING_SEGMENT_MARKER:
+                text = merge_overlap(texts[-1], text)
+            if text:
+                texts.append(text)
+
+        if missing == len(futures):
+            return None
+        self.logger.log(f"[Pipeline] {len(texts)} segments stitched ({missing} missing)")
+        return " ".join(texts)
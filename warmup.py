@@ -0,0 +1,147 @@
+"""Verbindungs-Warmup: beim Hotkey-Druck Verbindungen und Serverless-Funktion aufwärmen, bei reger Nutzung warm halten"""
+import time
+import asyncio
+import threading
+from collections import deque
+
+WARM_SECONDS = 45.0  # So lange nach einer Antwort gelten Verbindung und Funktion als warm (Keep-Alive 60s)
+KEEPALIVE_INTERVAL_SECONDS = 40.0  # Ping-Abstand, solange warm gehalten wird
+KEEPALIVE_MIN_GAPS = 3  # Erst ab so vielen beobachteten Diktat-Abständen warm halten
+KEEPALIVE_GAP_PERCENTILE = 0.75
+KEEPALIVE_HORIZON_FACTOR = 1.5  # Warm halten bis 1.5x p75 der Abstände nach dem letzten Hotkey
+KEEPALIVE_MAX_SECONDS = 15 * 60  # Seltener genutzt: nur Warmup beim Hotkey, keine Pings
+GAP_WINDOW = 20
+LATENCY_WINDOW = 50
+
+
+class WarmupManager:
+    """Wärmt beim Hotkey-Druck die Verbindungen auf und hält sie bei reger Nutzung warm.
+
+    on_hotkey() ist nicht blockierend (pynput-Hook): ist seit WARM_SECONDS nichts über die
+    Leitung gegangen, schickt es über api.ping_async() einen billigen Request - parallel zur
+    Aufnahme, damit DNS, TCP/TLS und der Serverless-Kaltstart beim Loslassen erledigt sind.
+    Aus den Abständen zwischen Diktaten ergibt sich, wie lange nach dem letzten Hotkey
+    Keep-Alive-Pings laufen; bei seltener Nutzung gar nicht. Gemessen wird die Zeit vom
+    Loslassen bis zum Text, getrennt nach Zustand beim Drücken: "warm" (schon warm),
+    "warmed" (Warmup beim Drücken), "cold" (Warmup aus).
+    """
+
+    def __init__(self, api, enabled=True):
+        self.api = api
+        self.enabled = enabled
+        self.warmups = 0
+        self.keepalive_pings = 0
+        self.failures = 0
+        self.last_warmup_ms = None
+        self._last_traffic = None  # monotonic: letzte Antwort eines Requests oder Pings
+        self._last_ping = None
+        self._last_press = None
+        self._press_state = None
+        self._gaps = deque(maxlen=GAP_WINDOW)
+        self._latencies = {state: deque(maxlen=LATENCY_WINDOW) for state in ("warm", "warmed", "cold")}
+        self._warming = None  # concurrent Future des laufenden Warmups
+        self._keepalive = None  # concurrent Future der Keep-Alive-Schleife
+        self._lock = threading.Lock()
+
+    def note_traffic(self):
+        """Antwort über die Leitung erhalten (Request, Streaming-Upload, Ping)"""
+        self._last_traffic = time.monotonic()
+
+    @property
+    def is_warm(self):
+        return self._last_traffic is not None and time.monotonic() - self._last_traffic < WARM_SECONDS
+
+    def on_hotkey(self):
+        """Hotkey gedrückt (pynput-Hook, nicht blockierend) - liefert den Zustand für die Latenzmessung"""
+        now = time.monotonic()
+        engine = self.api.engine
+        with self._lock:
+            if self._last_press is not None:
+                self._gaps.append(now - self._last_press)
+            self._last_press = now
+            if self.is_warm:
+                state = "warm"
+            elif not self.enabled or not engine.running:
+                state = "cold"  # Loop noch nicht gestartet: submit() würde auf den Thread warten
+            else:
+                state = "warmed"
+            warm_now = state == "warmed" and (self._warming is None or self._warming.done())
+            keep_alive = (self.enabled and engine.running and self.keepalive_horizon()
+                          and (self._keepalive is None or self._keepalive.done()))
+            self._press_state = state
+        # Außerhalb von _lock einreichen
+        if warm_now:
+            self._warming = engine.submit(self._ping("hotkey"))
+        if keep_alive:
+            self._keepalive = engine.submit(self._keepalive_loop())
+        return state
+
+    def keepalive_horizon(self):
+        """Wie lange nach dem letzten Hotkey warm gehalten wird (0 = gar nicht)"""
+        gaps = sorted(self._gaps)
+        if len(gaps) < KEEPALIVE_MIN_GAPS:
+            return 0.0
+        typical = gaps[min(len(gaps) - 1, int(len(gaps) * KEEPALIVE_GAP_PERCENTILE))]
+        if typical > KEEPALIVE_MAX_SECONDS:
+            return 0.0
+        return min(KEEPALIVE_MAX_SECONDS, typical * KEEPALIVE_HORIZON_FACTOR)
+
+    async def _ping(self, reason):
+        self._last_ping = time.monotonic()
+        start = time.perf_counter()
+        try:
+            await self.api.ping_async()
+        except Exception as e:
+            self.failures += 1
+            print(f"[Warmup] {reason} ping failed: {e}")
+            return
+        self.note_traffic()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if reason == "hotkey":
+            self.warmups += 1
+            self.last_warmup_ms = elapsed_ms
+            print(f"[Warmup] Connections warmed on hotkey in {elapsed_ms:.0f}ms")
+        else:
+            self.keepalive_pings += 1
+
+    async def _keepalive_loop(self):
+        while self.enabled:
+            now = time.monotonic()
+            horizon = self.keepalive_horizon()
+            if not horizon or self._last_press is None or now - self._last_press > horizon:
+                break
+            last = max(self._last_traffic or 0.0, self._last_ping or 0.0)
+            wait = KEEPALIVE_INTERVAL_SECONDS - (now - last)
+            if wait > 0:
+                await asyncio.sleep(min(wait, horizon - (now - self._last_press)) + 0.01)
+                continue
+            await self._ping("keep-alive")
+        print(f"[Warmup] Keep-alive stopped after {self.keepalive_pings} pings")
+
+    def record_release_to_text(self, seconds, state=None):
+        """Zeit vom Loslassen bis zum fertigen Text (Zustand beim Drücken, sonst der letzte)"""
+        state = state or self._press_state
+        if state in self._latencies:
+            self._latencies[state].append(seconds)
+            print(f"[Warmup] Release-to-text {seconds * 1000:.0f}ms ({state})")
+
+    def get_metrics(self):
+        metrics = {
+            'warmup_enabled': self.enabled,
+            'warmups': self.warmups,
+            'warmup_ms': self.last_warmup_ms,
+            'warmup_failures': self.failures,
+            'keepalive_pings': self.keepalive_pings,
+            'keepalive_horizon_s': self.keepalive_horizon(),
+        }
+        for state, samples in self._latencies.items():
+            ordered = sorted(samples)
+            metrics[f'release_to_text_{state}_ms'] = ordered[len(ordered) // 2] * 1000 if ordered else None
+            metrics[f'release_to_text_{state}_count'] = len(ordered)
+        return metrics
+
+    def close(self):
+        self.enabled = False
+        for future in (self._warming, self._keepalive):
+            if future is not None:
+                future.cancel()